@@ -29,6 +29,9 @@ CREATE TABLE IF NOT EXISTS repositories (
     name            TEXT NOT NULL,
     url             TEXT NOT NULL,
     default_branch  TEXT,
+    -- Водяной знак инкрементальной синхронизации
+    last_synced_sha             TEXT,
+    last_synced_committed_at    TIMESTAMPTZ,
     created_at      TIMESTAMPTZ DEFAULT now(),
     updated_at      TIMESTAMPTZ DEFAULT now(),
 
@@ -119,13 +122,71 @@ CREATE TABLE IF NOT EXISTS commit_files (
     additions           INTEGER,
     deletions           INTEGER,
     changes             INTEGER,
+    meaningful_additions INTEGER,
+    meaningful_deletions INTEGER,
     language            TEXT,
     patch               TEXT,
+    patch_hash          TEXT,
     created_at              TIMESTAMPTZ DEFAULT now(),
     updated_at              TIMESTAMPTZ DEFAULT now()
 
 );
 
+-- =====================================
+-- Patch blobs (content-addressed, compressed)
+-- =====================================
+CREATE TABLE IF NOT EXISTS patch_blobs (
+    hash            TEXT PRIMARY KEY, -- sha256 of patch text
+    codec           TEXT NOT NULL, -- zstd/zlib/raw
+    size            INTEGER NOT NULL,
+    data            BYTEA NOT NULL,
+    created_at      TIMESTAMPTZ DEFAULT now()
+);
+
+-- data уже сжато: TOAST хранит его без повторного сжатия
+ALTER TABLE patch_blobs ALTER COLUMN data SET STORAGE EXTERNAL;
+
+-- =====================================
+-- Ingest jobs (queue for src.worker)
+-- =====================================
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+    id              BIGSERIAL PRIMARY KEY,
+    status          TEXT NOT NULL DEFAULT 'queued', -- queued/running/succeeded/failed
+    owner           VARCHAR(128) NOT NULL,
+    repo            VARCHAR(128) NOT NULL,
+    scope_type      TEXT NOT NULL,
+    scope_id        BIGINT NOT NULL,
+    settings        TEXT,
+    params          JSONB NOT NULL DEFAULT '{}',
+    token           TEXT, -- erased when the job finishes
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    max_attempts    INTEGER NOT NULL DEFAULT 1,
+    worker_id       TEXT,
+    progress        JSONB,
+    result          JSONB,
+    error           TEXT,
+    created_at      TIMESTAMPTZ DEFAULT now(),
+    started_at      TIMESTAMPTZ,
+    heartbeat_at    TIMESTAMPTZ,
+    finished_at     TIMESTAMPTZ,
+    updated_at      TIMESTAMPTZ DEFAULT now()
+);
+
+-- =====================================
+-- Ingest checkpoints (resumable ingestion)
+-- =====================================
+CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+    repository_id       BIGINT PRIMARY KEY REFERENCES repositories(id) ON DELETE CASCADE,
+    backend             TEXT, -- rest/graphql/git
+    head_sha            TEXT, -- set while an interrupted run is pending
+    head_committed_at   TIMESTAMPTZ,
+    cursor              JSONB, -- REST page / GraphQL cursor / git skip
+    last_persisted_sha  TEXT,
+    persisted           INTEGER NOT NULL DEFAULT 0,
+    dead_letter         JSONB NOT NULL DEFAULT '{}', -- sha -> {login, error, attempts}
+    updated_at          TIMESTAMPTZ DEFAULT now()
+);
+
 -- =====================================
 -- File extensions
 -- =====================================
@@ -139,7 +200,7 @@ CREATE TABLE IF NOT EXISTS file_extensions (
     updated_at      TIMESTAMP WITH TIME ZONE DEFAULT now()
 );
 
-INSERT INTO file_extensions (extension, language) VALUES
+INSERT INTO file_extensions (extension, language, is_system) VALUES
     ('py', 'Python', TRUE),
     ('js', 'JavaScript', TRUE),
     ('ts', 'TypeScript', TRUE),
@@ -180,8 +241,34 @@ CREATE INDEX IF NOT EXISTS idx_commits_contributor
 CREATE INDEX IF NOT EXISTS idx_commit_files_commit
     ON commit_files(commit_id);
 
+-- Ключ для INSERT ... ON CONFLICT (commit_id, file_path)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_commit_files_commit_path
+    ON commit_files(commit_id, file_path);
+
 CREATE INDEX IF NOT EXISTS idx_contributors_provider
     ON contributors(vcs_provider, external_id);
 
 CREATE INDEX IF NOT EXISTS idx_analysis_settings_scope
     ON analysis_settings(scope_type, scope_id);
+
+-- Очередь: воркеры берут самую старую задачу в статусе queued
+CREATE INDEX IF NOT EXISTS idx_ingest_jobs_queued
+    ON ingest_jobs(id) WHERE status = 'queued';
+
+-- Поиск зависших задач (requeue_stale)
+CREATE INDEX IF NOT EXISTS idx_ingest_jobs_running_heartbeat
+    ON ingest_jobs(heartbeat_at) WHERE status = 'running';
+
+
+-- =====================================
+-- Upgrades of existing databases
+-- =====================================
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS last_synced_sha TEXT;
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS last_synced_committed_at TIMESTAMPTZ;
+ALTER TABLE commit_files ADD COLUMN IF NOT EXISTS meaningful_additions INTEGER;
+ALTER TABLE commit_files ADD COLUMN IF NOT EXISTS meaningful_deletions INTEGER;
+ALTER TABLE commit_files ADD COLUMN IF NOT EXISTS patch_hash TEXT;
+
+-- После ADD COLUMN: на старой базе колонки patch_hash ещё нет
+CREATE INDEX IF NOT EXISTS idx_commit_files_patch_hash
+    ON commit_files(patch_hash);
@@ -29,5 +29,3 @@ SessionLocal = sessionmaker(
 
 class Base(DeclarativeBase):
     pass
-
-Base.metadata.create_all(engine)  
\ No newline at end of file
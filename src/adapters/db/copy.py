@@ -0,0 +1,120 @@
+"""
+Загрузка строк в PostgreSQL через COPY FROM STDIN.
+
+Строки переводятся в текстовый формат COPY лениво, по мере чтения
+драйвером, поэтому пачка целиком в виде текста в памяти не собирается.
+Колонки берутся из ключей строк и проверяются по таблице ORM-модели.
+"""
+import io
+from datetime import date, datetime
+from itertools import chain
+from typing import Iterable, Iterator
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+COPY_NULL = "\\N"
+
+# Спецсимволы текстового формата COPY; обратная косая черта — первой
+_ESCAPES = (
+    ("\\", "\\\\"),
+    ("\t", "\\t"),
+    ("\n", "\\n"),
+    ("\r", "\\r"),
+)
+
+
+class _CopyStream(io.TextIOBase):
+    """Файлоподобный объект для copy_expert поверх генератора строк COPY."""
+
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+        self._buffer = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        parts = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+
+        data = "".join(parts)
+        if size < 0:
+            self._buffer = ""
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def _format_value(value) -> str:
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    value = str(value)
+    # str.replace заметно быстрее str.translate на длинных патчах
+    for char, escaped in _ESCAPES:
+        if char in value:
+            value = value.replace(char, escaped)
+    return value
+
+
+def copy_rows(session: Session, model, rows: Iterable[dict]) -> int:
+    """
+    COPY строк в таблицу модели в текущей транзакции сессии.
+
+    Все строки должны иметь одинаковый набор ключей — имён колонок модели.
+    Возвращает число загруженных строк.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return 0
+
+    table = model.__table__
+    columns = list(first)
+    unknown = [name for name in columns if name not in table.columns]
+    if unknown:
+        raise ValueError(f"Unknown columns for {table.name}: {', '.join(unknown)}")
+
+    count = 0
+
+    def lines():
+        nonlocal count
+        for row in chain([first], rows):
+            count += 1
+            yield "\t".join(_format_value(row[name]) for name in columns) + "\n"
+
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN",
+            _CopyStream(lines()),
+        )
+    finally:
+        cursor.close()
+    return count
+
+
+def reserve_ids(session: Session, model, count: int) -> list[int]:
+    """Берёт count значений из последовательности первичного ключа модели."""
+    if count <= 0:
+        return []
+    return list(
+        session.scalars(
+            text(
+                "SELECT nextval(pg_get_serial_sequence(:table, 'id')) "
+                "FROM generate_series(1, :count)"
+            ),
+            {"table": model.__table__.name, "count": count},
+        )
+    )
@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Text, TIMESTAMP, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.adapters.db.base import Base
+
+
+class AnalysisSettingsModel(Base):
+    __tablename__ = "analysis_settings"
+    __table_args__ = (UniqueConstraint("scope_type", "scope_id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    scope_type: Mapped[str] = mapped_column(Text, nullable=False)  # repo/team/org
+    scope_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    settings: Mapped[dict] = mapped_column(JSONB, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
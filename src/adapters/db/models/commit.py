@@ -8,6 +8,7 @@ from sqlalchemy import (
     Float,
     ForeignKey,
     func,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -16,6 +17,7 @@ from src.adapters.db.base import Base
 
 class CommitModel(Base):
     __tablename__ = "commits"
+    __table_args__ = (UniqueConstraint("repository_id", "sha"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -5,15 +5,17 @@ from sqlalchemy import (
     Text,
     Integer,
     ForeignKey,
-    func
+    func,
+    UniqueConstraint,
 )
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, deferred, mapped_column
 
 from src.adapters.db.base import Base
 
 
 class CommitFileModel(Base):
     __tablename__ = "commit_files"
+    __table_args__ = (UniqueConstraint("commit_id", "file_path"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -27,9 +29,15 @@ class CommitFileModel(Base):
     deletions: Mapped[int | None] = mapped_column(Integer, nullable=True)
     changes: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
+    meaningful_additions: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    meaningful_deletions: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
     language: Mapped[str | None] = mapped_column(String(128), nullable=True)
 
-    patch: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Патч лежит в patch_blobs (CommitFileRepository.get_patches); колонка patch
+    # осталась у строк, записанных до выноса, и не загружается без явного запроса
+    patch_hash: Mapped[str | None] = mapped_column(Text, nullable=True)
+    patch: Mapped[str | None] = deferred(mapped_column(Text, nullable=True))
 
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
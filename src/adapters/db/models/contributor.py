@@ -1,5 +1,5 @@
 from src.data.enums.vcs import VCS
-from sqlalchemy import String, Text, TIMESTAMP, func, Enum as SAEnum
+from sqlalchemy import String, Text, TIMESTAMP, func, Enum as SAEnum, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 
@@ -8,6 +8,7 @@ from src.adapters.db.base import Base
 
 class ContributorModel(Base):
     __tablename__ = "contributors"
+    __table_args__ = (UniqueConstraint("vcs_provider", "external_id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
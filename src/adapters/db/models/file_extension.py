@@ -1,6 +1,6 @@
 from datetime import datetime
-from sqlalchemy import TIMESTAMP, Text, func
-from adapters.db.base import Base
+from sqlalchemy import TIMESTAMP, BigInteger, Boolean, Text, false, func
+from src.adapters.db.base import Base
 
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -9,8 +9,11 @@ class FileExtensionModel(Base):
     __tablename__ = "file_extensions"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    extension: Mapped[str] = mapped_column(Text, unique=True, nullable=False)
+    extension: Mapped[str] = mapped_column(Text, nullable=False)
     language: Mapped[str] = mapped_column(Text, nullable=False)
+    # Системные записи дублируют FILE_EXTENSIONS; пользовательские переопределяют их
+    is_system: Mapped[bool | None] = mapped_column(Boolean, server_default=false())
+    user_id: Mapped[int | None] = mapped_column(BigInteger)
 
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
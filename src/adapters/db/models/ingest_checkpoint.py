@@ -0,0 +1,45 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, ForeignKey, Integer, Text, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.adapters.db.base import Base
+
+
+class IngestCheckpointModel(Base):
+    """
+    Контрольная точка загрузки репозитория.
+
+    head_sha и cursor есть, только пока загрузка не завершена (процесс упал
+    или задача прервана): следующий запуск продолжает с cursor. dead_letter
+    переживает запуски — коммиты, которые не удалось обработать, повторяются
+    отдельно, без повторного прохода истории.
+    """
+
+    __tablename__ = "ingest_checkpoints"
+
+    repository_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("repositories.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    backend: Mapped[str | None] = mapped_column(Text, nullable=True)  # rest/graphql/git
+    # Head прерванной загрузки: история продолжается от него же
+    head_sha: Mapped[str | None] = mapped_column(Text, nullable=True)
+    head_committed_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True
+    )
+    # Позиция пагинации: страница REST, курсор GraphQL или число пропускаемых коммитов git
+    cursor: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+
+    last_persisted_sha: Mapped[str | None] = mapped_column(Text, nullable=True)
+    persisted: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # sha -> {"login", "error", "attempts"}
+    dead_letter: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,54 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Integer, String, Text, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.adapters.db.base import Base
+from src.data.enums.ingest_job import IngestJobStatus
+
+
+class IngestJobModel(Base):
+    """Задача загрузки репозитория; выполняется воркером src.worker."""
+
+    __tablename__ = "ingest_jobs"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    status: Mapped[str] = mapped_column(
+        Text, nullable=False, default=IngestJobStatus.QUEUED.value
+    )  # queued/running/succeeded/failed
+
+    owner: Mapped[str] = mapped_column(String(128), nullable=False)
+    repo: Mapped[str] = mapped_column(String(128), nullable=False)
+
+    scope_type: Mapped[str] = mapped_column(Text, nullable=False)
+    scope_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Заголовок analysis-settings запроса
+    settings: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Остальные параметры process_repo (since, max_commits, backend, ...)
+    params: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+
+    # Токен(ы) GitHub, зашифрованные ingest_token_key; стираются, когда задача завершена
+    token: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    worker_id: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    progress: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    result: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
+    started_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy import TIMESTAMP, Integer, LargeBinary, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.adapters.db.base import Base
+
+
+class PatchBlobModel(Base):
+    """Сжатый патч, общий для всех commit_files с тем же содержимым."""
+
+    __tablename__ = "patch_blobs"
+
+    # sha256 текста патча (hex)
+    hash: Mapped[str] = mapped_column(Text, primary_key=True)
+
+    codec: Mapped[str] = mapped_column(Text, nullable=False)  # zstd/zlib/raw
+    size: Mapped[int] = mapped_column(Integer, nullable=False)  # байт до сжатия
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -30,6 +30,12 @@ class RepositoryModel(Base):
 
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"))
 
+    # Водяной знак синхронизации: последний загруженный head и время его коммита
+    last_synced_sha: Mapped[str | None] = mapped_column(String(40), nullable=True)
+    last_synced_committed_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
     )
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from src.adapters.db.models.analysis_settings import AnalysisSettingsModel
+from src.adapters.db.repositories.base_repository import BaseRepository
+
+
+class AnalysisSettingsRepository(BaseRepository[AnalysisSettingsModel]):
+    def __init__(self, db: Session):
+        super().__init__(db, AnalysisSettingsModel)
+
+    def get_by_scope(
+        self,
+        scope_type: str,
+        scope_id: int,
+    ) -> AnalysisSettingsModel | None:
+        stmt = select(AnalysisSettingsModel).where(
+            AnalysisSettingsModel.scope_type == scope_type,
+            AnalysisSettingsModel.scope_id == scope_id,
+        )
+        return self.db.scalar(stmt)
+
+    def get_updated_at(self, scope_type: str, scope_id: int) -> datetime | None:
+        """Версия настроек области без чтения самих настроек."""
+        stmt = select(AnalysisSettingsModel.updated_at).where(
+            AnalysisSettingsModel.scope_type == scope_type,
+            AnalysisSettingsModel.scope_id == scope_id,
+        )
+        return self.db.scalar(stmt)
+
+    def upsert(
+        self,
+        scope_type: str,
+        scope_id: int,
+        settings: dict,
+    ) -> AnalysisSettingsModel:
+        stmt = pg_insert(AnalysisSettingsModel).values(
+            scope_type=scope_type,
+            scope_id=scope_id,
+            settings=settings,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                AnalysisSettingsModel.scope_type,
+                AnalysisSettingsModel.scope_id,
+            ],
+            set_={"settings": stmt.excluded.settings, "updated_at": func.now()},
+        ).returning(AnalysisSettingsModel.id)
+        settings_id = self.db.scalar(stmt)
+        self.db.commit()
+        return self.get_by_id(settings_id)
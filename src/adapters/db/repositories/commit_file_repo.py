@@ -1,7 +1,10 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from src.adapters.db.copy import copy_rows
 from src.adapters.db.models.commit_file import CommitFileModel
 from src.adapters.db.repositories.base_repository import BaseRepository
+from src.adapters.db.repositories.patch_blob_repo import PatchBlobRepository
 
 
 class CommitFileRepository(BaseRepository[CommitFileModel]):
@@ -25,6 +28,27 @@ class CommitFileRepository(BaseRepository[CommitFileModel]):
         )
         return self.db.scalar(stmt)
 
+    def get_patches(self, files: list[CommitFileModel]) -> dict[int, str | None]:
+        """
+        id файла -> патч. Патчи читаются только здесь: из patch_blobs по
+        patch_hash или из колонки patch у строк, записанных до выноса.
+        """
+        blobs = PatchBlobRepository(self.db).get_many(
+            f.patch_hash for f in files if f.patch_hash is not None
+        )
+        patches = {f.id: blobs.get(f.patch_hash) for f in files if f.patch_hash is not None}
+
+        legacy = [f.id for f in files if f.patch_hash is None]
+        if legacy:
+            stmt = select(CommitFileModel.id, CommitFileModel.patch).where(
+                CommitFileModel.id.in_(legacy)
+            )
+            patches.update(self.db.execute(stmt).tuples())
+        return patches
+
+    def get_patch(self, file: CommitFileModel) -> str | None:
+        return self.get_patches([file]).get(file.id)
+
     def delete_by_commit_id(self, commit_id: int) -> int:
         stmt = delete(CommitFileModel).where(
             CommitFileModel.commit_id == commit_id
@@ -33,6 +57,35 @@ class CommitFileRepository(BaseRepository[CommitFileModel]):
         self.db.commit()
         return result.rowcount
 
+    def delete_by_commit_ids(self, commit_ids: list[int]) -> int:
+        """Удаляет файлы нескольких коммитов, без commit."""
+        if not commit_ids:
+            return 0
+        stmt = delete(CommitFileModel).where(
+            CommitFileModel.commit_id.in_(commit_ids)
+        )
+        return self.db.execute(stmt).rowcount
+
+    def bulk_upsert(self, rows: list[dict]) -> int:
+        """INSERT ... ON CONFLICT (commit_id, file_path) DO UPDATE, без commit."""
+        if not rows:
+            return 0
+        stmt = pg_insert(CommitFileModel)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CommitFileModel.commit_id, CommitFileModel.file_path],
+            set_={
+                name: stmt.excluded[name]
+                for name in rows[0]
+                if name not in ("commit_id", "file_path")
+            } | {"updated_at": func.now()},
+        )
+        self.db.execute(stmt, rows)
+        return len(rows)
+
+    def copy_insert(self, rows) -> int:
+        """COPY строк (можно генератором), без commit."""
+        return copy_rows(self.db, CommitFileModel, rows)
+
     def bulk_create(self, files: list[CommitFileModel]) -> list[CommitFileModel]:
         self.db.add_all(files)
         self.db.commit()
@@ -1,10 +1,16 @@
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from src.adapters.db.copy import copy_rows, reserve_ids
 from src.adapters.db.models.commit import CommitModel
 from src.adapters.db.repositories.base_repository import BaseRepository
 
 
+# Статистика по файлам: без загрузки файлов приходит None и не затирает сохранённую
+FILE_STAT_FIELDS = ("additions", "deletions", "changes", "files_changed")
+
+
 class CommitRepository(BaseRepository[CommitModel]):
     def __init__(self, db: Session):
         super().__init__(db, CommitModel)
@@ -39,6 +45,53 @@ class CommitRepository(BaseRepository[CommitModel]):
         )
         return commit, True
 
+    def get_existing_shas(
+        self,
+        repository_id: int,
+        shas: list[str],
+    ) -> set[str]:
+        if not shas:
+            return set()
+        stmt = select(CommitModel.sha).where(
+            CommitModel.repository_id == repository_id,
+            CommitModel.sha.in_(shas),
+        )
+        return set(self.db.scalars(stmt))
+
+    def bulk_upsert(self, rows: list[dict]) -> dict[str, int]:
+        """
+        INSERT ... ON CONFLICT (repository_id, sha) DO UPDATE, возвращает sha -> id.
+
+        Уже сохранённые коммиты перезаписываются новыми значениями, поэтому
+        повторная и параллельная загрузка одного репозитория безопасны.
+        Пустая статистика по файлам (FILE_STAT_FIELDS) сохранённую не заменяет.
+        Транзакцию не коммитит — этим управляет вызывающий.
+        """
+        if not rows:
+            return {}
+        stmt = pg_insert(CommitModel)
+        columns = CommitModel.__table__.c
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CommitModel.repository_id, CommitModel.sha],
+            set_={
+                name: (
+                    func.coalesce(stmt.excluded[name], columns[name])
+                    if name in FILE_STAT_FIELDS
+                    else stmt.excluded[name]
+                )
+                for name in rows[0]
+                if name not in ("repository_id", "sha")
+            } | {"updated_at": func.now()},
+        ).returning(CommitModel.sha, CommitModel.id)
+        return {sha: commit_id for sha, commit_id in self.db.execute(stmt, rows)}
+
+    def reserve_ids(self, count: int) -> list[int]:
+        return reserve_ids(self.db, CommitModel, count)
+
+    def copy_insert(self, rows) -> int:
+        """COPY строк с заранее выданными id (reserve_ids), без commit."""
+        return copy_rows(self.db, CommitModel, rows)
+
     def get_commits_for_update(
         self,
         repository_id: int,
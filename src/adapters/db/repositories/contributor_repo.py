@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select, or_
+from sqlalchemy import select, or_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from src.adapters.db.models.contributor import ContributorModel
 from src.adapters.db.repositories.base_repository import BaseRepository
 
@@ -58,6 +59,30 @@ class ContributorRepository(BaseRepository[ContributorModel]):
         )
         return contributor, True
 
+    def bulk_upsert(self, rows: list[dict]) -> dict[str, int]:
+        """
+        INSERT ... ON CONFLICT (vcs_provider, external_id) DO UPDATE одним запросом.
+
+        Возвращает external_id -> id и коммитит транзакцию.
+        """
+        if not rows:
+            return {}
+        stmt = pg_insert(ContributorModel)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ContributorModel.vcs_provider, ContributorModel.external_id],
+            set_={
+                name: stmt.excluded[name]
+                for name in rows[0]
+                if name not in ("vcs_provider", "external_id")
+            } | {"updated_at": func.now()},
+        ).returning(ContributorModel.external_id, ContributorModel.id)
+        ids = {
+            external_id: contributor_id
+            for external_id, contributor_id in self.db.execute(stmt, rows)
+        }
+        self.db.commit()
+        return ids
+
     def search_by_email_or_login(
         self, 
         search_term: str
@@ -59,6 +59,21 @@ class FileExtensionRepository(BaseRepository[FileExtensionModel]):
         self.db.refresh(ext)
         return ext
 
+    def get_language_overrides(self) -> dict[str, str]:
+        """
+        Пользовательские (не системные, общие для всех) расширения ->
+        язык; при повторе расширения побеждает более поздняя запись.
+        """
+        stmt = (
+            select(FileExtensionModel.extension, FileExtensionModel.language)
+            .where(
+                FileExtensionModel.is_system.is_(False),
+                FileExtensionModel.user_id.is_(None),
+            )
+            .order_by(FileExtensionModel.id)
+        )
+        return {extension: language for extension, language in self.db.execute(stmt)}
+
     def get_all_languages(self) -> list[str]:
         stmt = select(FileExtensionModel.language).distinct()
         return list(self.db.scalars(stmt).all())
\ No newline at end of file
@@ -0,0 +1,23 @@
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from src.adapters.db.models.ingest_checkpoint import IngestCheckpointModel
+from src.adapters.db.repositories.base_repository import BaseRepository
+
+
+class IngestCheckpointRepository(BaseRepository[IngestCheckpointModel]):
+    def __init__(self, db: Session):
+        super().__init__(db, IngestCheckpointModel)
+
+    def get(self, repository_id: int) -> IngestCheckpointModel | None:
+        return self.get_by_id(repository_id)
+
+    def save(self, repository_id: int, **values):
+        """Создаёт или перезаписывает контрольную точку репозитория одним запросом."""
+        stmt = pg_insert(IngestCheckpointModel).values(repository_id=repository_id, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IngestCheckpointModel.repository_id],
+            set_={**values, "updated_at": func.now()},
+        )
+        self.db.execute(stmt)
+        self.db.commit()
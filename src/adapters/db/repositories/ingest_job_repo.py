@@ -0,0 +1,144 @@
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func, select, update
+from src.adapters.db.models.ingest_job import IngestJobModel
+from src.adapters.db.repositories.base_repository import BaseRepository
+from src.data.enums.ingest_job import IngestJobStatus
+from src.util.token_cipher import encrypt_token
+
+
+QUEUED = IngestJobStatus.QUEUED.value
+RUNNING = IngestJobStatus.RUNNING.value
+SUCCEEDED = IngestJobStatus.SUCCEEDED.value
+FAILED = IngestJobStatus.FAILED.value
+
+
+class IngestJobRepository(BaseRepository[IngestJobModel]):
+    def __init__(self, db: Session):
+        super().__init__(db, IngestJobModel)
+
+    def enqueue(
+        self,
+        owner: str,
+        repo: str,
+        scope_type: str,
+        scope_id: int,
+        token: str,
+        settings: str | None,
+        params: dict,
+        max_attempts: int,
+    ) -> IngestJobModel:
+        """Ставит задачу в очередь; токен сохраняется зашифрованным (decrypt_token)."""
+        return self.create(
+            status=QUEUED,
+            owner=owner,
+            repo=repo,
+            scope_type=scope_type,
+            scope_id=scope_id,
+            token=encrypt_token(token),
+            settings=settings,
+            params=params,
+            max_attempts=max_attempts,
+        )
+
+    def claim_next(self, worker_id: str) -> IngestJobModel | None:
+        """
+        Забирает самую старую задачу из очереди. Строки, заблокированные
+        другими воркерами, пропускаются (SKIP LOCKED), поэтому воркеры на
+        любых узлах разбирают очередь параллельно и не ждут друг друга.
+        """
+        stmt = (
+            select(IngestJobModel)
+            .where(IngestJobModel.status == QUEUED)
+            .order_by(IngestJobModel.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = self.db.scalar(stmt)
+        if job is None:
+            self.db.rollback()
+            return None
+
+        job.status = RUNNING
+        job.attempts += 1
+        job.worker_id = worker_id
+        job.error = None
+        job.started_at = func.now()
+        job.heartbeat_at = func.now()
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def heartbeat(self, job_id: int, worker_id: str, progress: dict | None = None) -> bool:
+        """
+        Отмечает, что воркер жив, и сохраняет прогресс. False — задача
+        больше не принадлежит воркеру (например, признана зависшей).
+        """
+        values = {"heartbeat_at": func.now()}
+        if progress is not None:
+            values["progress"] = progress
+        return self._update_owned(job_id, worker_id, values)
+
+    def complete(self, job_id: int, worker_id: str, result: dict, progress: dict | None = None):
+        values = {
+            "status": SUCCEEDED,
+            "result": result,
+            "finished_at": func.now(),
+            "token": None,
+            "worker_id": None,
+        }
+        if progress is not None:
+            values["progress"] = progress
+        self._update_owned(job_id, worker_id, values)
+
+    def fail(self, job_id: int, worker_id: str, error: str, progress: dict | None = None):
+        """Ошибка попытки: задача возвращается в очередь, пока не исчерпаны попытки."""
+        retry = IngestJobModel.attempts < IngestJobModel.max_attempts
+        values = {
+            "status": case((retry, QUEUED), else_=FAILED),
+            "finished_at": case((retry, None), else_=func.now()),
+            "token": case((retry, IngestJobModel.token), else_=None),
+            "error": error,
+            "worker_id": None,
+        }
+        if progress is not None:
+            values["progress"] = progress
+        self._update_owned(job_id, worker_id, values)
+
+    def requeue_stale(self, stale_after: float) -> int:
+        """
+        Задачи, чей воркер не отмечался дольше stale_after секунд (процесс
+        убит, узел пропал), возвращаются в очередь или завершаются ошибкой.
+        """
+        retry = IngestJobModel.attempts < IngestJobModel.max_attempts
+        result = self.db.execute(
+            update(IngestJobModel)
+            .where(
+                IngestJobModel.status == RUNNING,
+                IngestJobModel.heartbeat_at < func.now() - timedelta(seconds=stale_after),
+            )
+            .values(
+                status=case((retry, QUEUED), else_=FAILED),
+                finished_at=case((retry, None), else_=func.now()),
+                token=case((retry, IngestJobModel.token), else_=None),
+                error="Worker stopped sending heartbeats",
+                worker_id=None,
+            )
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def _update_owned(self, job_id: int, worker_id: str, values: dict) -> bool:
+        """Обновление задачи, которую выполняет этот воркер; чужую не трогает."""
+        result = self.db.execute(
+            update(IngestJobModel)
+            .where(
+                IngestJobModel.id == job_id,
+                IngestJobModel.status == RUNNING,
+                IngestJobModel.worker_id == worker_id,
+            )
+            .values(**values)
+        )
+        self.db.commit()
+        return result.rowcount > 0
@@ -0,0 +1,114 @@
+"""
+Контентно-адресуемое хранилище патчей (patch_blobs).
+
+Патч хранится один раз на содержимое: ключ — sha256 текста, тело сжато
+zstd (zlib, если zstandard не установлен); короткие патчи, которые
+сжатие не уменьшает, хранятся как есть (raw). commit_files ссылается на
+патч по patch_hash, поэтому одинаковые патчи (cherry-pick, форки)
+занимают место один раз.
+"""
+import hashlib
+import zlib
+from typing import Iterable
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from src.adapters.db.models.commit_file import CommitFileModel
+from src.adapters.db.models.patch_blob import PatchBlobModel
+from src.adapters.db.repositories.base_repository import BaseRepository
+
+
+ZSTD_LEVEL = 6
+ZLIB_LEVEL = 6
+
+
+def patch_hash(patch: str) -> str:
+    return hashlib.sha256(patch.encode("utf-8")).hexdigest()
+
+
+def compress_patch(patch: str) -> tuple[str, bytes]:
+    """(codec, сжатые байты)."""
+    data = patch.encode("utf-8")
+    if zstandard is not None:
+        codec, compressed = "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    else:
+        codec, compressed = "zlib", zlib.compress(data, ZLIB_LEVEL)
+    if len(compressed) >= len(data):
+        return "raw", data
+    return codec, compressed
+
+
+def decompress_patch(codec: str, data: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd patch blobs")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == "zlib":
+        data = zlib.decompress(data)
+    elif codec != "raw":
+        raise ValueError(f"Unknown patch codec: {codec}")
+    return data.decode("utf-8")
+
+
+class PatchBlobRepository(BaseRepository[PatchBlobModel]):
+    def __init__(self, db: Session):
+        super().__init__(db, PatchBlobModel)
+
+    def existing_hashes(self, hashes: Iterable[str]) -> set[str]:
+        hashes = list(hashes)
+        if not hashes:
+            return set()
+        stmt = select(PatchBlobModel.hash).where(PatchBlobModel.hash.in_(hashes))
+        return set(self.db.scalars(stmt))
+
+    def put_many(self, patches: dict[str, str]) -> int:
+        """
+        hash -> патч; сжимаются и вставляются только отсутствующие.
+        Без commit, возвращает число новых патчей.
+        """
+        missing = patches.keys() - self.existing_hashes(patches)
+        if not missing:
+            return 0
+
+        rows = []
+        for digest in missing:
+            patch = patches[digest]
+            codec, data = compress_patch(patch)
+            size = len(data) if codec == "raw" else len(patch.encode("utf-8"))
+            rows.append({"hash": digest, "codec": codec, "size": size, "data": data})
+
+        # Параллельная запись того же патча — не ошибка
+        stmt = pg_insert(PatchBlobModel).on_conflict_do_nothing(index_elements=[PatchBlobModel.hash])
+        self.db.execute(stmt, rows)
+        return len(rows)
+
+    def get_many(self, hashes: Iterable[str]) -> dict[str, str]:
+        hashes = list(set(hashes))
+        if not hashes:
+            return {}
+        stmt = select(PatchBlobModel.hash, PatchBlobModel.codec, PatchBlobModel.data).where(
+            PatchBlobModel.hash.in_(hashes)
+        )
+        return {
+            digest: decompress_patch(codec, data)
+            for digest, codec, data in self.db.execute(stmt)
+        }
+
+    def get_patch(self, digest: str) -> str | None:
+        return self.get_many([digest]).get(digest)
+
+    def delete_orphans(self) -> int:
+        """Удаляет патчи, на которые не ссылается ни один файл коммита."""
+        stmt = delete(PatchBlobModel).where(
+            ~exists().where(CommitFileModel.patch_hash == PatchBlobModel.hash)
+        )
+        result = self.db.execute(stmt)
+        self.db.commit()
+        return result.rowcount
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from src.adapters.db.models.repository import RepositoryModel
@@ -97,6 +99,25 @@ class RepositoryRepository(BaseRepository[RepositoryModel]):
     ) -> RepositoryModel | None:
         return self.update(repo_id, default_branch=branch)
 
+    def update_sync_watermark(
+        self,
+        repo_id: int,
+        sha: str,
+        committed_at: datetime | None,
+    ) -> RepositoryModel | None:
+        return self.update(
+            repo_id,
+            last_synced_sha=sha,
+            last_synced_committed_at=committed_at,
+        )
+
+    def reset_sync_watermark(self, repo_id: int) -> RepositoryModel | None:
+        return self.update(
+            repo_id,
+            last_synced_sha=None,
+            last_synced_committed_at=None,
+        )
+
     def link_to_project(
         self, 
         repo_id: int, 
@@ -2,22 +2,32 @@ from datetime import datetime
 from http import HTTPStatus
 from fastapi import FastAPI, HTTPException, Header
 from fastapi.params import Depends
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 import logging
 
 from src.services.internal.process import process_repo
+from src.services.internal.analysis_settings import (
+    AnalysisSettingsNotFound,
+    settings_provider,
+)
+from src.services.external.github_client import rate_limit_metrics
+from src.services.external.git_local import check_remote_url
 from src.adapters.db.base import SessionLocal
 from src.adapters.db.repositories.repository_repo import RepositoryRepository
-from src.core.config import settings
+from src.adapters.db.repositories.ingest_job_repo import IngestJobRepository
+from src.core.config import settings as app_settings
+from src.data.enums.fetch_backend import FetchBackend
+from src.util.github_names import validate_owner, validate_repo
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-app = FastAPI(title=settings.app_name, debug=settings.debug)
+app = FastAPI(title=app_settings.app_name, debug=app_settings.debug)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"], 
@@ -35,6 +45,19 @@ class RepoRequest(BaseModel):
     repo: str
     since: datetime | None = None
     max_commits: int | None = None
+    reanalyse: bool = False
+    backend: FetchBackend = FetchBackend.REST
+    fetch_patches: bool = True
+    # Для backend=git: remote вместо github.com, только из git_allowed_remotes
+    clone_url: str | None = None
+
+    _validate_owner = field_validator("owner")(validate_owner)
+    _validate_repo = field_validator("repo")(validate_repo)
+
+    @field_validator("clone_url")
+    @classmethod
+    def _validate_clone_url(cls, value: str | None) -> str | None:
+        return None if value is None else check_remote_url(value)
 
 
 class UpdateCommitsRequest(BaseModel):
@@ -57,78 +80,157 @@ def get_db():
 def api_process_repo():
     return {"status": "Alive"}
 
+# region metrics
+
+@app.get("/metrics/github/rate-limit")
+def api_github_rate_limit():
+    return {"rate_limit": rate_limit_metrics()}
+
+# endregion
+
 # region repo
 
 @app.post("/repo/init")
 def api_process_repo(
     req: RepoRequest,
-    github_token: str = Header(None, alias="ght"),
+    github_token: str = Header(None, alias="ght"),  # token или tok1,tok2,...
     scope: str = Header(None, alias="acc-scope"),  # username:id
     settings: str = Header(None, alias="analysis-settings"),
 ):
+    """Ставит загрузку в очередь ingest_jobs; выполняет её воркер (python -m src.worker)."""
     if not github_token:
         raise HTTPException(status_code=400, detail="GitHub token header missing")
+    scope_type, scope_id = parse_scope(scope)
     try:
-        scope_type, scope_id = scope.split(":")
-        process_repo_response = process_repo(
-            req.owner,
-            req.repo,
-            token=github_token,
-            scope_type=scope_type,
-            scope_id=scope_id,
-            settings=settings,
-            since=req.since,
-            max_commits=req.max_commits,
-        )
-
-        response = {"status": "success"}
-        response["code"] = HTTPStatus.OK
-        # if int(process_repo_response["new-commits"]) == 0:
-        #     print(process_repo_response["new-commits"])
-        #     response["code"] = HTTPStatus.NO_CONTENT
-        # else:
-        #     print(process_repo_response["new-commits"])
-        #     response["code"] = HTTPStatus.OK
-
-        return JSONResponse(content=response|process_repo_response)
+        with SessionLocal() as session:
+            job = IngestJobRepository(session).enqueue(
+                owner=req.owner,
+                repo=req.repo,
+                scope_type=scope_type,
+                scope_id=scope_id,
+                token=github_token,
+                settings=settings,
+                params=req.model_dump(mode="json", exclude={"owner", "repo"}),
+                max_attempts=app_settings.ingest_max_attempts,
+            )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    return JSONResponse(
+        status_code=HTTPStatus.ACCEPTED,
+        content={
+            "status": "queued",
+            "code": HTTPStatus.ACCEPTED,
+            "job_id": job.id,
+            "repository": req.repo,
+            "owner": req.owner,
+        },
+    )
+
+# endregion
+
+# region jobs
+
+def get_ingest_job(job_id: int):
+    with SessionLocal() as session:
+        job = IngestJobRepository(session).get_by_id(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+def api_get_job(job_id: int):
+    job = get_ingest_job(job_id)
+    return JSONResponse(content=jsonable_encoder({
+        "status": "success",
+        "code": HTTPStatus.OK,
+        "job": {
+            "id": job.id,
+            "status": job.status,
+            "owner": job.owner,
+            "repository": job.repo,
+            "attempts": job.attempts,
+            "max_attempts": job.max_attempts,
+            "progress": job.progress,
+            "result": job.result,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "heartbeat_at": job.heartbeat_at,
+            "finished_at": job.finished_at,
+        },
+    }))
+
+
+@app.get("/jobs/{job_id}/progress")
+def api_get_job_progress(job_id: int):
+    job = get_ingest_job(job_id)
+    return JSONResponse(content=jsonable_encoder({
+        "status": "success",
+        "code": HTTPStatus.OK,
+        "job_id": job.id,
+        "job_status": job.status,
+        "progress": job.progress or {},
+        "heartbeat_at": job.heartbeat_at,
+    }))
+
 # endregion
 
 # region settings
+class AnalysisSettingsRequest(BaseModel):
+    settings: dict
+
+
+def parse_scope(scope: str | None) -> tuple[str, int]:
+    if not scope or ":" not in scope:
+        raise HTTPException(status_code=400, detail="acc-scope header missing")
+    scope_type, scope_id = scope.split(":", 1)
+    try:
+        return scope_type, int(scope_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="acc-scope id must be an integer")
+
+
 @app.get("/settings/")
-def api_process_repo(
-    github_token: str = Header(None, alias="ght"),
+def api_get_settings(
     scope: str = Header(None, alias="acc-scope"),  # username:id
 ):
-    if not github_token:
-        raise HTTPException(status_code=400, detail="GitHub token header missing")
+    scope_type, scope_id = parse_scope(scope)
     try:
-        scope_type, scope_id = scope.split(":")
-        process_repo_response = process_repo(
-            req.owner,
-            req.repo,
-            token=github_token,
-            scope_type=scope_type,
-            scope_id=scope_id,
-            settings=settings,
-            since=req.since,
-            max_commits=req.max_commits,
-        )
+        analysis_settings = settings_provider.get(scope_type, scope_id)
+    except AnalysisSettingsNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        response = {"status": "success"}
-        response["code"] = HTTPStatus.OK
-        # if int(process_repo_response["new-commits"]) == 0:
-        #     print(process_repo_response["new-commits"])
-        #     response["code"] = HTTPStatus.NO_CONTENT
-        # else:
-        #     print(process_repo_response["new-commits"])
-        #     response["code"] = HTTPStatus.OK
+    return JSONResponse(content={
+        "status": "success",
+        "code": HTTPStatus.OK,
+        "settings": analysis_settings.raw,
+    })
 
-        return JSONResponse(content=response|process_repo_response)
+
+@app.put("/settings/")
+def api_update_settings(
+    req: AnalysisSettingsRequest,
+    scope: str = Header(None, alias="acc-scope"),  # username:id
+):
+    scope_type, scope_id = parse_scope(scope)
+    try:
+        with SessionLocal() as session:
+            # Запись кэша области сбрасывается сразу после сохранения
+            analysis_settings = settings_provider.update(
+                scope_type, scope_id, req.settings, session
+            )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    return JSONResponse(content={
+        "status": "success",
+        "code": HTTPStatus.OK,
+        "settings": analysis_settings.raw,
+    })
     
 # endregion
 
@@ -13,7 +13,50 @@ class Settings(BaseSettings):
 
     ignore_file: Path = Path(".dcoignore")
     use_ignore_file: bool = True
-    
+
+    github_api_url: str = "https://api.github.com"
+    github_max_concurrency: int = 8
+    github_max_retries: int = 5
+    github_backoff_base: float = 1.0
+    github_backoff_max: float = 60.0
+    github_rate_limit_reserve: int = 50
+    github_rate_limit_pace_below: int = 500
+    github_cache_enabled: bool = True
+    github_cache_path: Path = Path("cache/github_responses.sqlite3")
+    github_cache_max_bytes: int = 1024 ** 3
+
+    commit_store_enabled: bool = True
+    commit_store_dir: Path = Path("cache/commits")
+    commit_store_max_bytes: int = 2 * 1024 ** 3
+
+    git_mirror_dir: Path = Path("cache/git")
+    # Разрешённые clone_url для backend=git (префиксы: "https://git.example.com/",
+    # "/srv/git/"); пусто — только github.com
+    git_allowed_remotes: list[str] = []
+
+    # Сколько коммитов копится в памяти до записи одной транзакцией
+    db_write_batch_size: int = 200
+    # Первичный импорт репозитория идёт через COPY, пачками по db_copy_batch_size
+    db_copy_first_import: bool = True
+    db_copy_batch_size: int = 2000
+
+    # Процессов для обогащения коммитов; 0 — обогащение в потоке запроса
+    enrichment_workers: int = 0
+    # Сколько коммитов уходит в процесс пула одной задачей
+    enrichment_batch_size: int = 32
+
+    # Очередь загрузки репозиториев (ingest_jobs, воркер src.worker)
+    ingest_poll_interval: float = 2.0
+    # Как часто воркер отмечается и сохраняет прогресс задачи
+    ingest_heartbeat_interval: float = 15.0
+    # Задача без отметки дольше этого считается брошенной и возвращается в очередь
+    ingest_stale_after: float = 300.0
+    ingest_max_attempts: int = 3
+    # Сколько раз коммит из dead letter контрольной точки повторяется, прежде чем остаться в ней
+    ingest_dead_letter_max_attempts: int = 5
+    # Ключ Fernet (или несколько через запятую, первый — текущий), которым токены
+    # задач шифруются в ingest_jobs; один и тот же у API и воркеров
+    ingest_token_key: str = ""
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,272 @@
+"""
+Пачка коммитов в колоночном виде (struct of arrays).
+
+Вместо списка pydantic-моделей Commit/FileChange поля хранятся списками
+примитивов: по одному элементу на коммит и на файл. Файлы всех коммитов
+лежат подряд, file_count[i] — число файлов i-го коммита (-1, если файлы
+не загружались, как Commit.files is None). Языки и типы коммитов
+хранятся кодами — индексами в словарях пачки languages и categories.
+
+Фильтрация, обогащение и запись работают с колонками напрямую; Commit
+собирается только на границах (to_commits, commit).
+"""
+from itertools import compress
+from typing import Callable, Iterable
+
+from src.data.domain.commit import Commit
+from src.data.domain.file_change import FileChange
+
+
+# Поля Commit, которые хранятся как есть
+COMMIT_FIELDS = (
+    "sha",
+    "author_login",
+    "message",
+    "authored_at",
+    "committed_at",
+    "author_name",
+    "author_email",
+    "additions",
+    "deletions",
+    "changes",
+    "parents_count",
+    "files_changed",
+    "is_conventional",
+    "conventional_scope",
+    "is_breaking_change",
+    "is_merge_commit",
+    "is_pr_commit",
+    "is_revert_commit",
+)
+# Поля Commit, которые хранятся кодом из categories
+CATEGORY_FIELDS = ("commit_type", "conventional_type")
+
+# Поля FileChange; в колонках пачки — с префиксом file_
+FILE_FIELDS = (
+    "path",
+    "filename",
+    "patch",
+    "additions",
+    "deletions",
+    "meaningful_additions",
+    "meaningful_deletions",
+)
+FILE_COLUMNS = tuple(f"file_{field}" for field in FILE_FIELDS)
+
+
+class CommitBatch:
+    __slots__ = (
+        *COMMIT_FIELDS,
+        *CATEGORY_FIELDS,
+        "contributor_id",
+        "file_count",
+        *FILE_COLUMNS,
+        "file_language",
+        "categories",
+        "languages",
+        "_category_codes",
+        "_language_codes",
+    )
+
+    def __init__(self):
+        for column in (*COMMIT_FIELDS, *CATEGORY_FIELDS, "contributor_id", "file_count", *FILE_COLUMNS, "file_language"):
+            setattr(self, column, [])
+        # код -> строка; код None — значение не задано
+        self.categories: list[str] = []
+        self.languages: list[str] = []
+        self._category_codes: dict[str, int] = {}
+        self._language_codes: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.sha)
+
+    @classmethod
+    def from_commits(
+        cls,
+        commits: Iterable[Commit],
+        contributor_ids: Iterable[int | None] | None = None,
+    ) -> "CommitBatch":
+        batch = cls()
+        if contributor_ids is None:
+            for commit in commits:
+                batch.append(commit)
+        else:
+            for commit, contributor_id in zip(commits, contributor_ids):
+                batch.append(commit, contributor_id)
+        return batch
+
+    # ----------------------
+    # Коды
+    # ----------------------
+
+    def category_code(self, value: str | None) -> int | None:
+        if value is None:
+            return None
+        code = self._category_codes.get(value)
+        if code is None:
+            code = self._category_codes[value] = len(self.categories)
+            self.categories.append(value)
+        return code
+
+    def language_code(self, value: str | None) -> int | None:
+        if value is None:
+            return None
+        code = self._language_codes.get(value)
+        if code is None:
+            code = self._language_codes[value] = len(self.languages)
+            self.languages.append(value)
+        return code
+
+    def category(self, code: int | None) -> str | None:
+        return None if code is None else self.categories[code]
+
+    def language(self, code: int | None) -> str | None:
+        return None if code is None else self.languages[code]
+
+    # ----------------------
+    # Наполнение
+    # ----------------------
+
+    def append(self, commit: Commit, contributor_id: int | None = None):
+        for field in COMMIT_FIELDS:
+            getattr(self, field).append(getattr(commit, field))
+        for field in CATEGORY_FIELDS:
+            getattr(self, field).append(self.category_code(getattr(commit, field)))
+        self.contributor_id.append(contributor_id)
+
+        if commit.files is None:
+            self.file_count.append(-1)
+            return
+
+        self.file_count.append(len(commit.files))
+        for field, column in zip(FILE_FIELDS, FILE_COLUMNS):
+            getattr(self, column).extend(getattr(f, field) for f in commit.files)
+        self.file_language.extend(self.language_code(f.language) for f in commit.files)
+
+    def extend(self, other: "CommitBatch"):
+        for column in (*COMMIT_FIELDS, "contributor_id", "file_count", *FILE_COLUMNS):
+            getattr(self, column).extend(getattr(other, column))
+        for field in CATEGORY_FIELDS:
+            getattr(self, field).extend(
+                self.category_code(other.category(code)) for code in getattr(other, field)
+            )
+        self.file_language.extend(
+            self.language_code(other.language(code)) for code in other.file_language
+        )
+
+    def select(self, indices: Iterable[int]) -> "CommitBatch":
+        """Новая пачка из коммитов с данными индексами (словари кодов общие по значению)."""
+        indices = list(indices)
+        ranges = self.file_ranges()
+        files = [i for index in indices for i in range(*ranges[index])]
+
+        batch = CommitBatch()
+        for column in (*COMMIT_FIELDS, *CATEGORY_FIELDS, "contributor_id", "file_count"):
+            values = getattr(self, column)
+            setattr(batch, column, [values[index] for index in indices])
+        for column in (*FILE_COLUMNS, "file_language"):
+            values = getattr(self, column)
+            setattr(batch, column, [values[i] for i in files])
+        batch.categories = list(self.categories)
+        batch.languages = list(self.languages)
+        batch._category_codes = dict(self._category_codes)
+        batch._language_codes = dict(self._language_codes)
+        return batch
+
+    # ----------------------
+    # Файлы
+    # ----------------------
+
+    def file_ranges(self) -> list[tuple[int, int]]:
+        """(начало, конец) файлов каждого коммита в колонках file_*."""
+        ranges = []
+        start = 0
+        for count in self.file_count:
+            end = start + max(count, 0)
+            ranges.append((start, end))
+            start = end
+        return ranges
+
+    def filter_files(self, is_allowed: Callable[[str], bool]) -> int:
+        """Оставляет файлы, для пути которых is_allowed истинно; возвращает число удалённых."""
+        keep = [is_allowed(path) for path in self.file_path]
+        removed = keep.count(False)
+        if not removed:
+            return 0
+
+        for i, (start, end) in enumerate(self.file_ranges()):
+            if self.file_count[i] > 0:
+                self.file_count[i] = sum(keep[start:end])
+        for column in (*FILE_COLUMNS, "file_language"):
+            setattr(self, column, list(compress(getattr(self, column), keep)))
+        return removed
+
+    def set_languages(self, languages: Iterable[str | None]):
+        self.file_language = [self.language_code(language) for language in languages]
+
+    # ----------------------
+    # Границы: Commit и строки БД
+    # ----------------------
+
+    def commit(self, index: int) -> Commit:
+        values = {field: getattr(self, field)[index] for field in COMMIT_FIELDS}
+        for field in CATEGORY_FIELDS:
+            values[field] = self.category(getattr(self, field)[index])
+
+        if self.file_count[index] < 0:
+            values["files"] = None
+        else:
+            start, end = self.file_ranges()[index]
+            values["files"] = [self._file_change(i) for i in range(start, end)]
+        return Commit.model_construct(**values)
+
+    def to_commits(self) -> list[Commit]:
+        return [self.commit(index) for index in range(len(self))]
+
+    def _file_change(self, i: int) -> FileChange:
+        values = {field: getattr(self, column)[i] for field, column in zip(FILE_FIELDS, FILE_COLUMNS)}
+        values["language"] = self.language(self.file_language[i])
+        values["language_classifier"] = None
+        return FileChange.model_construct(**values)
+
+    def commit_rows(self, repository_id: int) -> list[dict]:
+        """Строки таблицы commits для CommitBatchWriter."""
+        rows = []
+        for i in range(len(self)):
+            row = {"repository_id": repository_id, "contributor_id": self.contributor_id[i]}
+            for field in COMMIT_FIELDS:
+                row[field] = getattr(self, field)[i]
+            for field in CATEGORY_FIELDS:
+                row[field] = self.category(getattr(self, field)[i])
+            del row["author_login"]
+            rows.append(row)
+        return rows
+
+    def file_rows(self) -> dict[str, list[dict]]:
+        """
+        sha -> строки таблицы commit_files для CommitBatchWriter. Коммиты,
+        файлы которых не загружались (file_count -1), в результат не попадают.
+        """
+        languages = self.languages
+        rows = {}
+        for sha, count, (start, end) in zip(self.sha, self.file_count, self.file_ranges()):
+            if count < 0:
+                continue
+            rows[sha] = [
+                {
+                    "file_path": self.file_path[i],
+                    "additions": self.file_additions[i],
+                    "deletions": self.file_deletions[i],
+                    "changes": (
+                        self.file_additions[i] + self.file_deletions[i]
+                        if self.file_additions[i] is not None and self.file_deletions[i] is not None
+                        else None
+                    ),
+                    "meaningful_additions": self.file_meaningful_additions[i],
+                    "meaningful_deletions": self.file_meaningful_deletions[i],
+                    "language": None if self.file_language[i] is None else languages[self.file_language[i]],
+                    "patch": self.file_patch[i],
+                }
+                for i in range(start, end)
+            ]
+        return rows
@@ -6,6 +6,9 @@ class FileChange(BaseModel):
     patch: str
     additions: int
     deletions: int
+    # Без пустых строк и комментариев (services/internal/github.py)
+    meaningful_additions: int | None = None
+    meaningful_deletions: int | None = None
 
     language: str | None = None
     language_classifier: str | None = None
\ No newline at end of file
@@ -0,0 +1,6 @@
+from enum import Enum
+
+class FetchBackend(Enum):
+    REST = "rest"
+    GRAPHQL = "graphql"
+    GIT = "git"
@@ -387,7 +387,6 @@ FILE_EXTENSIONS = {
     'cc': 'C++',
     'cxx': 'C++',
     'hpp': 'C++',
-    'h': 'C++',
     'c': 'C',
     'h': 'C',
     'cs': 'C#',
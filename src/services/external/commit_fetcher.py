@@ -0,0 +1,129 @@
+"""
+Конкурентная загрузка полных коммитов (/commits/{sha}).
+
+Запросы выполняются пулом фиксированного размера, результаты отдаются
+потребителю по мере готовности, а не после загрузки всех коммитов.
+"""
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator
+
+from src.core.config import settings
+from src.services.external.github_stats_manual import get_commit
+
+
+_DONE = object()
+
+
+def fetch_commits_concurrently(
+    owner,
+    repo,
+    shas: Iterable[str],
+    token=None,
+    concurrency: int | None = None,
+) -> Iterator[tuple[str, dict | None, Exception | None]]:
+    """
+    Возвращает кортежи (sha, commit_json, error) в порядке завершения запросов.
+
+    Итерируемый shas читается лениво, одновременно выполняется не больше
+    concurrency запросов. Ошибка отдельного коммита не прерывает загрузку,
+    а возвращается в поле error.
+    """
+    if concurrency is None:
+        concurrency = settings.github_max_concurrency
+    concurrency = max(1, concurrency)
+
+    # Ограниченная очередь не даёт загрузчику убежать далеко вперёд обработки
+    results: queue.Queue = queue.Queue(maxsize=concurrency * 2)
+    stop = threading.Event()
+
+    worker = threading.Thread(
+        target=_run_loop,
+        args=(owner, repo, shas, token, concurrency, results, stop),
+        name=f"commit-fetcher-{owner}/{repo}",
+        daemon=True,
+    )
+    worker.start()
+
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # Освобождаем место в очереди, чтобы загрузчик мог завершиться
+        while worker.is_alive():
+            try:
+                results.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        worker.join()
+
+
+def _run_loop(owner, repo, shas, token, concurrency, results, stop):
+    executor = ThreadPoolExecutor(
+        max_workers=concurrency + 1, thread_name_prefix="commit-fetch"
+    )
+    try:
+        asyncio.run(
+            _fetch_all(owner, repo, shas, token, concurrency, results, stop, executor)
+        )
+    except BaseException as e:
+        results.put(e)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        results.put(_DONE)
+
+
+async def _fetch_all(owner, repo, shas, token, concurrency, results, stop, executor):
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    pending: set[asyncio.Task] = set()
+    iterator = iter(shas)
+
+    try:
+        while not stop.is_set():
+            # Источник sha может сам ходить в сеть (пагинация), поэтому читаем его вне event loop
+            sha = await loop.run_in_executor(executor, next, iterator, None)
+            if sha is None:
+                break
+
+            await semaphore.acquire()
+            task = asyncio.create_task(
+                _fetch_one(loop, executor, owner, repo, sha, token, results, stop)
+            )
+            task.add_done_callback(lambda t: semaphore.release())
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        if pending:
+            await asyncio.gather(*pending)
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _fetch_one(loop, executor, owner, repo, sha, token, results, stop):
+    if stop.is_set():
+        return
+
+    try:
+        commit_json = await loop.run_in_executor(
+            executor, lambda: get_commit(owner, repo, sha, token=token)
+        )
+        item = (sha, commit_json, None)
+    except Exception as e:
+        item = (sha, None, e)
+
+    while not stop.is_set():
+        try:
+            await loop.run_in_executor(executor, lambda: results.put(item, timeout=0.5))
+            return
+        except queue.Full:
+            continue
@@ -0,0 +1,182 @@
+"""
+Локальное хранилище полных коммитов GitHub (/commits/{sha}).
+
+Содержимое коммита по sha неизменно, поэтому JSON хранится на диске
+в сжатом виде: <root>/<key[:2]>/<key>.json.zst (или .json.gz, если
+zstandard не установлен). Ключ — хэш набора токенов, репозитория и sha,
+как в кэше ответов: коммит приватного репозитория не отдаётся запросу
+с другими токенами или через чужой репозиторий. При превышении лимита
+размера удаляются давно не читавшиеся файлы.
+"""
+import gzip
+import hashlib
+import os
+import re
+import threading
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from src.core.config import settings
+from src.util.json_codec import dumps, loads
+from src.util.logger import logger
+
+
+SHA_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+
+# После вытеснения размер опускается до этой доли лимита, чтобы не чистить на каждой записи
+EVICT_TO_RATIO = 0.9
+
+
+class CommitStore:
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        if zstandard is not None:
+            self.suffix = ".json.zst"
+            self._compress = zstandard.ZstdCompressor(level=10).compress
+        else:
+            self.suffix = ".json.gz"
+            self._compress = lambda data: gzip.compress(data, compresslevel=6)
+
+        self._lock = threading.Lock()
+        self._size = sum(size for _, size, _ in self._scan())
+
+    @staticmethod
+    def is_sha(ref: str) -> bool:
+        return SHA_PATTERN.match(ref) is not None
+
+    @staticmethod
+    def key(scope: str, owner: str, repo: str, sha: str) -> str:
+        # Имена в GitHub регистронезависимы
+        return hashlib.sha256(f"{scope}\n{owner}/{repo}\n{sha}".lower().encode()).hexdigest()
+
+    def _path(self, key: str, suffix: str | None = None) -> Path:
+        return self.root / key[:2] / f"{key}{suffix or self.suffix}"
+
+    def _find(self, key: str) -> Path | None:
+        for suffix in (".json.zst", ".json.gz"):
+            path = self._path(key, suffix)
+            if path.exists():
+                return path
+        return None
+
+    def __contains__(self, key: str) -> bool:
+        return self._find(key) is not None
+
+    def get(self, key: str) -> dict | None:
+        path = self._find(key)
+        if path is None:
+            return None
+
+        try:
+            data = path.read_bytes()
+            if path.name.endswith(".zst"):
+                if zstandard is None:
+                    return None
+                data = zstandard.ZstdDecompressor().decompress(data)
+            else:
+                data = gzip.decompress(data)
+            # mtime служит временем последнего доступа для LRU
+            os.utime(path)
+        except (OSError, EOFError, ValueError) as e:
+            logger.warning(f"Corrupted commit {key} in store: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        return loads(data)
+
+    def put(self, key: str, commit_json: dict):
+        data = self._compress(dumps(commit_json))
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+
+        # Пишем во временный файл и переименовываем, чтобы параллельные читатели не видели обрывков
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        replaced = path.stat().st_size if path.exists() else 0
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._size += len(data) - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        for shard in self.root.iterdir():
+            if not shard.is_dir():
+                continue
+            for path in shard.iterdir():
+                if path.name.endswith((".json.zst", ".json.gz")):
+                    stat = path.stat()
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        files = sorted(self._scan(), key=lambda f: f[2])
+        total = sum(size for _, size, _ in files)
+        target = int(self.max_bytes * EVICT_TO_RATIO)
+
+        removed = 0
+        for path, size, _ in files:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        self._size = total
+        logger.info(f"Commit store: evicted {removed} commits, {total} bytes left")
+
+    def size(self) -> int:
+        return self._size
+
+
+_store: CommitStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_commit_store() -> CommitStore | None:
+    if not settings.commit_store_enabled:
+        return None
+
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CommitStore(settings.commit_store_dir, settings.commit_store_max_bytes)
+        return _store
+
+
+def prewarm_commit_store(owner, repo, shas=None, token=None) -> int:
+    """
+    Загружает в хранилище коммиты, которых там ещё нет.
+
+    Без shas берётся вся история репозитория. Возвращает число загруженных коммитов.
+    """
+    # Импорт здесь: github_stats_manual сам использует хранилище
+    from src.services.external.commit_fetcher import fetch_commits_concurrently
+    from src.services.external.github_client import get_client
+    from src.services.external.github_stats_manual import iter_commits_list
+
+    store = get_commit_store()
+    if store is None:
+        raise ValueError("Commit store is disabled")
+
+    if shas is None:
+        shas = (c["sha"] for c in iter_commits_list(owner, repo, token=token))
+    scope = get_client(token).cache_scope
+    missing = (sha for sha in shas if store.key(scope, owner, repo, sha) not in store)
+
+    fetched = 0
+    for sha, commit_json, error in fetch_commits_concurrently(owner, repo, missing, token=token):
+        if error is not None:
+            logger.error(f"Failed to prewarm commit {sha}: {error}")
+            continue
+        fetched += 1
+
+    logger.info(f"Commit store prewarmed for {owner}/{repo}: {fetched} commits")
+    return fetched
@@ -0,0 +1,321 @@
+"""
+Чтение истории из локального зеркала git-репозитория.
+
+Репозиторий клонируется как bare-зеркало (git clone --mirror), следующие
+запуски делают только git fetch. Коммиты читаются потоком из
+git log --patch и превращаются в те же доменные Commit/FileChange,
+что строит mapper из ответов GitHub API.
+"""
+import base64
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+from src.core.config import settings
+from src.data.domain.commit import Commit
+from src.data.domain.file_change import FileChange
+from src.util.github_names import validate_owner, validate_repo
+from src.util.logger import logger
+
+
+# Разделители полей и записей в --format (в сообщениях коммитов не встречаются)
+FIELD_SEP = "\x1f"
+RECORD_SEP = "\x1e"
+
+LOG_FORMAT = RECORD_SEP + FIELD_SEP.join(
+    ["%H", "%P", "%an", "%ae", "%aI", "%cI", "%B"]
+) + FIELD_SEP
+
+# Токен GitHub уходит только сюда
+GITHUB_REMOTE_PREFIX = "https://github.com/"
+
+
+class GitCommandError(Exception):
+    pass
+
+
+def check_remote_url(remote_url: str) -> str:
+    """
+    clone_url принимается, только если он начинается с одного из
+    git_allowed_remotes: произвольный remote — это чтение локальных путей,
+    file:// и ext:: и запросы во внутреннюю сеть от имени сервера.
+    """
+    if remote_url.startswith("-") or ".." in remote_url:
+        raise ValueError(f"Remote is not allowed: {remote_url!r}")
+    for prefix in settings.git_allowed_remotes:
+        # Префикс без "/" на конце не должен пропускать https://host.evil.com
+        if remote_url == prefix.rstrip("/") or remote_url.startswith(prefix.rstrip("/") + "/"):
+            return remote_url
+    raise ValueError(f"Remote is not allowed: {remote_url!r}")
+
+
+class LocalGitRepository:
+    def __init__(self, remote_url: str, mirror_path: Path, token: str | None = None):
+        self.remote_url = remote_url
+        self.mirror_path = Path(mirror_path)
+        self.token = token
+
+    @classmethod
+    def for_github(cls, owner, repo, token=None, remote_url: str | None = None):
+        # owner и repo — части пути зеркала, ".." не должен выводить из git_mirror_dir
+        mirror_path = Path(settings.git_mirror_dir) / validate_owner(owner) / f"{validate_repo(repo)}.git"
+        if remote_url is None:
+            remote_url = f"{GITHUB_REMOTE_PREFIX}{owner}/{repo}.git"
+        else:
+            remote_url = check_remote_url(remote_url)
+        # Из пула токенов для git достаточно одного
+        if token:
+            token = token.split(",")[0].strip()
+        return cls(remote_url, mirror_path, token=token)
+
+    def _git(self, *args: str, git_dir: bool = True) -> list[str]:
+        cmd = ["git"]
+        if self.token and self.remote_url.startswith(GITHUB_REMOTE_PREFIX):
+            credentials = base64.b64encode(f"x-access-token:{self.token}".encode()).decode()
+            cmd += ["-c", f"http.extraHeader=Authorization: Basic {credentials}"]
+        if git_dir:
+            cmd += ["--git-dir", str(self.mirror_path)]
+        return cmd + list(args)
+
+    def _run(self, *args: str, git_dir: bool = True):
+        result = subprocess.run(
+            self._git(*args, git_dir=git_dir),
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise GitCommandError(result.stderr.strip())
+
+    def sync(self):
+        """Клонирует зеркало при первом запуске, дальше только подтягивает новые объекты."""
+        if (self.mirror_path / "HEAD").exists():
+            logger.info(f"Fetching {self.remote_url} into {self.mirror_path}")
+            self._run("fetch", "--prune", "origin")
+            return
+
+        logger.info(f"Cloning {self.remote_url} into {self.mirror_path}")
+        self.mirror_path.parent.mkdir(parents=True, exist_ok=True)
+        self._run(
+            "clone", "--mirror", "--quiet", "--", self.remote_url, str(self.mirror_path), git_dir=False
+        )
+
+    def iter_commits(
+        self,
+        ref: str = "HEAD",
+        since: datetime | None = None,
+        max_commits: int | None = None,
+        skip: int = 0,
+        position: dict | None = None,
+    ) -> Iterator[Commit]:
+        """
+        Коммиты от новых к старым, с патчами файлов, без загрузки всей истории в память.
+
+        skip пропускает первые коммиты (git log --skip, патчи для них не
+        строятся); в position["cursor"] — число коммитов перед отдаваемым.
+        """
+        args = [
+            "-c", "core.quotePath=false",
+            "log",
+            f"--format={LOG_FORMAT}",
+            "--patch",
+            "--no-color",
+            "--no-ext-diff",
+            # Для merge-коммитов diff с первым родителем, как в GitHub API
+            "--diff-merges=first-parent",
+        ]
+        if since:
+            args.append(f"--since={since.isoformat()}")
+        if max_commits:
+            args.append(f"--max-count={max_commits}")
+        if skip:
+            args.append(f"--skip={skip}")
+        # ref — ревизия, а не опция и не путь
+        args += ["--end-of-options", ref, "--"]
+
+        process = subprocess.Popen(
+            self._git(*args),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        try:
+            if position is None:
+                yield from _parse_log(process.stdout)
+            else:
+                for index, commit in enumerate(_parse_log(process.stdout), start=skip):
+                    position["cursor"] = index
+                    yield commit
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+            stderr = process.stderr.read()
+            process.stderr.close()
+
+        if returncode != 0 and returncode != -13:  # -13: SIGPIPE при раннем выходе
+            raise GitCommandError(stderr.strip())
+
+
+def _parse_log(lines) -> Iterator[Commit]:
+    header: list[str] = []
+    header_fields = 0
+    in_header = False
+    files: list[_FileDiff] = []
+    current: _FileDiff | None = None
+
+    for line in lines:
+        if line.startswith(RECORD_SEP):
+            if header:
+                yield _build_commit(header, files)
+            header, header_fields, files, current = [], 0, [], None
+            line = line[len(RECORD_SEP):]
+            in_header = True
+
+        if in_header:
+            # Сообщение коммита многострочное, заголовок заканчивается на 7-м разделителе
+            header.append(line)
+            header_fields += line.count(FIELD_SEP)
+            if header_fields >= 7:
+                in_header = False
+            continue
+
+        if line.startswith("diff --git "):
+            current = _FileDiff(line)
+            files.append(current)
+        elif current is not None:
+            current.feed(line)
+
+    if header:
+        yield _build_commit(header, files)
+
+
+def _build_commit(header: list[str], files: list["_FileDiff"]) -> Commit:
+    sha, parents, author_name, author_email, authored_at, committed_at, message, _ = (
+        "".join(header).split(FIELD_SEP)
+    )
+
+    file_changes = [
+        FileChange(
+            path=f.path,
+            filename=f.path.split("/")[-1],
+            patch=f.patch,
+            additions=f.additions,
+            deletions=f.deletions,
+        )
+        for f in files
+        # GitHub не отдаёт patch для бинарных и пустых изменений, mapper такие файлы пропускает
+        if f.patch
+    ]
+    additions = sum(f.additions for f in files)
+    deletions = sum(f.deletions for f in files)
+
+    return Commit(
+        sha=sha,
+        # Логина GitHub в локальной истории нет
+        author_login=None,
+        message=message.rstrip("\n"),
+        authored_at=authored_at,
+        committed_at=committed_at,
+        author_name=author_name,
+        author_email=author_email,
+        additions=additions,
+        deletions=deletions,
+        changes=additions + deletions,
+        parents_count=len(parents.split()),
+        files_changed=len(files),
+        files=file_changes,
+    )
+
+
+class _FileDiff:
+    """Один файл из вывода git log --patch."""
+
+    def __init__(self, diff_header: str):
+        # diff --git a/<path> b/<path>; точный путь уточняется по строкам ---/+++
+        paths = diff_header[len("diff --git "):].rstrip("\n")
+        if paths.endswith('"'):
+            # Внутри кавычек '"' экранирована, поэтому ' "' — начало пути b/
+            self.path = _diff_path(paths[paths.rfind(' "') + 1:], "b/")
+        else:
+            self.path = _diff_path(paths.split(" b/", 1)[-1])
+        self.additions = 0
+        self.deletions = 0
+        self._hunks: list[str] = []
+        self._in_hunks = False
+
+    def feed(self, line: str):
+        if not self._in_hunks:
+            if line.startswith("+++ ") and not line.startswith("+++ /dev/null"):
+                self.path = _diff_path(line[len("+++ "):], "b/")
+            elif line.startswith("--- ") and not line.startswith("--- /dev/null"):
+                self.path = _diff_path(line[len("--- "):], "a/")
+            elif line.startswith("rename to "):
+                self.path = _diff_path(line[len("rename to "):])
+            elif line.startswith("@@"):
+                self._in_hunks = True
+
+            if not self._in_hunks:
+                return
+
+        if line == "\n":
+            # Пустая строка-разделитель перед следующим коммитом
+            return
+
+        self._hunks.append(line)
+        if line.startswith("+"):
+            self.additions += 1
+        elif line.startswith("-"):
+            self.deletions += 1
+
+    @property
+    def patch(self) -> str:
+        # В GitHub API patch начинается с первого @@ и не содержит завершающего перевода строки
+        return "".join(self._hunks).rstrip("\n")
+
+
+# Экранирование в путях, которые git берёт в кавычки (quote_c_style)
+C_ESCAPES = {
+    "a": 0x07, "b": 0x08, "f": 0x0C, "n": 0x0A, "r": 0x0D, "t": 0x09, "v": 0x0B,
+    '"': 0x22, "\\": 0x5C,
+}
+
+
+def _diff_path(raw: str, prefix: str | None = None) -> str:
+    """
+    Путь из строки diff: без перевода строки и табуляции, которую git
+    добавляет после имени с пробелом в ---/+++, без кавычек и
+    экранирования C-стиля и без префикса a/ или b/.
+    """
+    path = raw.rstrip("\n")
+    if path.endswith("\t"):
+        path = path[:-1]
+    if len(path) > 1 and path.startswith('"') and path.endswith('"'):
+        path = _unquote_c_style(path[1:-1])
+    if prefix and path.startswith(prefix):
+        path = path[len(prefix):]
+    return path
+
+
+def _unquote_c_style(quoted: str) -> str:
+    # Восьмеричные \NNN — байты UTF-8, поэтому путь собирается в bytes
+    result = bytearray()
+    i = 0
+    while i < len(quoted):
+        char = quoted[i]
+        if char != "\\" or i + 1 == len(quoted):
+            result += char.encode("utf-8")
+            i += 1
+            continue
+        escaped = quoted[i + 1]
+        if escaped in C_ESCAPES:
+            result.append(C_ESCAPES[escaped])
+            i += 2
+        elif quoted[i + 1:i + 4].isdigit():
+            result.append(int(quoted[i + 1:i + 4], 8) & 0xFF)
+            i += 4
+        else:
+            result += char.encode("utf-8")
+            i += 1
+    return result.decode("utf-8", errors="replace")
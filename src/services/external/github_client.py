@@ -0,0 +1,233 @@
+"""
+HTTP-клиент GitHub REST API.
+
+Клиент работает с пулом токенов: у каждого токена своя keep-alive сессия
+с пулом соединений и заголовками, собранными один раз. Запрос уходит через
+токен с наибольшим остатком лимита, проходит через его планировщик rate
+limit и повторяется при 403/429/5xx. GET-ответы кэшируются и
+перепроверяются условными запросами (If-None-Match / If-Modified-Since).
+"""
+import hashlib
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from src.core.config import settings
+from src.services.external.response_cache import ResponseCache, get_response_cache
+from src.services.external.token_pool import PooledToken, TokenPool, token_budgets
+from src.util.json_codec import loads
+from src.util.logger import logger
+
+
+load_dotenv()
+
+API_VERSION = "2022-11-28"
+DEFAULT_TIMEOUT = 60
+
+
+class GitHubGraphQLError(Exception):
+    def __init__(self, errors: list[dict]):
+        self.errors = errors
+        super().__init__("; ".join(e.get("message", str(e)) for e in errors))
+
+
+class GitHubClient:
+    def __init__(
+        self,
+        tokens: str | list[str],
+        pool_size: int | None = None,
+        max_retries: int | None = None,
+        cache: ResponseCache | None = None,
+    ):
+        if isinstance(tokens, str):
+            tokens = TokenPool.parse(tokens)
+        if pool_size is None:
+            # Пул должен вмещать все конкурентные запросы загрузчика коммитов
+            pool_size = settings.github_max_concurrency + 2
+
+        self.tokens = TokenPool(tokens)
+        self.max_retries = settings.github_max_retries if max_retries is None else max_retries
+        self.base_url = settings.github_api_url.rstrip("/")
+
+        if cache is None and settings.github_cache_enabled:
+            cache = get_response_cache(settings.github_cache_path, settings.github_cache_max_bytes)
+        self.cache = cache
+        # Кэш разделяется по набору токенов: приватные данные не должны утекать между ними
+        self.cache_scope = hashlib.sha256(
+            "\n".join(sorted(p.token for p in self.tokens.tokens)).encode()
+        ).hexdigest()
+
+        self._sessions = {
+            pooled.token: self._build_session(pooled.token, pool_size)
+            for pooled in self.tokens.tokens
+        }
+
+    @staticmethod
+    def _build_session(token: str, pool_size: int) -> requests.Session:
+        session = requests.Session()
+        session.headers.update({
+            "Authorization": f"Bearer {token}",
+            "X-GitHub-Api-Version": API_VERSION,
+            "Accept": "application/vnd.github+json",
+            "Accept-Encoding": "gzip",
+        })
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(
+        self,
+        path: str,
+        params: dict | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        use_cache: bool = True,
+    ) -> requests.Response:
+        url = self.url(path)
+
+        cache_key = cached = None
+        conditional_headers = {}
+        if self.cache is not None and use_cache:
+            cache_key = ResponseCache.key(self.cache_scope, url, params)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if cached.immutable:
+                    return cached.to_response()
+                if cached.etag:
+                    conditional_headers["If-None-Match"] = cached.etag
+                if cached.last_modified:
+                    conditional_headers["If-Modified-Since"] = cached.last_modified
+
+        response = self._request(
+            "GET", url, params=params, headers=conditional_headers, timeout=timeout
+        )
+
+        if response.status_code == 304 and cached is not None:
+            self.cache.touch(cache_key)
+            return cached.to_response()
+
+        response.raise_for_status()
+        if cache_key is not None:
+            self.cache.put(cache_key, response)
+        return response
+
+    def graphql(self, query: str, variables: dict | None = None) -> dict:
+        """POST /graphql, возвращает поле data ответа."""
+        response = self._request(
+            "POST",
+            self.url("graphql"),
+            json={"query": query, "variables": variables or {}},
+            resource="graphql",
+            timeout=DEFAULT_TIMEOUT,
+        )
+        response.raise_for_status()
+
+        payload = response.json()
+        if payload.get("errors"):
+            raise GitHubGraphQLError(payload["errors"])
+        return payload["data"]
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        resource: str = "core",
+        timeout: float = DEFAULT_TIMEOUT,
+        **kwargs,
+    ) -> requests.Response:
+        for attempt in range(self.max_retries + 1):
+            pooled = self.tokens.acquire(resource)
+            rate_limit = pooled.rate_limit_for(resource)
+            rate_limit.wait()
+
+            try:
+                response = self._sessions[pooled.token].request(
+                    method, url, timeout=timeout, **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = rate_limit.retry_delay(attempt)
+                logger.warning(f"{method} {url} failed ({e}), retry in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            rate_limit.update(response)
+
+            if rate_limit.is_retryable(response) and attempt < self.max_retries:
+                self._wait_before_retry(pooled, resource, method, url, response, attempt)
+                continue
+
+            return response
+
+    def _wait_before_retry(
+        self,
+        pooled: PooledToken,
+        resource: str,
+        method: str,
+        url: str,
+        response: requests.Response,
+        attempt: int,
+    ):
+        delay = pooled.rate_limit_for(resource).retry_delay(attempt, response)
+
+        if response.status_code in (403, 429) and len(self.tokens.tokens) > 1:
+            # Лимит токена исчерпан — он уходит на cool-down, повтор идёт через другой токен
+            self.tokens.cool_down(pooled, delay, resource)
+            logger.warning(
+                f"{method} {url} returned {response.status_code}, "
+                f"token {pooled.masked} cooling down for {delay:.1f}s"
+            )
+            return
+
+        logger.warning(
+            f"{method} {url} returned {response.status_code}, retry in {delay:.1f}s"
+        )
+        time.sleep(delay)
+
+    def get_json(self, path: str, params: dict | None = None, use_cache: bool = True):
+        return loads(self.get(path, params=params, use_cache=use_cache).content)
+
+    def close(self):
+        for session in self._sessions.values():
+            session.close()
+
+
+_clients: dict[tuple[str, ...], GitHubClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(token: str | list[str] | None = None) -> GitHubClient:
+    """
+    Возвращает общий клиент для набора токенов.
+
+    token — один токен, список или строка "tok1,tok2" (заголовок ght).
+    По умолчанию берутся GITHUB_TOKENS (через запятую) или GITHUB_TOKEN из .env.
+    """
+    if token is None:
+        token = os.getenv("GITHUB_TOKENS") or os.getenv("GITHUB_TOKEN")
+    if not token:
+        raise ValueError("GITHUB_TOKEN not found")
+
+    tokens = TokenPool.parse(token) if isinstance(token, str) else list(token)
+    key = tuple(sorted(set(tokens)))
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = GitHubClient(tokens)
+            _clients[key] = client
+        return client
+
+
+def rate_limit_metrics() -> list[dict]:
+    """Текущий бюджет rate limit по каждому токену (токен маскируется)."""
+    return token_budgets()
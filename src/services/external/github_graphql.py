@@ -0,0 +1,130 @@
+"""
+Загрузка истории коммитов через GitHub GraphQL API.
+
+Один запрос возвращает до 100 коммитов вместе со статистикой,
+родителями, автором и сообщением — без отдельного /commits/{sha}
+на каждый коммит. Патчи файлов GraphQL не отдаёт, за ними нужно
+идти в REST.
+"""
+from datetime import datetime
+from typing import Iterator
+
+from src.services.external.github_client import get_client
+
+
+PAGE_SIZE = 100
+
+HISTORY_FIELDS = """
+history(first: $pageSize, after: $cursor, since: $since) {
+  pageInfo {
+    hasNextPage
+    endCursor
+  }
+  nodes {
+    oid
+    message
+    additions
+    deletions
+    changedFilesIfAvailable
+    authoredDate
+    committedDate
+    author {
+      name
+      email
+      user {
+        login
+        databaseId
+      }
+    }
+    parents {
+      totalCount
+    }
+  }
+}
+"""
+
+HISTORY_QUERY = """
+query($owner: String!, $name: String!, $pageSize: Int!, $cursor: String, $since: GitTimestamp) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          %s
+        }
+      }
+    }
+  }
+}
+""" % HISTORY_FIELDS
+
+# История от заданного коммита: продолжение прерванной загрузки не
+# сдвигается от коммитов, появившихся в ветке после её начала
+HEAD_HISTORY_QUERY = """
+query($owner: String!, $name: String!, $head: GitObjectID!, $pageSize: Int!, $cursor: String, $since: GitTimestamp) {
+  repository(owner: $owner, name: $name) {
+    object(oid: $head) {
+      ... on Commit {
+        %s
+      }
+    }
+  }
+}
+""" % HISTORY_FIELDS
+
+
+def iter_commit_history(
+    owner,
+    repo,
+    token=None,
+    since: datetime | None = None,
+    max_commits: int | None = None,
+    head: str | None = None,
+    cursor: str | None = None,
+    position: dict | None = None,
+) -> Iterator[dict]:
+    """
+    Коммиты ветки по умолчанию (узлы GraphQL Commit), от новых к старым.
+
+    head — история от этого коммита вместо ветки, cursor — продолжение
+    после сохранённой страницы. В position["cursor"] — курсор, с которого
+    запрошена страница отдаваемого узла.
+    """
+    client = get_client(token)
+
+    variables = {
+        "owner": owner,
+        "name": repo,
+        "pageSize": PAGE_SIZE,
+        "cursor": cursor,
+        "since": since.isoformat() if since else None,
+    }
+    if head:
+        variables["head"] = head
+
+    fetched = 0
+    while True:
+        data = client.graphql(HEAD_HISTORY_QUERY if head else HISTORY_QUERY, variables)
+
+        repository = data.get("repository") or {}
+        if head:
+            target = repository.get("object")
+        else:
+            target = (repository.get("defaultBranchRef") or {}).get("target")
+        if not target:
+            # Пустой репозиторий без веток
+            return
+
+        if position is not None:
+            position["cursor"] = variables["cursor"]
+
+        history = target["history"]
+        for node in history["nodes"]:
+            yield node
+            fetched += 1
+            if max_commits and fetched >= max_commits:
+                return
+
+        page_info = history["pageInfo"]
+        if not page_info["hasNextPage"]:
+            return
+        variables["cursor"] = page_info["endCursor"]
@@ -1,137 +1,116 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import os
-import time
-import requests
-import json
+from typing import Iterator
 
-from dotenv import load_dotenv
-from src.util.mapper import single_commit_json_to_dto
+from src.services.external.commit_store import get_commit_store
+from src.services.external.github_client import get_client
+from src.util.logger import logger
 
 
-load_dotenv()
+COMMITS_PER_PAGE = 100
 
 
-def get_commits_list(
+def iter_commits_list(
     owner,
     repo,
     token=None,
     since: datetime | None = None,
     max_commits: int | None = None,
-):
-    if token is None:
-        token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        raise ValueError("GITHUB_TOKEN not found")
-
-    url = f"https://api.github.com/repos/{owner}/{repo}/commits"
-    headers = {
-        "Authorization": f"token {token}",
-        "X-GitHub-Api-Version": "2022-11-28",
-        "Accept": "application/vnd.github.v3+json",
-    }
-
-    all_commits = []
-    page = 1
-    per_page = 100
-
-    while True:
-        params = {
-            "page": page,
-            "per_page": per_page,
-        }
-
-        if since:
-            params["since"] = since.isoformat()
-
-        for attempt in range(3):
-            try:
-                response = requests.get(
-                    url,
-                    headers=headers,
-                    params=params,
-                    timeout=60,
-                )
-                response.raise_for_status()
+    head: str | None = None,
+    start_page: int = 1,
+    position: dict | None = None,
+) -> Iterator[dict]:
+    """
+    Сводки коммитов (/commits) постранично, от новых к старым.
+
+    Пока потребитель обрабатывает текущую страницу, следующая уже
+    загружается в фоне. В памяти держится не больше двух страниц.
+
+    head закрепляет историю за коммитом (sha=...), чтобы номера страниц
+    не сдвигались от новых коммитов; start_page продолжает с сохранённой
+    страницы. В position["cursor"] — номер страницы отдаваемой сводки.
+    """
+    client = get_client(token)
+    path = f"repos/{owner}/{repo}/commits"
+
+    params = {"per_page": COMMITS_PER_PAGE}
+    if since:
+        params["since"] = since.isoformat()
+    if head:
+        params["sha"] = head
+
+    def fetch_page(page):
+        return client.get(path, params={**params, "page": page})
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="commits-page")
+    page = max(start_page, 1)
+    next_page = executor.submit(fetch_page, page)
+    yielded = 0
+
+    try:
+        while next_page is not None:
+            response = next_page.result()
+            commits = response.json()
+            if not commits:
                 break
-            except requests.RequestException as e:
-                if attempt == 2:
-                    raise
-                time.sleep(5)
 
-        commits = response.json()
-        if not commits:
-            break
+            next_page = None
+            limit_reached = max_commits and yielded + len(commits) >= max_commits
+            if "next" in response.links and not limit_reached:
+                next_page = executor.submit(fetch_page, page + 1)
 
-        for commit in commits:
-            all_commits.append(commit)
-            if max_commits and len(all_commits) >= max_commits:
-                return all_commits
+            logger.info(f"Retrieved page {page}: {len(commits)} commits")
+            if position is not None:
+                position["cursor"] = page
 
-        print(f"Retrieved page {page}: {len(commits)} commits")
+            for commit in commits:
+                yield commit
+                yielded += 1
+                if max_commits and yielded >= max_commits:
+                    return
 
-        if "next" in response.links:
             page += 1
-        else:
-            break
+    finally:
+        # Потребитель мог остановиться раньше — загруженная наперёд страница не нужна
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.info(f"Total commits retrieved: {yielded}")
 
-    print(f"Total commits retrieved: {len(all_commits)}")
-    return all_commits
 
+def get_commits_list(
+    owner,
+    repo,
+    token=None,
+    since: datetime | None = None,
+    max_commits: int | None = None,
+) -> list[dict]:
+    return list(
+        iter_commits_list(owner, repo, token=token, since=since, max_commits=max_commits)
+    )
 
 
 def get_commit(owner, repo, ref, token=None):
-    if token is None:
-        token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        raise ValueError("GITHUB_TOKEN not found in .env file")
-
-    url = f"https://api.github.com/repos/{owner}/{repo}/commits/{ref}"
-    headers = {
-        "Authorization": f"token {token}",
-        "X-GitHub-Api-Version": "2022-11-28",
-        "Accept": "application/vnd.github.v3+json",
-    }
+    client = get_client(token)
+    store = get_commit_store()
+    if store is None or not store.is_sha(ref):
+        return client.get_json(f"repos/{owner}/{repo}/commits/{ref}")
 
-    response = requests.get(url, headers=headers, timeout=60)
-    response.raise_for_status()
-    return response.json()
+    key = store.key(client.cache_scope, owner, repo, ref)
+    commit = store.get(key)
+    if commit is None:
+        # Коммит хранится в CommitStore, дублировать его в кэше ответов не нужно
+        commit = client.get_json(f"repos/{owner}/{repo}/commits/{ref}", use_cache=False)
+        store.put(key, commit)
+    return commit
 
 
 def compare_commit(owner, repo, basehead, token=None):
-    if token is None:
-        token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        raise ValueError("GITHUB_TOKEN not found in .env file")
-
-    url = f"https://api.github.com/repos/{owner}/{repo}/compare/{basehead}"
-    headers = {
-        "Authorization": f"token {token}",
-        "X-GitHub-Api-Version": "2022-11-28",
-        "Accept": "application/vnd.github.v3+json",
-    }
-
-    response = requests.get(url, headers=headers, timeout=60)
-    response.raise_for_status()
-    return json.loads(response.json())
+    client = get_client(token)
+    return client.get_json(f"repos/{owner}/{repo}/compare/{basehead}")
 
 
 def get_contributors(owner, repo, token=None):
-
-    if token is None:
-        token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        raise ValueError("GITHUB_TOKEN not found in .env file")
-
-    url = f"https://api.github.com/repos/{owner}/{repo}/contributors"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "X-GitHub-Api-Version": "2022-11-28",
-        "Accept": "application/vnd.github+json"
-    }
-
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    client = get_client(token)
+    return client.get_json(f"repos/{owner}/{repo}/contributors")
 
 
 
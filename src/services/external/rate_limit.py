@@ -0,0 +1,158 @@
+"""
+Планировщик запросов к GitHub с учётом rate limit.
+
+Читает X-RateLimit-* и Retry-After из ответов, распределяет остаток бюджета
+до момента сброса и считает задержки для повторов (экспоненциальный backoff
+с jitter).
+"""
+import random
+import threading
+import time
+
+import requests
+
+from src.core.config import settings
+from src.util.logger import logger
+
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateLimitScheduler:
+    def __init__(
+        self,
+        reserve: int | None = None,
+        pace_below: int | None = None,
+        backoff_base: float | None = None,
+        backoff_max: float | None = None,
+    ):
+        self.reserve = settings.github_rate_limit_reserve if reserve is None else reserve
+        self.pace_below = settings.github_rate_limit_pace_below if pace_below is None else pace_below
+        self.backoff_base = settings.github_backoff_base if backoff_base is None else backoff_base
+        self.backoff_max = settings.github_backoff_max if backoff_max is None else backoff_max
+
+        self.limit: int | None = None
+        self.remaining: int | None = None
+        self.reset_at: float | None = None
+        self.blocked_until: float = 0.0
+
+        self._next_slot: float = 0.0
+        self._lock = threading.Lock()
+
+    # ----------------------
+    # Пейсинг
+    # ----------------------
+    def wait(self):
+        """Блокирует поток до момента, когда запрос можно отправить."""
+        with self._lock:
+            now = time.time()
+            send_at = max(now, self.blocked_until)
+
+            if self.remaining is not None and self.reset_at is not None and self.reset_at > now:
+                if self.remaining <= self.reserve:
+                    # Бюджет исчерпан до резерва — ждём сброса окна
+                    send_at = max(send_at, self.reset_at)
+                elif self.remaining <= self.pace_below:
+                    # Мало запросов осталось — распределяем их равномерно до сброса
+                    interval = (self.reset_at - now) / (self.remaining - self.reserve)
+                    send_at = max(send_at, self._next_slot)
+                    self._next_slot = send_at + interval
+
+                # Учитываем запрос заранее, чтобы параллельные потоки не видели устаревший остаток
+                self.remaining -= 1
+
+        delay = send_at - time.time()
+        if delay > 0:
+            if delay > 1:
+                logger.info(f"GitHub rate limit: waiting {delay:.1f}s")
+            time.sleep(delay)
+
+    def update(self, response: requests.Response):
+        """Обновляет бюджет по заголовкам ответа."""
+        headers = response.headers
+
+        if response.status_code == 304:
+            # Условные запросы с 304 не расходуют лимит
+            with self._lock:
+                if self.remaining is not None:
+                    self.remaining += 1
+            return
+
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        limit = headers.get("X-RateLimit-Limit")
+
+        with self._lock:
+            if limit is not None:
+                self.limit = int(limit)
+
+            if remaining is not None and reset is not None:
+                remaining, reset = int(remaining), float(reset)
+                if self.reset_at is None or reset > self.reset_at:
+                    self.reset_at = reset
+                    self.remaining = remaining
+                    self._next_slot = 0.0
+                elif reset == self.reset_at:
+                    # Ответы параллельных запросов приходят не по порядку
+                    self.remaining = min(self.remaining, remaining)
+
+        retry_after = self._retry_after(response)
+        if retry_after is not None:
+            self.block_for(retry_after)
+
+    def block_for(self, seconds: float):
+        """Запрещает запросы на seconds секунд (Retry-After, cool-down токена)."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.time() + seconds)
+
+    # ----------------------
+    # Повторы
+    # ----------------------
+    def is_retryable(self, response: requests.Response) -> bool:
+        if response.status_code in RETRYABLE_STATUSES:
+            return True
+        if response.status_code == 403:
+            # 403 бывает и при нехватке прав — повторяем только при исчерпанном лимите
+            return (
+                response.headers.get("X-RateLimit-Remaining") == "0"
+                or "Retry-After" in response.headers
+                or "rate limit" in response.text.lower()
+            )
+        return False
+
+    def retry_delay(self, attempt: int, response: requests.Response | None = None) -> float:
+        """Задержка перед повтором номер attempt (с нуля)."""
+        if response is not None:
+            retry_after = self._retry_after(response)
+            if retry_after is not None:
+                return retry_after
+
+            if response.headers.get("X-RateLimit-Remaining") == "0":
+                reset = response.headers.get("X-RateLimit-Reset")
+                if reset is not None:
+                    return max(0.0, float(reset) - time.time()) + 1
+
+        # Full jitter: равномерно в [0, base * 2^attempt]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> float | None:
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None
+
+    # ----------------------
+    # Метрика
+    # ----------------------
+    def budget(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "remaining": self.remaining,
+                "reset_at": self.reset_at,
+                "blocked_until": self.blocked_until if self.blocked_until > time.time() else None,
+            }
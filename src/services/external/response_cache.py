@@ -0,0 +1,221 @@
+"""
+Персистентный кэш ответов GitHub для условных запросов.
+
+Хранит тело ответа вместе с ETag/Last-Modified, ключ — URL с параметрами
+и область токенов клиента. Ответы, которые не могут измениться (коммит по
+полному sha), отдаются из кэша без запроса.
+
+Размер кэша ограничен max_bytes: при превышении удаляются записи, дольше
+всего не записывавшиеся и не перепроверявшиеся (updated_at). Файл общий
+для процессов API и воркеров, поэтому размер, который считает процесс,
+периодически сверяется с БД.
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src.util.logger import logger
+
+
+# /repos/{owner}/{repo}/commits/{sha} — содержимое коммита по sha неизменно
+IMMUTABLE_PATH = re.compile(r"/repos/[^/]+/[^/]+/commits/[0-9a-f]{40}$")
+
+# Заголовки, без которых ответ из кэша нельзя использовать (пагинация по Link)
+STORED_HEADERS = ("Content-Type", "Link", "ETag", "Last-Modified")
+
+# После вытеснения размер опускается до этой доли лимита, чтобы не чистить на каждой записи
+EVICT_TO_RATIO = 0.9
+# Через сколько записей размер пересчитывается по БД (другие процессы тоже пишут)
+RESYNC_EVERY = 1000
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    body: bytes
+    headers: dict
+    immutable: bool
+
+    @property
+    def etag(self) -> str | None:
+        return self.headers.get("ETag")
+
+    @property
+    def last_modified(self) -> str | None:
+        return self.headers.get("Last-Modified")
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = "utf-8"
+        response._content = self.body
+        response.from_cache = True
+        return response
+
+
+class ResponseCache:
+    def __init__(self, path: Path, max_bytes: int):
+        self.max_bytes = max_bytes
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key         TEXT PRIMARY KEY,
+                url         TEXT NOT NULL,
+                headers     TEXT NOT NULL,
+                body        BLOB NOT NULL,
+                immutable   INTEGER NOT NULL DEFAULT 0,
+                updated_at  REAL NOT NULL,
+                size        INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Кэш, созданный до ограничения размера: колонки size ещё нет
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        if "size" not in columns:
+            self._conn.execute("ALTER TABLE responses ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE responses SET size = length(body) + length(headers)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_updated_at ON responses(updated_at)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._size = self._stored_size()
+        self._writes = 0
+
+    @staticmethod
+    def key(scope: str, url: str, params: dict | None = None) -> str:
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{scope}\n{url}?{query}".encode()).hexdigest()
+
+    @staticmethod
+    def is_immutable(url: str) -> bool:
+        return IMMUTABLE_PATH.search(url) is not None
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, headers, body, immutable FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        url, headers, body, immutable = row
+        return CachedResponse(
+            url=url,
+            body=zlib.decompress(body),
+            headers=json.loads(headers),
+            immutable=bool(immutable),
+        )
+
+    def put(self, key: str, response: requests.Response) -> bool:
+        """Сохраняет ответ, если его можно будет перепроверить или он неизменен."""
+        immutable = self.is_immutable(response.url.split("?")[0])
+        headers = {
+            name: response.headers[name]
+            for name in STORED_HEADERS
+            if name in response.headers
+        }
+        if not immutable and "ETag" not in headers and "Last-Modified" not in headers:
+            return False
+
+        headers = json.dumps(headers)
+        body = zlib.compress(response.content)
+        size = len(body) + len(headers)
+
+        with self._lock:
+            replaced = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                """
+                INSERT INTO responses (key, url, headers, body, immutable, updated_at, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    url = excluded.url,
+                    headers = excluded.headers,
+                    body = excluded.body,
+                    immutable = excluded.immutable,
+                    updated_at = excluded.updated_at,
+                    size = excluded.size
+                """,
+                (
+                    key,
+                    response.url,
+                    headers,
+                    body,
+                    int(immutable),
+                    time.time(),
+                    size,
+                ),
+            )
+            self._conn.commit()
+
+            self._size += size - (replaced[0] if replaced else 0)
+            self._writes += 1
+            if self._writes % RESYNC_EVERY == 0:
+                self._size = self._stored_size()
+            if self._size > self.max_bytes:
+                self._size = self._stored_size()
+                if self._size > self.max_bytes:
+                    self._evict()
+        return True
+
+    def touch(self, key: str):
+        """Ответ перепроверен (304): запись актуальна и не должна вытесняться первой."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET updated_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+
+    def _stored_size(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        target = int(self.max_bytes * EVICT_TO_RATIO)
+        total = self._size
+        keys = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY updated_at"
+        ):
+            if total <= target:
+                break
+            keys.append((key,))
+            total -= size
+
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+        self._conn.commit()
+        self._size = total
+        logger.info(f"Response cache: evicted {len(keys)} responses, {total} bytes left")
+
+    def size(self) -> int:
+        return self._size
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache(path: Path, max_bytes: int) -> ResponseCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(path, max_bytes)
+        return _cache
@@ -0,0 +1,107 @@
+"""
+Пул токенов GitHub.
+
+Каждый токен имеет свой бюджет rate limit. Запрос выдаётся токену с
+наибольшим остатком, токены с исчерпанным лимитом уходят на cool-down
+до сброса окна.
+"""
+import threading
+import time
+
+from src.services.external.rate_limit import RateLimitScheduler
+
+
+class PooledToken:
+    def __init__(self, token: str):
+        self.token = token
+        # У REST (core) и GraphQL API раздельные лимиты
+        self.rate_limits: dict[str, RateLimitScheduler] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def masked(self) -> str:
+        return f"...{self.token[-4:]}"
+
+    @property
+    def rate_limit(self) -> RateLimitScheduler:
+        return self.rate_limit_for("core")
+
+    def rate_limit_for(self, resource: str) -> RateLimitScheduler:
+        with self._lock:
+            scheduler = self.rate_limits.get(resource)
+            if scheduler is None:
+                scheduler = RateLimitScheduler()
+                self.rate_limits[resource] = scheduler
+            return scheduler
+
+    def available_at(self, now: float, resource: str = "core") -> float:
+        """Момент, начиная с которого токен можно использовать без ожидания."""
+        rl = self.rate_limit_for(resource)
+        available_at = max(now, rl.blocked_until)
+        if (
+            rl.remaining is not None
+            and rl.reset_at is not None
+            and rl.reset_at > now
+            and rl.remaining <= rl.reserve
+        ):
+            available_at = max(available_at, rl.reset_at)
+        return available_at
+
+    def score(self, resource: str = "core") -> float:
+        # Неизвестный остаток (токен ещё не использовался) считаем максимальным
+        remaining = self.rate_limit_for(resource).remaining
+        return float("inf") if remaining is None else remaining
+
+
+# Бюджет принадлежит токену, а не пулу: один токен может входить в несколько пулов
+_known_tokens: dict[str, PooledToken] = {}
+_known_tokens_lock = threading.Lock()
+
+
+def _shared_token(token: str) -> PooledToken:
+    with _known_tokens_lock:
+        pooled = _known_tokens.get(token)
+        if pooled is None:
+            pooled = PooledToken(token)
+            _known_tokens[token] = pooled
+        return pooled
+
+
+def token_budgets() -> list[dict]:
+    """Бюджет rate limit по всем использованным токенам."""
+    with _known_tokens_lock:
+        tokens = list(_known_tokens.values())
+    return [
+        {"token": t.masked, "resource": resource} | rl.budget()
+        for t in tokens
+        for resource, rl in list(t.rate_limits.items())
+    ]
+
+
+class TokenPool:
+    def __init__(self, tokens: list[str]):
+        tokens = list(dict.fromkeys(t.strip() for t in tokens if t and t.strip()))
+        if not tokens:
+            raise ValueError("GitHub token pool is empty")
+
+        self.tokens = [_shared_token(t) for t in tokens]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, value: str) -> list[str]:
+        """Токены из строки вида "tok1,tok2" (заголовок ght, GITHUB_TOKENS)."""
+        return [t.strip() for t in value.split(",") if t.strip()]
+
+    def acquire(self, resource: str = "core") -> PooledToken:
+        """Токен с наибольшим остатком среди доступных прямо сейчас."""
+        with self._lock:
+            now = time.time()
+            ready = [t for t in self.tokens if t.available_at(now, resource) <= now]
+            if ready:
+                return max(ready, key=lambda t: t.score(resource))
+
+            # Все на cool-down — берём тот, что освободится раньше (ожидание сделает его планировщик)
+            return min(self.tokens, key=lambda t: t.available_at(now, resource))
+
+    def cool_down(self, pooled: PooledToken, seconds: float, resource: str = "core"):
+        pooled.rate_limit_for(resource).block_for(seconds)
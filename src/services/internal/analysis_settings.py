@@ -0,0 +1,114 @@
+"""
+Настройки анализа (analysis_settings) с кэшем в памяти процесса.
+
+Кэш живёт в каждом процессе (API, воркеры src.worker), а настройки меняет
+только API, поэтому запись кэша сверяется с updated_at строки в БД при
+каждом get — одним лёгким запросом по индексу области. Пока настройки не
+менялись, повторно не читается JSON и не компилируются commit_rules;
+после изменения любой процесс сразу получает новые. commit_rules
+компилируются при загрузке и передаются классификатору готовыми.
+"""
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from src.adapters.db.base import SessionLocal
+from src.adapters.db.repositories.analysis_settings_repo import AnalysisSettingsRepository
+from src.services.internal.preprocessing.commit_type_detector import CompiledCommitRules
+
+
+class AnalysisSettingsNotFound(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class AnalysisSettings:
+    raw: dict
+    commit_rules: CompiledCommitRules
+
+    @classmethod
+    def from_raw(cls, raw: dict | str) -> "AnalysisSettings":
+        if isinstance(raw, str):
+            raw = json.loads(raw)
+        return cls(raw=raw, commit_rules=CompiledCommitRules.from_settings(raw))
+
+
+class AnalysisSettingsProvider:
+    def __init__(self):
+        # (scope_type, scope_id) -> (updated_at строки, настройки)
+        self._cache: dict[tuple[str, int], tuple[datetime, AnalysisSettings]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(scope_type: str, scope_id) -> tuple[str, int]:
+        # scope_id приходит строкой из заголовка acc-scope
+        return scope_type, int(scope_id)
+
+    def get(self, scope_type: str, scope_id, session: Session | None = None) -> AnalysisSettings:
+        if session is None:
+            with SessionLocal() as own_session:
+                return self._get(scope_type, scope_id, own_session)
+        return self._get(scope_type, scope_id, session)
+
+    def _get(self, scope_type: str, scope_id, session: Session) -> AnalysisSettings:
+        key = self._key(scope_type, scope_id)
+        repo = AnalysisSettingsRepository(session)
+
+        updated_at = repo.get_updated_at(*key)
+        if updated_at is None:
+            with self._lock:
+                self._cache.pop(key, None)
+            raise AnalysisSettingsNotFound(f"Analysis settings not found for {scope_type}:{scope_id}")
+
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None and cached[0] == updated_at:
+            return cached[1]
+
+        model = repo.get_by_scope(*key)
+        if model is None:
+            raise AnalysisSettingsNotFound(f"Analysis settings not found for {scope_type}:{scope_id}")
+
+        analysis_settings = AnalysisSettings.from_raw(model.settings)
+        with self._lock:
+            self._cache[key] = (model.updated_at, analysis_settings)
+        return analysis_settings
+
+    def update(self, scope_type: str, scope_id, raw: dict, session: Session) -> AnalysisSettings:
+        """Сохраняет настройки области и сбрасывает их запись в кэше."""
+        key = self._key(scope_type, scope_id)
+        analysis_settings = AnalysisSettings.from_raw(raw)
+        AnalysisSettingsRepository(session).upsert(*key, analysis_settings.raw)
+        self.invalidate(scope_type, scope_id)
+        return analysis_settings
+
+    def invalidate(self, scope_type: str | None = None, scope_id=None):
+        """Без аргументов очищает весь кэш."""
+        with self._lock:
+            if scope_type is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(self._key(scope_type, scope_id), None)
+
+
+settings_provider = AnalysisSettingsProvider()
+
+
+def resolve_analysis_settings(
+    settings,
+    scope_type: str,
+    scope_id,
+    session: Session | None = None,
+) -> AnalysisSettings:
+    """
+    Настройки для запуска: переданные явно (dict или JSON из заголовка
+    analysis-settings) либо сохранённые для области.
+    """
+    if isinstance(settings, AnalysisSettings):
+        return settings
+    if settings:
+        return AnalysisSettings.from_raw(settings)
+    return settings_provider.get(scope_type, scope_id, session)
@@ -0,0 +1,159 @@
+"""
+Пакетная запись обработанных коммитов в БД.
+
+Коммиты с файлами копятся в памяти в колоночном CommitBatch и пишутся
+пачкой в одной транзакции:
+INSERT ... ON CONFLICT DO UPDATE ... RETURNING коммитов, удаление старых
+файлов перезаписанных коммитов и один INSERT ... ON CONFLICT всех файлов
+пачки. Число обращений к БД на коммит не зависит от числа его файлов.
+Патчи уходят в patch_blobs (сжатые, один раз на содержимое), в
+commit_files остаётся только patch_hash.
+
+Для первичного импорта есть CommitCopyWriter: те же строки загружаются
+через COPY FROM STDIN, без проверки конфликтов.
+
+on_flush получает sha каждой записанной пачки и ошибку записи (None при
+успехе) — по нему двигается контрольная точка загрузки.
+"""
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from src.adapters.db.repositories.commit_file_repo import CommitFileRepository
+from src.adapters.db.repositories.commit_repo import CommitRepository
+from src.adapters.db.repositories.patch_blob_repo import PatchBlobRepository, patch_hash
+from src.core.config import settings
+from src.data.domain.commit import Commit
+from src.data.domain.commit_batch import CommitBatch
+from src.util.logger import logger
+
+
+class CommitBatchWriter:
+    def __init__(
+        self,
+        session: Session,
+        repository_id: int,
+        batch_size: int | None = None,
+        on_flush: Callable[[list[str], Exception | None], None] | None = None,
+    ):
+        self.session = session
+        self.repository_id = repository_id
+        self.batch_size = batch_size or settings.db_write_batch_size
+        self.on_flush = on_flush
+
+        self.commit_repo = CommitRepository(session)
+        self.commit_file_repo = CommitFileRepository(session)
+        self.patch_blob_repo = PatchBlobRepository(session)
+
+        self._batch = CommitBatch()
+
+        self.saved = 0
+        self.failed = 0
+
+    def add(self, commit: Commit, contributor_id: int | None = None):
+        """Добавляет коммит в пачку; при заполнении пачка записывается."""
+        self._batch.append(commit, contributor_id)
+
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def add_batch(self, batch: CommitBatch):
+        """Добавляет обогащённую пачку (contributor_id уже проставлены)."""
+        if len(self._batch):
+            self._batch.extend(batch)
+        else:
+            self._batch = batch
+
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> int:
+        """Записывает накопленную пачку, возвращает число сохранённых коммитов."""
+        if not len(self._batch):
+            return 0
+
+        batch, self._batch = self._batch, CommitBatch()
+        commits, files = batch.commit_rows(self.repository_id), batch.file_rows()
+
+        try:
+            saved = self._write(commits, files)
+        except Exception as e:
+            self.session.rollback()
+            self.failed += len(commits)
+            logger.exception(f"Failed to write batch of {len(commits)} commits: {e}")
+            if self.on_flush is not None:
+                self.on_flush(batch.sha, e)
+            return 0
+
+        self.saved += saved
+        if self.on_flush is not None:
+            self.on_flush(batch.sha, None)
+        return saved
+
+    def _offload_patches(self, files: dict[str, list[dict]]):
+        """Заменяет patch строк файлов на patch_hash и записывает новые патчи."""
+        patches = {}
+        for rows in files.values():
+            for row in rows:
+                patch = row.pop("patch")
+                row["patch_hash"] = None
+                if patch:
+                    row["patch_hash"] = digest = patch_hash(patch)
+                    patches[digest] = patch
+        self.patch_blob_repo.put_many(patches)
+
+    def _write(self, commits: list[dict], files: dict[str, list[dict]]) -> int:
+        self._offload_patches(files)
+        commit_ids = self.commit_repo.bulk_upsert(commits)
+
+        # Коммит мог быть сохранён раньше (повторный анализ, параллельная загрузка) —
+        # его файлы пересобираются заново. Файлы коммитов, загруженных без них
+        # (GraphQL без патчей), остаются как были
+        self.commit_file_repo.delete_by_commit_ids([commit_ids[sha] for sha in files])
+        self.commit_file_repo.bulk_upsert([
+            {"commit_id": commit_ids[sha], **row}
+            for sha, rows in files.items()
+            for row in rows
+        ])
+
+        self.session.commit()
+        return len(commits)
+
+
+class CommitCopyWriter(CommitBatchWriter):
+    """
+    Запись пачек через COPY — для первого импорта репозитория.
+
+    id коммитов выдаются заранее из последовательности, чтобы сразу
+    проставить commit_id файлам. Уже сохранённый коммит ломает всю пачку
+    (unique violation), поэтому писатель подходит только для пустого репозитория.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        repository_id: int,
+        batch_size: int | None = None,
+        on_flush: Callable[[list[str], Exception | None], None] | None = None,
+    ):
+        super().__init__(
+            session, repository_id, batch_size or settings.db_copy_batch_size, on_flush
+        )
+
+    def _write(self, commits: list[dict], files: dict[str, list[dict]]) -> int:
+        commit_ids = {}
+        for row, commit_id in zip(commits, self.commit_repo.reserve_ids(len(commits))):
+            row["id"] = commit_id
+            commit_ids[row["sha"]] = commit_id
+
+        self._offload_patches(files)
+        self.commit_repo.copy_insert(commits)
+        self.commit_file_repo.copy_insert(
+            {"commit_id": commit_ids[sha], **row}
+            for sha, rows in files.items()
+            for row in rows
+        )
+
+        self.session.commit()
+        return len(commits)
+
@@ -0,0 +1,248 @@
+"""
+Стадия обогащения коммитов: фильтрация файлов, определение языка и
+классификация.
+
+Коммиты собираются в CommitBatch по enrichment_batch_size и обогащаются
+по колонкам, без pydantic-объекта на каждый файл. По умолчанию
+(enrichment_workers = 0) — в потоке запроса; с enrichment_workers > 0
+пачки уходят в общий пул процессов, и обогащение масштабируется по
+ядрам, а не упирается в GIL. Воркеры получают только CommitBatch и сырые
+commit_rules — без сессий БД и клиентов; скомпилированные правила кэшируются в каждом
+воркере (CompiledCommitRules.from_settings). Пользовательские расширения
+языков (file_extensions) передаются воркерам один раз при старте пула.
+"""
+import multiprocessing
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator
+
+from src.core.config import settings
+from src.data.domain.commit import Commit
+from src.data.domain.commit_batch import CommitBatch
+from src.services.internal.preprocessing.commit_enricher import CommitEnricher
+from src.services.internal.preprocessing.commit_type_detector import (
+    CompiledCommitRules,
+    HeuristicCommitClassifier,
+)
+from src.services.internal.preprocessing.file_language_enricher import FileLanguageEnricher
+from src.services.internal.preprocessing.files_filter import FilesFilter
+from src.services.internal.preprocessing.lang_detector import LanguageDetector
+from src.util.logger import logger
+
+
+class CommitEnrichmentError(Exception):
+    pass
+
+
+class CommitPipeline:
+    """Фильтр и обогащатели коммитов; по одному экземпляру на процесс."""
+
+    def __init__(self, language_overrides: dict[str, str] | None = None):
+        self.files_filter = FilesFilter()
+        self.commit_enricher = CommitEnricher(
+            file_enricher=FileLanguageEnricher(LanguageDetector(language_overrides)),
+            commit_type_detector=HeuristicCommitClassifier(),
+        )
+
+    def enrich_batch(
+        self,
+        batch: CommitBatch,
+        commit_rules: CompiledCommitRules,
+    ) -> tuple[CommitBatch, list[tuple[str, str]]]:
+        """(обогащённые коммиты, [(sha, traceback)] коммитов с ошибкой)."""
+        try:
+            return self._enrich(batch, commit_rules), []
+        except Exception:
+            pass
+
+        # Ошибка одного коммита не должна терять пачку: повтор по одному
+        enriched = CommitBatch()
+        failed = []
+        for index in range(len(batch)):
+            try:
+                enriched.extend(self._enrich(batch.select([index]), commit_rules))
+            except Exception:
+                failed.append((batch.sha[index], traceback.format_exc()))
+        return enriched, failed
+
+    def _enrich(self, batch: CommitBatch, commit_rules: CompiledCommitRules) -> CommitBatch:
+        self.files_filter.filter_batch(batch)
+        return self.commit_enricher.enrich_batch(batch, commit_rules)
+
+
+# Конвейер процесса-воркера, создаётся в _init_worker
+_worker_pipeline: CommitPipeline | None = None
+
+
+def _init_worker(language_overrides: dict[str, str] | None = None):
+    global _worker_pipeline
+    _worker_pipeline = CommitPipeline(language_overrides)
+
+
+def _enrich_batch(
+    batch: CommitBatch,
+    commit_rules_settings: dict,
+) -> tuple[CommitBatch, list[tuple[str, str]]]:
+    """Выполняется в воркере. Ошибка коммита возвращается текстом, а не роняет пачку."""
+    commit_rules = CompiledCommitRules.from_settings(commit_rules_settings)
+    return _worker_pipeline.enrich_batch(batch, commit_rules)
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_overrides: dict[str, str] | None = None
+_pool_lock = threading.Lock()
+
+
+def submit_enrichment(
+    workers: int,
+    language_overrides: dict[str, str] | None,
+    batch: CommitBatch,
+    commit_rules_settings: dict,
+) -> tuple[ProcessPoolExecutor, Future]:
+    """Отправка пачки под тем же замком: другой запуск не заменит пул между выбором и submit."""
+    with _pool_lock:
+        pool = _current_pool(workers, language_overrides)
+        return pool, pool.submit(_enrich_batch, batch, commit_rules_settings)
+
+
+def _current_pool(workers: int, language_overrides: dict[str, str] | None) -> ProcessPoolExecutor:
+    """
+    Общий пул процессов (вызывается под _pool_lock); пересоздаётся при смене
+    числа воркеров или расширений языков и после падения. Заменённый пул не
+    отменяет задачи: пачки других запусков, уже отправленные в него,
+    дорабатываются, после чего его процессы завершаются.
+    """
+    global _pool, _pool_workers, _pool_overrides
+    if _pool is None or _pool_workers != workers or _pool_overrides != language_overrides:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        # spawn: воркеры не наследуют потоки, соединения с БД и сессии HTTP родителя
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(language_overrides,),
+        )
+        _pool_workers = workers
+        _pool_overrides = language_overrides
+    return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+class EnrichmentStage:
+    def __init__(
+        self,
+        commit_rules_settings: dict,
+        workers: int | None = None,
+        batch_size: int | None = None,
+        language_overrides: dict[str, str] | None = None,
+    ):
+        self.commit_rules_settings = commit_rules_settings
+        self.language_overrides = language_overrides
+        self.commit_rules = CompiledCommitRules.from_settings(commit_rules_settings)
+        self.workers = settings.enrichment_workers if workers is None else workers
+        self.batch_size = max(1, settings.enrichment_batch_size if batch_size is None else batch_size)
+        self._pipeline: CommitPipeline | None = None
+
+    def iter_enriched_batches(
+        self,
+        domain_commits: Iterable[tuple[str, Commit | None, Exception | None]],
+    ) -> Iterator[tuple[CommitBatch, list[tuple[str, Exception]]]]:
+        """
+        Принимает кортежи (sha, commit, error), отдаёт обогащённые пачки и
+        [(sha, error)] коммитов, которые не загрузились или не обогатились.
+        С пулом процессов порядок пачек не сохраняется.
+        """
+        batches = self._iter_batches(domain_commits)
+        if self.workers <= 0:
+            yield from self._iter_inline(batches)
+        else:
+            yield from self._iter_pooled(batches)
+
+    def _iter_batches(self, domain_commits):
+        """(пачка, ошибки загрузки); пустая пачка — только чтобы отдать ошибки."""
+        batch = CommitBatch()
+        failed = []
+        for sha, commit, error in domain_commits:
+            if error is not None:
+                logger.error(f"Failed to fetch commit {sha}: {error}")
+                failed.append((sha, error))
+            else:
+                batch.append(commit)
+            if len(batch) >= self.batch_size or len(failed) >= self.batch_size:
+                yield batch, failed
+                batch, failed = CommitBatch(), []
+        if len(batch) or failed:
+            yield batch, failed
+
+    def _iter_inline(self, batches):
+        if self._pipeline is None:
+            self._pipeline = CommitPipeline(self.language_overrides)
+
+        for batch, failed in batches:
+            if len(batch):
+                batch, errors = self._pipeline.enrich_batch(batch, self.commit_rules)
+                failed += _enrichment_errors(errors)
+            yield batch, failed
+
+    def _iter_pooled(self, batches):
+        # Не больше двух пачек на воркер в пути: загрузка не убегает далеко вперёд
+        max_in_flight = self.workers * 2
+        in_flight: deque[tuple[CommitBatch, ProcessPoolExecutor, Future]] = deque()
+
+        try:
+            for batch, failed in batches:
+                if failed:
+                    yield CommitBatch(), failed
+                if not len(batch):
+                    continue
+
+                pool, future = submit_enrichment(
+                    self.workers, self.language_overrides, batch, self.commit_rules_settings
+                )
+                in_flight.append((batch, pool, future))
+
+                while in_flight and (len(in_flight) > max_in_flight or in_flight[0][2].done()):
+                    yield self._collect(*in_flight.popleft())
+
+            while in_flight:
+                yield self._collect(*in_flight.popleft())
+        finally:
+            for _, _, future in in_flight:
+                future.cancel()
+
+    def _collect(self, batch: CommitBatch, pool: ProcessPoolExecutor, future: Future):
+        try:
+            enriched, errors = future.result()
+        except BrokenProcessPool as e:
+            # Воркер упал (например, OOM): пачка считается неудачной, пул создаётся заново
+            logger.error(f"Enrichment worker died: {e}")
+            _discard_pool(pool)
+            return CommitBatch(), [(sha, CommitEnrichmentError(str(e))) for sha in batch.sha]
+        except CancelledError:
+            # Задачу отменили вместе с пулом: пачка обогащается в этом процессе
+            logger.warning(f"Enrichment of {len(batch)} commits was cancelled, enriching inline")
+            if self._pipeline is None:
+                self._pipeline = CommitPipeline(self.language_overrides)
+            enriched, errors = self._pipeline.enrich_batch(batch, self.commit_rules)
+
+        return enriched, _enrichment_errors(errors)
+
+
+def _enrichment_errors(errors: list[tuple[str, str]]) -> list[tuple[str, Exception]]:
+    failed = []
+    for sha, error in errors:
+        logger.error(f"Failed to enrich commit {sha}: {error}")
+        failed.append((sha, CommitEnrichmentError(error.strip().splitlines()[-1])))
+    return failed
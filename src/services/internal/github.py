@@ -1,45 +1,174 @@
-from ast import Dict
+"""
+Подсчёт значимых строк diff: добавленные и удалённые строки без пустых
+строк и комментариев.
+
+Синтаксис комментариев берётся из COMMENT_PATTERNS (и легаси COMMENT_SYMBOLS
+для остальных расширений) и компилируется один раз на расширение в
+CommentMatcher. Многострочные комментарии и докстринги отслеживаются
+отдельно для старой (контекст и «-») и новой (контекст и «+») стороны
+hunk'а. Патч без открывающих блок разделителей считается одним
+регулярным выражением, без цикла по строкам.
+"""
+import re
 from collections import defaultdict
-from typing import Any
+from typing import Any, Iterable
 
+from src.data.domain.file_change import FileChange
 from src.data.enums.analytics import COMMENT_SYMBOLS
 from src.data.enums.language import COMMENT_PATTERNS
 
 
-async def count_meaningful_diff(diff_content: str) -> Dict[str, Any]:
-    """Count meaningful additions and deletions in diff."""
-    if not diff_content:
-        return {
-            "meaningful_additions": 0,
-            "meaningful_deletions": 0,
-            "top_files_by_additions": []
-        }
+# Закрывающий разделитель для открывающих символов из COMMENT_SYMBOLS
+BLOCK_COMMENT_ENDS = {
+    "/*": "*/",
+    '"""': '"""',
+    "'''": "'''",
+    "<!--": "-->",
+    "{-": "-}",
+    "--[[": "]]",
+    "=begin": "=end",
+}
+
+
+class CommentMatcher:
+    """Синтаксис комментариев одного расширения, подготовленный для подсчёта."""
+
+    def __init__(self, single_line: Iterable[str], blocks: Iterable[tuple[str, str]]):
+        # Длинные открывающие разделители проверяются первыми: --[[ раньше --
+        self.blocks = tuple(sorted(set(blocks), key=lambda block: -len(block[0])))
+        self.block_starts = tuple(start for start, _ in self.blocks)
+        self.single_line = tuple(
+            prefix for prefix in single_line if not prefix.startswith(self.block_starts)
+        ) if self.block_starts else tuple(single_line)
+
+        # Добавленная/удалённая строка, в которой после отступа есть что-то кроме комментария.
+        # Литеральный префикс \n+ / \n- движок ищет быстрым поиском подстроки, а не с каждой позиции
+        not_comment = (
+            "(?!" + "|".join(re.escape(prefix) for prefix in self.single_line) + ")"
+            if self.single_line else ""
+        )
+        self._meaningful_added = re.compile(rf"\n\+[^\S\n]*{not_comment}\S")
+        self._meaningful_deleted = re.compile(rf"\n-[^\S\n]*{not_comment}\S")
+
+    @classmethod
+    def for_extension(cls, extension: str) -> "CommentMatcher":
+        patterns = COMMENT_PATTERNS.get(extension)
+        if patterns is not None:
+            return cls(
+                patterns.get("single_line", []),
+                zip(patterns.get("multi_line_start", []), patterns.get("multi_line_end", [])),
+            )
+
+        symbols = COMMENT_SYMBOLS.get(extension, [])
+        closing = set(BLOCK_COMMENT_ENDS.values())
+        return cls(
+            [s for s in symbols if s not in BLOCK_COMMENT_ENDS and s not in closing],
+            [(s, BLOCK_COMMENT_ENDS[s]) for s in symbols if s in BLOCK_COMMENT_ENDS],
+        )
+
+    def is_comment(self, text: str) -> bool:
+        """text — строка без маркера diff и без отступов."""
+        return text.startswith(self.block_starts) or text.startswith(self.single_line)
+
+    def _classify(self, text: str, block_end: str | None) -> tuple[int, str | None]:
+        """(1, если строка значимая; закрывающий разделитель открытого блока)."""
+        if block_end is not None:
+            return 0, (None if block_end in text else block_end)
+        if not text:
+            return 0, None
+        if self.block_starts and text.startswith(self.block_starts):
+            for start, end in self.blocks:
+                if text.startswith(start):
+                    # Блок закрыт на этой же строке: /* ... */, """doc"""
+                    return 0, (None if end in text[len(start):] else end)
+        if self.single_line and text.startswith(self.single_line):
+            return 0, None
+        return 1, None
+
+    def count(self, patch: str | None) -> tuple[int, int]:
+        """(значимые добавления, значимые удаления) для патча одного файла (hunk'и с @@)."""
+        if not patch:
+            return 0, 0
+
+        if not self.block_starts or not any(start in patch for start in self.block_starts):
+            # Состояния между строками нет — подсчёт целиком в движке регулярных выражений
+            patch = "\n" + patch
+            return (
+                len(self._meaningful_added.findall(patch)),
+                len(self._meaningful_deleted.findall(patch)),
+            )
+
+        additions = deletions = 0
+        old_end = new_end = None
+        classify = self._classify
+        for line in patch.split("\n"):
+            if not line:
+                continue
+            marker = line[0]
+            if marker == "+":
+                meaningful, new_end = classify(line[1:].strip(), new_end)
+                additions += meaningful
+            elif marker == "-":
+                meaningful, old_end = classify(line[1:].strip(), old_end)
+                deletions += meaningful
+            elif marker == " ":
+                text = line[1:].strip()
+                _, new_end_after = classify(text, new_end)
+                old_end = new_end_after if old_end == new_end else classify(text, old_end)[1]
+                new_end = new_end_after
+            elif marker == "@":
+                # Между hunk'ами строки пропущены, состояние неизвестно
+                old_end = new_end = None
+        return additions, deletions
+
+
+_matchers: dict[str, CommentMatcher] = {}
+
 
+def get_comment_matcher(extension: str) -> CommentMatcher:
+    matcher = _matchers.get(extension)
+    if matcher is None:
+        matcher = _matchers[extension] = CommentMatcher.for_extension(extension)
+    return matcher
+
+
+def path_extension(path: str) -> str:
+    name = path.rsplit("/", 1)[-1]
+    # Dockerfile, Makefile: имя файла вместо расширения
+    return (name.rsplit(".", 1)[-1] if "." in name else name).lower()
+
+
+def count_meaningful_lines(path: str, patch: str | None) -> tuple[int, int]:
+    return get_comment_matcher(path_extension(path)).count(patch)
+
+
+def count_meaningful_lines_many(files: Iterable[tuple[str, str | None]]) -> list[tuple[int, int]]:
+    """Подсчёт для пачки (path, patch) за один вызов."""
+    return [count_meaningful_lines(path, patch) for path, patch in files]
+
+
+def set_meaningful_counts(files: list[FileChange]):
+    """Заполняет meaningful_additions/meaningful_deletions файлов коммита."""
+    counts = count_meaningful_lines_many((f.path, f.patch) for f in files)
+    for f, (additions, deletions) in zip(files, counts):
+        f.meaningful_additions = additions
+        f.meaningful_deletions = deletions
+
+
+def count_meaningful_diff(diff_content: str) -> dict[str, Any]:
+    """Count meaningful additions and deletions in a multi-file git diff."""
     meaningful_additions = 0
     meaningful_deletions = 0
     file_additions = defaultdict(int)
-    current_file = None
-
-    lines = diff_content.split('\n')
-    for line in lines:
-        if line.startswith('diff --git'):
-            # Extract filename from diff header
-            parts = line.split()
-            if len(parts) >= 3:
-                current_file = parts[2].replace('a/', '').replace('b/', '')
-        elif line.startswith('+') and not line.startswith('+++'):
-            # Addition line
-            if current_file:
-                file_extension = current_file.split('.')[-1] if '.' in current_file else ''
-                if not await self.is_comment_line(line[1:], file_extension):
-                    meaningful_additions += 1
-                    file_additions[current_file] += 1
-        elif line.startswith('-') and not line.startswith('---'):
-            # Deletion line
-            if current_file:
-                file_extension = current_file.split('.')[-1] if '.' in current_file else ''
-                if not await self.is_comment_line(line[1:], file_extension):
-                    meaningful_deletions += 1
+
+    for section in re.split(r"^diff --git ", diff_content or "", flags=re.M)[1:]:
+        header, _, hunks = section.partition("\n@@")
+        path = _diff_section_path(header)
+        additions, deletions = count_meaningful_lines(path, "@@" + hunks if hunks else "")
+        meaningful_additions += additions
+        meaningful_deletions += deletions
+        if additions:
+            file_additions[path] += additions
 
     # Get top files by additions
     top_files = sorted(file_additions.items(), key=lambda x: x[1], reverse=True)[:5]
@@ -49,31 +178,16 @@ async def count_meaningful_diff(diff_content: str) -> Dict[str, Any]:
         "meaningful_deletions": meaningful_deletions,
         "top_files_by_additions": [{"file": file, "additions": count} for file, count in top_files]
     }
-    
-async def is_comment_line(line: str, file_extension: str) -> bool:
+
+
+def _diff_section_path(header: str) -> str:
+    path = header.split("\n", 1)[0].rsplit(" b/", 1)[-1]
+    for line in header.split("\n"):
+        if line.startswith("+++ b/"):
+            return line[len("+++ b/"):]
+    return path
+
+
+def is_comment_line(line: str, file_extension: str) -> bool:
     """Check if line is a comment using language-specific patterns."""
-    if not line.strip():
-        return False
-
-    # Get language-specific comment patterns
-    lang_patterns = COMMENT_PATTERNS.get(file_extension, {})
-    single_line = lang_patterns.get('single_line', [])
-    multi_line_start = lang_patterns.get('multi_line_start', [])
-
-    # Check for single-line comments
-    for symbol in single_line:
-        if line.strip().startswith(symbol):
-            return True
-
-    # Check for multi-line comment starts
-    for symbol in multi_line_start:
-        if line.strip().startswith(symbol):
-            return True
-
-    # Fallback to legacy COMMENT_SYMBOLS for backward compatibility
-    symbols = COMMENT_SYMBOLS.get(file_extension, [])
-    for symbol in symbols:
-        if line.strip().startswith(symbol):
-            return True
-
-    return False 
\ No newline at end of file
+    return get_comment_matcher(file_extension).is_comment(line.strip())
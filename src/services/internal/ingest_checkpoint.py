@@ -0,0 +1,189 @@
+"""
+Контрольная точка загрузки репозитория (ingest_checkpoints).
+
+Сводки коммитов идут от пагинации к записи в БД не по порядку: полные
+коммиты загружаются параллельно, обогащаются пачками и пишутся пачками.
+IngestCheckpoint запоминает позицию пагинации каждой сводки и отмечает,
+какие из них уже разрешены — записаны, пропущены (уже в БД, без автора)
+или ушли в dead letter. Сохраняется позиция первой неразрешённой сводки:
+всё до неё точно в БД, поэтому после падения загрузка продолжается с этой
+страницы, а не с начала истории, и без повторных запросов за
+сохранёнными коммитами.
+
+Коммиты, которые не удалось загрузить, обработать или записать, попадают
+в dead letter. Следующий запуск повторяет только их (до
+ingest_dead_letter_max_attempts раз), историю заново не проходит.
+"""
+import threading
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from src.adapters.db.repositories.ingest_checkpoint_repo import IngestCheckpointRepository
+from src.core.config import settings
+from src.util.logger import logger
+
+
+# Сколько символов ошибки хранится в dead letter
+ERROR_LIMIT = 2000
+
+
+class IngestCheckpoint:
+    def __init__(
+        self,
+        repository_id: int,
+        backend: str,
+        since: datetime | None = None,
+        head: tuple[str, datetime | None] | None = None,
+        cursor=None,
+        dead_letter: dict | None = None,
+        persisted: int = 0,
+    ):
+        self.repository_id = repository_id
+        self.backend = backend
+        self.since = since.isoformat() if since else None
+        # Head, от которого продолжается прерванная загрузка; None — свежий запуск
+        self.resume_head = head
+        self.resume_cursor = cursor
+        self.dead_letter = dict(dead_letter or {})
+        self.persisted = persisted
+        self.last_persisted_sha = None
+
+        # Источник сводок записывает сюда позицию отдаваемой сводки
+        self.position = {"cursor": cursor}
+
+        self._lock = threading.Lock()
+        # (sha, позиция) в порядке пагинации и логины ещё не разрешённых sha
+        self._order = deque()
+        self._pending: dict[str, str | None] = {}
+        self._safe_cursor = cursor
+
+    @classmethod
+    def load(
+        cls,
+        session: Session,
+        repository_id: int,
+        backend: str,
+        since: datetime | None = None,
+    ) -> "IngestCheckpoint":
+        """
+        Контрольная точка репозитория. Прерванная загрузка продолжается,
+        только если она шла тем же источником и с тем же since — иначе
+        позиция пагинации не совпадёт; dead letter берётся в любом случае.
+        """
+        checkpoint = cls(repository_id, backend, since)
+        row = IngestCheckpointRepository(session).get(repository_id)
+        if row is None:
+            return checkpoint
+
+        checkpoint.dead_letter = dict(row.dead_letter or {})
+        cursor = row.cursor or {}
+        if (
+            row.head_sha
+            and row.backend == backend
+            and cursor.get("since") == checkpoint.since
+        ):
+            checkpoint.resume_head = (row.head_sha, row.head_committed_at)
+            checkpoint.resume_cursor = checkpoint._safe_cursor = cursor.get("position")
+            checkpoint.position["cursor"] = checkpoint.resume_cursor
+            checkpoint.persisted = row.persisted
+            logger.info(
+                f"Resuming ingestion of repository {repository_id} from {row.head_sha} "
+                f"at {checkpoint.resume_cursor!r}"
+            )
+        return checkpoint
+
+    # ----------------------
+    # Сводки и их разрешение
+    # ----------------------
+
+    def track(self, sha: str, login: str | None):
+        """Сводка получена из пагинации (вызывается из потока загрузчика)."""
+        with self._lock:
+            self._order.append((sha, self.position["cursor"]))
+            self._pending[sha] = login
+
+    def resolve(self, sha: str):
+        """Сводка пропущена: коммит уже в БД или не подлежит загрузке."""
+        with self._lock:
+            self._pending.pop(sha, None)
+
+    def persisted_many(self, shas: list[str]):
+        with self._lock:
+            for sha in shas:
+                self._pending.pop(sha, None)
+                self.dead_letter.pop(sha, None)
+            self.persisted += len(shas)
+            if shas:
+                self.last_persisted_sha = shas[-1]
+
+    def fail(self, sha: str, error):
+        with self._lock:
+            entry = self.dead_letter.get(sha) or {}
+            login = self._pending.pop(sha, entry.get("login"))
+            self.dead_letter[sha] = {
+                "login": login,
+                "error": str(error)[:ERROR_LIMIT],
+                "attempts": entry.get("attempts", 0) + 1,
+            }
+
+    def retryable(self) -> dict[str, str | None]:
+        """sha -> логин коммитов из dead letter, которые ещё стоит повторить."""
+        limit = settings.ingest_dead_letter_max_attempts
+        return {
+            sha: entry.get("login")
+            for sha, entry in self.dead_letter.items()
+            if entry.get("attempts", 0) < limit
+        }
+
+    def safe_cursor(self):
+        """Позиция, с которой пагинация повторит все ещё не разрешённые сводки."""
+        with self._lock:
+            while self._order and self._order[0][0] not in self._pending:
+                self._safe_cursor = self._order.popleft()[1]
+            if self._order:
+                return self._order[0][1]
+            return self._safe_cursor
+
+    # ----------------------
+    # Сохранение
+    # ----------------------
+
+    def save(self, session: Session, head: tuple[str, datetime | None] | None):
+        """Сохраняет позицию незавершённой загрузки от head и dead letter."""
+        head = self.resume_head or head
+        if head is None:
+            return
+        with self._lock:
+            dead_letter = dict(self.dead_letter)
+        IngestCheckpointRepository(session).save(
+            self.repository_id,
+            backend=self.backend,
+            head_sha=head[0],
+            head_committed_at=head[1],
+            cursor={"position": self.safe_cursor(), "since": self.since},
+            last_persisted_sha=self.last_persisted_sha,
+            persisted=self.persisted,
+            dead_letter=dead_letter,
+        )
+
+    def finish(self, session: Session):
+        """
+        Загрузка дошла до конца: позиция больше не нужна. Если dead letter
+        пуст, контрольная точка удаляется целиком.
+        """
+        repo = IngestCheckpointRepository(session)
+        if not self.dead_letter:
+            repo.delete(self.repository_id)
+            return
+        repo.save(
+            self.repository_id,
+            backend=self.backend,
+            head_sha=None,
+            head_committed_at=None,
+            cursor=None,
+            last_persisted_sha=self.last_persisted_sha,
+            persisted=0,
+            dead_letter=dict(self.dead_letter),
+        )
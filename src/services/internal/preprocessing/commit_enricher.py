@@ -1,17 +1,14 @@
-from typing import Optional
-
-from src.adapters.db.base import SessionLocal
-from src.data.github_api_response.commits_response_entity import SingleCommitEntity
 from src.data.domain.commit import Commit
+from src.data.domain.commit_batch import CommitBatch
+from src.services.internal.github import count_meaningful_lines_many, set_meaningful_counts
 from src.services.internal.preprocessing.file_language_enricher import (
     FileLanguageEnricher,
 )
 from src.services.internal.preprocessing.commit_type_detector import (
+    CompiledCommitRules,
     HeuristicCommitClassifier,
 )
 
-import json
-
 
 class CommitEnricher:
     def __init__(
@@ -25,27 +22,20 @@ class CommitEnricher:
     def enrich(
         self,
         commit_model: Commit,
-        commit_entity: SingleCommitEntity,
-        scope_type,
-        scope_id,
-        session: SessionLocal,
+        commit_rules: CompiledCommitRules | dict,
     ) -> Commit:
-        team_repo = TeamRepository(session)
-
-        settings = (
-            team_repo
-                .get_settings(scope_type, scope_id)
-                .settings
-        )
+        # Без обращений к БД: обогащение может идти в процессах пула (enrichment_pool)
 
-        if not commit_model.files:
+        # files is None — коммит без патчей (например, из GraphQL), классифицируем по метаданным
+        if commit_model.files is not None and not commit_model.files:
             commit_model.commit_type = "unknown"
             return commit_model
 
-        for file in commit_model.files:
-            self.file_enricher.enrich(file)
+        if commit_model.files:
+            self.file_enricher.enrich_many(commit_model.files)
+            set_meaningful_counts(commit_model.files)
 
-        commit_meta_data = self.commit_type_detector.detect(commit_entity, settings)
+        commit_meta_data = self.commit_type_detector.detect(commit_model, commit_rules)
 
         commit_model.commit_type = commit_meta_data.get("commit_type", "unknown")
         commit_model.is_conventional = commit_meta_data.get("is_conventional", False)
@@ -59,3 +49,36 @@ class CommitEnricher:
         commit_model.is_revert_commit = commit_meta_data.get("is_revert_commit", False)
 
         return commit_model
+
+    def enrich_batch(
+        self,
+        batch: CommitBatch,
+        commit_rules: CompiledCommitRules | dict,
+    ) -> CommitBatch:
+        """enrich для всей пачки по колонкам, без сборки Commit/FileChange."""
+        self.file_enricher.enrich_batch(batch)
+        counts = count_meaningful_lines_many(zip(batch.file_path, batch.file_patch))
+        batch.file_meaningful_additions = [additions for additions, _ in counts]
+        batch.file_meaningful_deletions = [deletions for _, deletions in counts]
+
+        unknown = batch.category_code("unknown")
+        classify = self.commit_type_detector.classify
+        for i in range(len(batch)):
+            if batch.file_count[i] == 0:
+                batch.commit_type[i] = unknown
+                continue
+
+            commit_meta_data = classify(batch.message[i], batch.parents_count[i], batch.files_changed[i], commit_rules)
+
+            batch.commit_type[i] = batch.category_code(commit_meta_data.get("commit_type", "unknown"))
+            batch.is_conventional[i] = commit_meta_data.get("is_conventional", False)
+            batch.conventional_type[i] = batch.category_code(commit_meta_data.get("conventional_type", "unknown"))
+            batch.conventional_scope[i] = commit_meta_data.get("conventional_scope", "unknown")
+            batch.is_breaking_change[i] = commit_meta_data.get("is_breaking_change", False)
+            batch.parents_count[i] = commit_meta_data.get("parents_count", 0)
+            batch.is_merge_commit[i] = commit_meta_data.get("is_merge_commit", False)
+            batch.is_pr_commit[i] = commit_meta_data.get("is_pr_commit", False)
+            batch.files_changed[i] = commit_meta_data.get("files_changed", 0)
+            batch.is_revert_commit[i] = commit_meta_data.get("is_revert_commit", False)
+
+        return batch
@@ -1,50 +1,170 @@
 from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
 import fnmatch
+import json
 import re
 
-from src.data.github_api_response.commits_response_entity import SingleCommitEntity
+from src.data.domain.commit import Commit
 from src.data.enums.analytics import COMMIT_TYPE_PATTERNS, CONVENTIONAL_COMMIT_PATTERN
 
 
-class HeuristicCommitClassifier:
-    def detect(self, commit: SingleCommitEntity, settings: dict) -> dict:
-        commit_sign = commit.commit
-        msg = commit_sign.message.lower()
+CONVENTIONAL_SCOPE_PATTERN = re.compile(r"^\w+:\s")  # browser: / api:
+ISSUE_REFERENCE_PATTERN = re.compile(r"#\d+")  # (#123) / #1467
+
+
+@dataclass(frozen=True)
+class CompiledCommitRules:
+    """
+    commit_rules из настроек анализа, подготовленные один раз на набор правил.
+
+    Правила отсортированы по убыванию приоритета (при равном — в исходном
+    порядке), ключевые слова приведены к нижнему регистру и собраны в одно
+    регулярное выражение: сообщение коммита просматривается за один проход,
+    а не по разу на каждое ключевое слово.
+    """
+
+    default_category: str
+    # (category, ключевые слова) в порядке проверки
+    rules: tuple[tuple[str, tuple[str, ...]], ...]
+    # Ключевые слова, собранные в префиксное дерево; lookahead проверяет каждую
+    # позицию сообщения и находит самое длинное ключевое слово, начинающееся в ней
+    pattern: re.Pattern | None = field(default=None, compare=False, repr=False)
+    # ключевое слово -> лучший индекс правила среди него и его префиксов
+    # (все совпавшие в одной позиции ключевые слова — префиксы самого длинного)
+    keyword_rules: dict[str, int] = field(default_factory=dict, compare=False, repr=False)
+    # Правило с пустым ключевым словом совпадает с любым сообщением
+    always_matched: int | None = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> "CompiledCommitRules":
         commit_rules = settings.get("commit_rules", {})
-        rules = commit_rules.get("rules", [])
+        # Одинаковые наборы правил (повторные запуски, общие настройки организации)
+        # компилируются один раз
+        return _compile_commit_rules(json.dumps(commit_rules, sort_keys=True, ensure_ascii=False))
+
+    def match(self, msg: str) -> str | None:
+        """Категория правила с наибольшим приоритетом, ключевое слово которого есть в msg."""
+        best = self.always_matched
+        if self.pattern is not None:
+            for found in self.pattern.finditer(msg):
+                index = self.keyword_rules[found[1]]
+                if best is None or index < best:
+                    best = index
+                    if best == 0:
+                        break
+        return self.rules[best][0] if best is not None else None
+
+
+@lru_cache(maxsize=64)
+def _compile_commit_rules(commit_rules_json: str) -> CompiledCommitRules:
+    commit_rules = json.loads(commit_rules_json)
+    rules = sorted(
+        commit_rules.get("rules", []),
+        key=lambda rule: -rule.get("priority", 0),
+    )
+    rules = tuple(
+        (
+            rule.get("category", rule.get("name")),
+            tuple(keyword.lower() for keyword in rule.get("keywords", [])),
+        )
+        for rule in rules
+    )
+
+    keyword_rules: dict[str, int] = {}
+    for index, (_, keywords) in enumerate(rules):
+        for keyword in keywords:
+            keyword_rules.setdefault(keyword, index)
+    always_matched = keyword_rules.pop("", None)
+
+    keyword_rules = {
+        keyword: min(
+            keyword_rules.get(keyword[:end], len(rules)) for end in range(1, len(keyword) + 1)
+        )
+        for keyword in keyword_rules
+    }
+
+    pattern = None
+    if keyword_rules:
+        pattern = re.compile(f"(?=({_trie_pattern(keyword_rules)}))")
+
+    return CompiledCommitRules(
+        default_category=commit_rules.get("default_category", "NO CATEGORY"),
+        rules=rules,
+        pattern=pattern,
+        keyword_rules=keyword_rules,
+        always_matched=always_matched,
+    )
+
+
+def _trie_pattern(keywords) -> str:
+    """
+    Регулярное выражение по префиксному дереву ключевых слов: в каждой позиции
+    проверяются только ветки, начинающиеся с текущего символа, а не все слова.
+    """
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Слово заканчивается в этом узле: продолжение необязательно, но жадно
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class HeuristicCommitClassifier:
+    def detect_many(self, commits: list[Commit], rules: CompiledCommitRules | dict) -> list[dict]:
+        """detect для страницы коммитов: правила компилируются один раз на всю пачку."""
+        if not isinstance(rules, CompiledCommitRules):
+            rules = CompiledCommitRules.from_settings(rules)
+        return [self.detect(commit, rules) for commit in commits]
+
+    def detect(self, commit: Commit, rules: CompiledCommitRules | dict) -> dict:
+        """rules — скомпилированные правила или сырые настройки анализа."""
+        return self.classify(commit.message, commit.parents_count, commit.files_changed, rules)
+
+    def classify(
+        self,
+        message: str | None,
+        parents_count: int | None,
+        files_changed: int | None,
+        rules: CompiledCommitRules | dict,
+    ) -> dict:
+        """detect по отдельным полям коммита — для колонок CommitBatch."""
+        if not isinstance(rules, CompiledCommitRules):
+            rules = CompiledCommitRules.from_settings(rules)
+
+        msg = (message or "").lower()
 
         # commit_type
-        default_category = commit_rules.get("default_category", "NO CATEGORY")
-        matched_rule = default_category
-        highest_priority = -1
-        for rule in rules:
-            for keyword in rule.get("keywords", []):
-                if keyword.lower() in msg:
-                    if rule.get("priority", 0) > highest_priority:
-                        matched_rule = rule
-                        highest_priority = rule.get("priority", 0)
-
-        category = matched_rule
+        matched_category = rules.match(msg)
+
+        category = matched_category or rules.default_category
         commit_type = category
 
         # is_conventional
-        is_conventional = category != "NO CATEGORY"
+        is_conventional = matched_category is not None
 
         # conventional_type
         conventional_type = category
 
         # conventional_scope
-        conventional_scope = (
-            re.search(r"^\w+:\s", msg)[0].split(":")[0]
-            if re.search(r"^\w+:\s", msg) # browser: / api:
-            else "no"
-        )
+        scope_match = CONVENTIONAL_SCOPE_PATTERN.search(msg)
+        conventional_scope = scope_match[0].split(":")[0] if scope_match else "no"
 
         # is_breaking_change
         is_breaking_change = msg.startswith("!") or msg.startswith("breaking")
 
         # parents_count
-        parents_count = len(commit.parents)
+        parents_count = parents_count or 0
 
         # parents
         # parents = commit.parents
@@ -56,13 +176,10 @@ class HeuristicCommitClassifier:
         is_pr_commit = any([
             "merge pull request" in msg,
             "merge mr" in msg,
-            re.search(r"#\d+", msg) is not None, # (#123) / #1467
-            re.search(r"pull request", msg) is not None,
+            ISSUE_REFERENCE_PATTERN.search(msg) is not None,
+            "pull request" in msg,
         ])
 
-        # files_changed
-        files_changed = len(commit.files) if commit.files else None
-
         # is_revert_commit
         is_revert_commit = (
             msg.startswith("revert")
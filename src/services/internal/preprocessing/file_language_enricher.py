@@ -1,3 +1,4 @@
+from src.data.domain.commit_batch import CommitBatch
 from src.data.domain.file_change import FileChange
 
 
@@ -6,7 +7,16 @@ class FileLanguageEnricher:
         self.detector = detector
 
     def enrich(self, file: FileChange) -> FileChange:
-        lang = self.detector.detect(file.filename)
+        lang = self.detector.detect(file.path)
         file.language = lang
 
         return file
+
+    def enrich_many(self, files: list[FileChange]) -> list[FileChange]:
+        for file, lang in zip(files, self.detector.detect_many(f.path for f in files)):
+            file.language = lang
+        return files
+
+    def enrich_batch(self, batch: CommitBatch) -> CommitBatch:
+        batch.set_languages(self.detector.detect_many(batch.file_path))
+        return batch
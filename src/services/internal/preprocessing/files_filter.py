@@ -1,35 +1,211 @@
 import os
-import fnmatch
+import re
+from typing import Iterable
+
 from src.data.domain.commit import Commit
+from src.data.domain.commit_batch import CommitBatch
 from src.util.logger import logger
 
 
-class FilesFilter:
-    def __init__(self, ignore_file: str = ".dcoignore"):
-        self.ignore_patterns = self._load_ignore_patterns(ignore_file)
-        # logger.info(f"Loaded ignore patterns: {self.ignore_patterns}")
+# Символы glob; шаблон без них — литерал
+GLOB_CHARS = re.compile(r"[*?\[]")
+# Имя файла, заканчивающееся литеральным суффиксом: *.min.js
+SUFFIX_PATTERN = re.compile(r"^\*(\.[^*?\[/\\]+)$")
+
+
+class IgnoreMatcher:
+    """
+    Скомпилированные шаблоны .dcoignore в синтаксисе gitignore.
+
+    Поддерживаются glob (*, ?, **, [...]), отрицание (!), шаблоны каталогов
+    (build/) и привязка к корню (/docs, src/gen/*.py). Как и в gitignore,
+    из подходящих шаблонов побеждает последний, а файл в исключённом
+    каталоге отрицанием не возвращается.
+
+    Суффиксные шаблоны (*.png и легаси-запись .png, совпадающая с концом
+    имени файла) и точные имена проверяются через словари, остальные
+    собраны в регулярные выражения по имени и по пути: на имя приходится
+    пара проверок словаря и fullmatch, а не проход по всем шаблонам. Решения по каталогам
+    кэшируются — каталоги общие для многих файлов.
+    """
+
+    DIRECTORY_CACHE_SIZE = 50_000
+
+    def __init__(self, patterns: Iterable[str]):
+        # суффикс -> (индекс последнего шаблона, отрицание)
+        self.suffixes: dict[str, tuple[int, bool]] = {}
+        # (индекс, отрицание, только каталоги, regex): шаблоны без слеша
+        # проверяются по имени, со слешем — по пути от корня
+        name_rules: list[tuple[int, bool, bool, str]] = []
+        path_rules: list[tuple[int, bool, bool, str]] = []
+        # точное имя -> (индекс последнего шаблона, отрицание)
+        file_names: dict[str, tuple[int, bool]] = {}
+        dir_names: dict[str, tuple[int, bool]] = {}
 
-    def _load_ignore_patterns(self, path: str) -> list[str]:
+        for index, pattern in enumerate(patterns):
+            negated = pattern.startswith("!")
+            if negated:
+                pattern = pattern[1:]
+            if pattern.startswith("\\"):
+                # \! и \# — литералы
+                pattern = pattern[1:]
+            if not pattern:
+                continue
+
+            suffix = _suffix(pattern)
+            if suffix is not None:
+                self.suffixes[suffix] = (index, negated)
+                continue
+
+            # build/ применяется только к каталогам
+            directory_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if not pattern.lstrip("/"):
+                continue
+            if "/" in pattern:
+                # Слеш в начале или в середине привязывает шаблон к корню репозитория
+                path_rules.append((index, negated, directory_only, _glob_regex(pattern.lstrip("/"))))
+            elif not GLOB_CHARS.search(pattern):
+                # Точное имя (node_modules, Makefile) — тоже через словарь
+                if not directory_only:
+                    file_names[pattern] = (index, negated)
+                dir_names[pattern] = (index, negated)
+            else:
+                name_rules.append((index, negated, directory_only, _glob_regex(pattern)))
+
+        self._file_rules = (
+            file_names,
+            _combine(rule for rule in name_rules if not rule[2]),
+            _combine(rule for rule in path_rules if not rule[2]),
+        )
+        self._dir_rules = (dir_names, _combine(name_rules), _combine(path_rules))
+        self._directories: dict[str, bool] = {}
+
+    @classmethod
+    def from_file(cls, path: str) -> "IgnoreMatcher":
         if not os.path.exists(path):
             logger.warning(f"{path} not found, no files ignored")
-            return []
+            return cls([])
 
         with open(path, "r", encoding="utf-8") as f:
-            patterns = [
+            return cls(
                 line.strip()
                 for line in f
                 if line.strip() and not line.startswith("#")
-            ]
+            )
+
+    def is_ignored(self, path: str) -> bool:
+        slash = path.find("/")
+        while slash != -1:
+            if self._is_directory_ignored(path[:slash]):
+                return True
+            slash = path.find("/", slash + 1)
+
+        return self._is_excluded(path, self._file_rules)
+
+    def _is_directory_ignored(self, directory: str) -> bool:
+        ignored = self._directories.get(directory)
+        if ignored is None:
+            ignored = self._is_excluded(directory, self._dir_rules)
+            if len(self._directories) >= self.DIRECTORY_CACHE_SIZE:
+                self._directories.clear()
+            self._directories[directory] = ignored
+        return ignored
+
+    def _is_excluded(self, path: str, rules) -> bool:
+        names, name_regex, path_regex = rules
+        name = path.rsplit("/", 1)[-1]
+        best: tuple[int, bool] | None = names.get(name)
 
-        return patterns
+        if self.suffixes:
+            dot = name.find(".")
+            while dot != -1:
+                found = self.suffixes.get(name[dot:])
+                if found is not None and (best is None or found[0] > best[0]):
+                    best = found
+                dot = name.find(".", dot + 1)
+
+        for (regex, groups), target in ((name_regex, name), (path_regex, path)):
+            if regex is None:
+                continue
+            match = regex.fullmatch(target)
+            if match is not None:
+                found = groups[match.lastindex - 1]
+                if best is None or found[0] > best[0]:
+                    best = found
+
+        return best is not None and not best[1]
+
+
+def _combine(alternatives) -> tuple[re.Pattern | None, list[tuple[int, bool]]]:
+    """Одно выражение из альтернатив; номер группы - 1 -> (индекс шаблона, отрицание)."""
+    # Последние шаблоны первыми: первая совпавшая альтернатива — победитель
+    alternatives = sorted(alternatives, key=lambda alternative: -alternative[0])
+    if not alternatives:
+        return None, []
+    regex = re.compile("|".join(f"({regex})" for _, _, _, regex in alternatives))
+    return regex, [(index, negated) for index, negated, _, _ in alternatives]
+
+
+def _suffix(pattern: str) -> str | None:
+    if "/" in pattern:
+        return None
+    if pattern.startswith(".") and not GLOB_CHARS.search(pattern):
+        # Легаси-формат .dcoignore: ".json" означает расширение
+        return pattern
+    match = SUFFIX_PATTERN.match(pattern)
+    return match[1] if match else None
+
+
+def _glob_regex(pattern: str) -> str:
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif char == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif char == "?":
+            parts.append("[^/]")
+            i += 1
+        elif char == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                parts.append(re.escape(char))
+                i += 1
+                continue
+            inner = pattern[i + 1:end]
+            if inner.startswith("!"):
+                inner = "^" + inner[1:]
+            parts.append("[" + inner.replace("\\", "\\\\") + "]")
+            i = end + 1
+        else:
+            parts.append(re.escape(char))
+            i += 1
+    return "".join(parts)
+
+
+class FilesFilter:
+    # Сколько решений по путям помнить: одни и те же файлы меняются во многих коммитах
+    CACHE_SIZE = 100_000
+
+    def __init__(self, ignore_file: str = ".dcoignore"):
+        self.matcher = IgnoreMatcher.from_file(ignore_file)
+        self._allowed: dict[str, bool] = {}
 
     def filter(self, commit: Commit) -> Commit:
-        
+
         before = len(commit.files)
 
         commit.files = [
             f for f in commit.files
-            if self._is_allowed(f.filename)
+            if self._is_allowed(f.path)
         ]
 
         after = len(commit.files)
@@ -41,13 +217,27 @@ class FilesFilter:
 
         return commit
 
-    def _is_allowed(self, filename: str) -> bool:
-        # скрытые файлы
-        if filename.startswith("."):
-            return False
-        # match по .dcoignore (glob, а не endswith)
-        for pattern in self.ignore_patterns:
-            if filename.endswith(pattern):
-                return False
+    def filter_many(self, commits: Iterable[Commit]) -> list[Commit]:
+        """filter для пачки коммитов; коммиты без файлов (files is None) не трогаются."""
+        return [
+            self.filter(commit) if commit.files is not None else commit
+            for commit in commits
+        ]
+
+    def filter_batch(self, batch: CommitBatch) -> CommitBatch:
+        removed = batch.filter_files(self._is_allowed)
+        if removed:
+            logger.debug(f"Batch of {len(batch)} commits: filtered {removed} files")
+        return batch
+
+    def _is_allowed(self, path: str) -> bool:
+        allowed = self._allowed.get(path)
+        if allowed is None:
+            # скрытые файлы
+            name = path.rsplit("/", 1)[-1]
+            allowed = not name.startswith(".") and not self.matcher.is_ignored(path)
 
-        return True
\ No newline at end of file
+            if len(self._allowed) >= self.CACHE_SIZE:
+                self._allowed.clear()
+            self._allowed[path] = allowed
+        return allowed
@@ -1,22 +1,25 @@
+from typing import Iterable
+
 from src.data.enums.language import FILE_EXTENSIONS, FUNCTION_PATTERNS, CLASS_PATTERNS, IMPORT_PATTERNS
 
-from transformers import AutoTokenizer
-from onnxruntime import InferenceSession
-import numpy as np
-import os
-import json
-import re
 
 
 """
     Было решено отказаться от ML модели для распознавания языка из-за низкой точности,
     особенно на коротких фрагментах кода или инлайнах фрагментах, а также
     из-за сложности поддержки такой модели, то есть  в следствии неэфектиности ее использовния.
+
+    transformers, onnxruntime и numpy импортируются только внутри модели:
+    на старте API (каждый воркер uvicorn) они не загружаются.
 """
 # class LanguageDetectorModel:
 #     def __init__(self):
 #         # FIXME: remove return, check __init__ for no internet work
 #         # return
+#         import json
+#         from onnxruntime import InferenceSession
+#         from transformers import AutoTokenizer
+#
 #         base_dir = os.path.dirname(__file__)
 #         model_dir = os.path.join(
 #             base_dir, "..", "..", "models", "lang_detect"
@@ -36,6 +39,8 @@ import re
 #             self.id2label = {int(k): v for k, v in cfg["id2label"].items()}
 
 #     def detect(self, code: str, threshold: float = 0.7):
+#         import numpy as np
+#
 #         inputs = self.tokenizer(
 #             code,
 #             return_tensors="np",
@@ -61,23 +66,126 @@ import re
 
 #     @staticmethod
 #     def _softmax(x):
+#         import numpy as np
+#
 #         e = np.exp(x - np.max(x))
 #         return e / e.sum()
 
 
+# Файлы, язык которых определяется по имени, а не по расширению
+SPECIAL_FILENAMES = {
+    "dockerfile": "Docker",
+    "containerfile": "Docker",
+    "makefile": "Makefile",
+    "gnumakefile": "Makefile",
+    "cmakelists.txt": "CMake",
+    "jenkinsfile": "Groovy",
+    "gemfile": "RB",
+    "rakefile": "RB",
+    "vagrantfile": "RB",
+    "podfile": "RB",
+    "procfile": "Config",
+    "requirements.txt": "Config",
+    "go.mod": "Go",
+    "go.sum": "Go",
+    "cargo.toml": "RS",
+    "cargo.lock": "RS",
+}
+
+# Составные расширения; проверяются раньше последнего (a.d.ts -> d.ts -> ts)
+COMPOUND_EXTENSIONS = {
+    "d.ts": "TypeScript",
+    "spec.ts": "TypeScript",
+    "test.ts": "TypeScript",
+    "spec.tsx": "TypeScript",
+    "test.tsx": "TypeScript",
+    "spec.js": "JavaScript",
+    "test.js": "JavaScript",
+    "min.js": "JavaScript",
+    "min.css": "CSS",
+    "blade.php": "PHP",
+}
+
+# Префиксы имён без расширения: Dockerfile.prod, Makefile.am
+SPECIAL_PREFIXES = (
+    ("dockerfile", "Docker"),
+    ("containerfile", "Docker"),
+    ("makefile", "Makefile"),
+)
+
+# Каталоги, где файлы без расширения обычно shell-скрипты
+SCRIPT_DIRS = {"bin", "scripts", "script", "hooks"}
+
+_MISSING = object()
+
+
 class LanguageDetector:
-    def __init__ (self):
-        pass
-    
-    def detect(self, filename: str):
-        lang = self._by_extension(filename)
+    """
+    Язык файла по пути: точное имя, составное и обычное расширение, затем
+    эвристики для файлов без расширения; None, если язык не определён.
+    Таблица собирается один раз (FILE_EXTENSIONS + пользовательские
+    file_extensions из БД поверх), результат запоминается по пути.
+    """
+
+    CACHE_SIZE = 100_000
+
+    def __init__ (self, overrides: dict[str, str] | None = None):
+        """overrides — extension (или имя файла) -> язык из таблицы file_extensions."""
+        self.extensions = {ext.lower(): lang for ext, lang in FILE_EXTENSIONS.items()}
+        self.extensions |= COMPOUND_EXTENSIONS
+        self.filenames = dict(SPECIAL_FILENAMES)
+
+        for key, lang in (overrides or {}).items():
+            key = key.lstrip(".")
+            # Имя файла (Dockerfile, Jenkinsfile) — с заглавной буквы или из SPECIAL_FILENAMES
+            if key.lower() in self.filenames or (key[:1].isupper() and "." not in key):
+                self.filenames[key.lower()] = lang
+            else:
+                self.extensions[key.lower()] = lang
+
+        self._cache: dict[str, str] = {}
+
+    def detect(self, path: str) -> str | None:
+        lang = self._cache.get(path, _MISSING)
+        if lang is _MISSING:
+            lang = self._detect(path)
+            if len(self._cache) >= self.CACHE_SIZE:
+                self._cache.clear()
+            self._cache[path] = lang
 
         return lang
-    
-    def _by_extension(self, filename: str):
-        if not filename:
-            return "Unknown"
-        if '.' not in filename:
-            return filename
-        ext = os.path.splitext(filename)[1].lstrip('.').lower()
-        return FILE_EXTENSIONS.get(ext)
+
+    def detect_many(self, paths: Iterable[str]) -> list[str | None]:
+        return [self.detect(path) for path in paths]
+
+    def _detect(self, path: str) -> str | None:
+        if not path:
+            return None
+
+        directory, _, name = path.rpartition("/")
+        name = name.lower()
+
+        lang = self.filenames.get(name)
+        if lang is not None:
+            return lang
+
+        # Скрытые файлы: расширение ищется после ведущей точки (.eslintrc.json)
+        dot = name.find(".", 1)
+        while dot != -1:
+            lang = self.extensions.get(name[dot + 1:])
+            if lang is not None:
+                return lang
+            dot = name.find(".", dot + 1)
+
+        return self._by_name_heuristics(directory, name)
+
+    def _by_name_heuristics(self, directory: str, name: str) -> str | None:
+        for prefix, lang in SPECIAL_PREFIXES:
+            if name.startswith(prefix):
+                return lang
+        if name.startswith("."):
+            # .bashrc, .eslintrc, .env.local, .gitignore
+            return "Config"
+        if "." not in name and directory.rsplit("/", 1)[-1] in SCRIPT_DIRS:
+            return "Shell"
+        return None
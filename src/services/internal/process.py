@@ -1,37 +1,38 @@
-import datetime
+from collections import deque
+from itertools import chain, islice
+from datetime import datetime
+from typing import Callable, Iterable, Iterator
 
-from requests import Session
-from src.adapters.db.models.commit_file import CommitFileModel
-from src.adapters.db.repositories.commit_file_repo import CommitFileRepository
 from src.adapters.db.base import SessionLocal
 from src.adapters.db.repositories.repository_repo import RepositoryRepository
 from src.adapters.db.repositories.contributor_repo import ContributorRepository
 from src.adapters.db.repositories.commit_repo import CommitRepository
+from src.adapters.db.repositories.file_extension import FileExtensionRepository
+from src.core.config import settings as app_settings
+from src.data.enums.fetch_backend import FetchBackend
 from src.data.github_api_response.commits_response_entity import SingleCommitEntity
 from src.services.external.github_stats_manual import *
-from src.services.internal.preprocessing.files_filter import FilesFilter
-from src.services.internal.preprocessing.commit_enricher import CommitEnricher
-from src.services.internal.preprocessing.file_language_enricher import (
-    FileLanguageEnricher,
-)
-from src.services.internal.preprocessing.commit_type_detector import (
-    HeuristicCommitClassifier,
-)
-from src.adapters.db.models.commit import CommitModel
+from src.services.external.github_graphql import iter_commit_history
+from src.services.external.commit_fetcher import fetch_commits_concurrently
+from src.services.external.git_local import GitCommandError, LocalGitRepository
+from src.services.internal.commit_writer import CommitBatchWriter, CommitCopyWriter
+from src.services.internal.analysis_settings import resolve_analysis_settings
+from src.services.internal.enrichment_pool import EnrichmentStage
+from src.services.internal.ingest_checkpoint import IngestCheckpoint
 from src.util.mapper import (
     git_commit_authors_json_to_dto_list,
-    single_commit_dto_to_domain_commit_dto,
-    single_commit_json_to_dto,
+    graphql_commit_node_to_domain_commit,
+    single_commit_json_to_domain_commit,
 )
 from src.util.logger import logger
-from src.services.internal.preprocessing.lang_detector import LanguageDetector
 
 import json
 import os
 import re
 
 
-lang_detector = LanguageDetector()
+# Сколько сводок коммитов проверяется на наличие в БД одним запросом
+EXISTENCE_CHECK_CHUNK = 100
 
 
 def process_repo(
@@ -42,38 +43,64 @@ def process_repo(
     scope_id,
     settings,
     since: datetime | None = None,
-    max_commits: int | None = None
+    max_commits: int | None = None,
+    reanalyse: bool = False,
+    backend: FetchBackend | str = FetchBackend.REST,
+    fetch_patches: bool = True,
+    clone_url: str | None = None,
+    on_progress: Callable[[dict], None] | None = None,
 ):
     """
     Обрабатывает репозиторий:
     1) Проверяет, есть ли репо в БД
     2) Если нет, создаёт репо, контрибьюторов и все коммиты
     3) Если есть, добавляет только новые коммиты и новых контрибьюторов
+    4) С reanalyse=True заново обогащает и уже сохранённые коммиты
+       (полные коммиты берутся из локального хранилища, без сети)
+
+    Повторные запуски инкрементальны: у репозитория хранится водяной знак
+    (последний загруженный head и время его коммита). История запрашивается
+    начиная с этого времени, пагинация останавливается на известном sha.
+    Водяной знак сдвигается, только если запуск покрыл всю новую историю
+    без ошибок. reanalyse=True сбрасывает его и проходит историю целиком.
+
+    backend — источник истории: REST (/commits + /commits/{sha} на каждый
+    коммит) или GraphQL (метаданные пачками по 100, REST только за патчами,
+    если fetch_patches=True) или GIT (локальное зеркало репозитория, история
+    читается из git log; clone_url позволяет взять вместо GitHub remote из
+    git_allowed_remotes, например путь к локальному bare-репозиторию).
+
+    on_progress получает {"processed": ..., "failed": ...} после каждой
+    обработанной пачки коммитов (прогресс задачи в очереди ingest_jobs).
+
+    Загрузка возобновляема (кроме reanalyse): после каждой записанной пачки
+    в ingest_checkpoints сохраняется позиция пагинации, до которой всё уже
+    в БД, и dead letter коммитов, которые не удалось обработать. Прерванный
+    запуск продолжается со своей позиции от того же head (новые коммиты
+    заберёт следующий запуск), коммиты из dead letter повторяются отдельно.
+    Записанные в dead letter ошибки не держат водяной знак.
     """
+    backend = FetchBackend(backend)
 
     #TODO: Получить настройки по id
 
-    commits = get_commits_list(
-        owner,
-        repo,
-        token=token,
-        since=since,
-        max_commits=max_commits,
+    # В локальной истории нет GitHub-логинов, контрибьюторов из API не запрашиваем
+    contributors = (
+        [] if backend is FetchBackend.GIT else get_contributors(owner, repo, token=token)
     )
-    contributors = get_contributors(owner, repo, token=token)
 
     dto_contributors = git_commit_authors_json_to_dto_list(contributors)
 
     with SessionLocal() as session:
         repo_repo = RepositoryRepository(session)
         contributor_repo = ContributorRepository(session)
-        commit_repo = CommitRepository(session)
 
         # ----------------------
         # Репозиторий
         # ----------------------
         db_repo = repo_repo.get_by_owner_name(owner, repo)
-        if not db_repo:
+        repo_created = db_repo is None
+        if repo_created:
             db_repo = repo_repo.create(
                 owner=owner,
                 name=repo,
@@ -85,136 +112,443 @@ def process_repo(
         else:
             logger.info("Repo already exists in DB: %s/%s", owner, repo)
 
+        # ----------------------
+        # Водяной знак синхронизации
+        # ----------------------
+        requested_since = since
+        watermark_sha = None
+        if reanalyse and db_repo.last_synced_sha:
+            # Полный проход заново выставит водяной знак, только если покроет
+            # историю без ошибок; иначе следующий запуск пройдёт историю целиком
+            repo_repo.reset_sync_watermark(db_repo.id)
+        elif db_repo.last_synced_sha:
+            watermark_sha = db_repo.last_synced_sha
+            if since is None:
+                since = db_repo.last_synced_committed_at
+
+        # ----------------------
+        # Контрольная точка: продолжение прерванной загрузки и dead letter
+        # ----------------------
+        checkpoint = None
+        if not reanalyse:
+            checkpoint = IngestCheckpoint.load(session, db_repo.id, backend.value, since)
+        retry = checkpoint.retryable() if checkpoint else {}
+        resume_head = checkpoint.resume_head if checkpoint else None
+
+        sync_state = {}
+        commits = iter_until_watermark(
+            list_commit_summaries(
+                owner,
+                repo,
+                token=token,
+                backend=backend,
+                since=since,
+                max_commits=max_commits,
+                clone_url=clone_url,
+                head=resume_head[0] if resume_head else None,
+                cursor=checkpoint.resume_cursor if checkpoint else None,
+                position=checkpoint.position if checkpoint else None,
+            ),
+            backend,
+            watermark_sha,
+            sync_state,
+            checkpoint,
+        )
+
         # ----------------------
         # Контрибьюторы
         # ----------------------
-        db_contributors = {}
-        for c in dto_contributors:
-            db_c = contributor_repo.get_or_create(
-                vcs_provider="github",
-                external_id=(
-                    str(c.id) if hasattr(c, "id") else None
-                ),  # используем GitHub numeric ID
-                login=c.login,
-                profile_url=c.html_url,
-            )
-            db_contributors[c.login] = db_c
+        contributor_rows = {
+            str(c.id): {  # используем GitHub numeric ID
+                "vcs_provider": "github",
+                "external_id": str(c.id),
+                "login": c.login,
+                "profile_url": c.html_url,
+            }
+            for c in dto_contributors
+        }
+        contributor_ids = contributor_repo.bulk_upsert(list(contributor_rows.values()))
+        # login -> id контрибьютора в БД
+        db_contributors = {
+            row["login"]: contributor_ids[external_id]
+            for external_id, row in contributor_rows.items()
+        }
 
         # ----------------------
         # Коммиты
         # ----------------------
-        existing_shas = get_existing_commit_shas(
-            session, db_repo.id
-        )  # ← функция, вернёт set
-        new_commits = []
-
-        # Инициализация пайплайна обогащения
-        files_filter = FilesFilter()
-        file_enricher = FileLanguageEnricher(lang_detector)
-        commit_type_detector = HeuristicCommitClassifier()
-        commit_enricher = CommitEnricher(
-            file_enricher=file_enricher, commit_type_detector=commit_type_detector
+        failed = 0
+
+        # Настройки анализа разрешаются один раз на запуск (кэш по области),
+        # commit_rules компилируются здесь же, а не на каждый коммит
+        analysis_settings = resolve_analysis_settings(settings, scope_type, scope_id, session)
+        # Фильтрация и обогащение: в потоке запроса или в пуле процессов (enrichment_workers)
+        enrichment = EnrichmentStage(
+            analysis_settings.raw,
+            # Читаются на каждый запуск, чтобы правки file_extensions доходили
+            # до долгоживущих воркеров; пул процессов пересоздаётся, только если они изменились
+            language_overrides=FileExtensionRepository(session).get_language_overrides(),
         )
-        commit_file_repo = CommitFileRepository(session)
 
-        for commit_json in commits:
-            if "author" not in commit_json or not commit_json["author"]:
-                continue
-            login = commit_json["author"]["login"]
-            sha = commit_json["sha"]
-            if sha in existing_shas:
-                continue  # Уже есть в БД
+        # Логины авторов коммитов, которые ещё в пути (от пагинации до сохранения)
+        commit_logins = {}
+        pending_summaries = iter_pending_summaries(
+            commits,
+            backend,
+            db_repo.id,
+            commit_logins,
+            skip_existing=not reanalyse,
+            checkpoint=checkpoint,
+            skip_shas=retry.keys(),
+        )
 
-            try:
-                # Получаем полный коммит с файлами и статистикой
-                full_commit_json = get_commit(owner, repo, sha, token=token)
+        # Пагинация, загрузка полных коммитов и обработка идут одновременно:
+        # коммиты обрабатываются по мере поступления, история целиком в памяти не держится.
+        # Первыми идут коммиты из dead letter прошлых запусков
+        if retry:
+            logger.info(f"Retrying {len(retry)} failed commits of {owner}/{repo}")
+        commit_logins.update(retry)
+        domain_commits = chain(
+            iter_retry_commits(owner, repo, token, list(retry), backend, clone_url),
+            iter_domain_commits(owner, repo, token, pending_summaries, backend, fetch_patches),
+        )
 
-                # Преобразуем в domain commit
-                commit_dto = single_commit_json_to_dto(full_commit_json)
-                commit_obj = single_commit_dto_to_domain_commit_dto(commit_dto)
+        # Коммиты пишутся в БД пачками, одна транзакция на пачку;
+        # в только что созданный репозиторий — через COPY
+        writer_cls = (
+            CommitCopyWriter
+            if repo_created and app_settings.db_copy_first_import
+            else CommitBatchWriter
+        )
+        def on_flush(shas, error):
+            if error is not None:
+                for sha in shas:
+                    checkpoint.fail(sha, error)
+            else:
+                checkpoint.persisted_many(shas)
+            checkpoint.save(session, sync_state.get("head"))
 
-                # Фильтрация и обогащение
-                commit_obj = files_filter.filter(commit_obj)
-                commit_obj = commit_enricher.enrich(
-                    commit_obj, commit_dto, scope_type, scope_id, settings, session
-                )
+        writer = writer_cls(
+            session, db_repo.id, on_flush=on_flush if checkpoint else None
+        )
 
-                # Создаем коммит в БД с базовыми полями
-                db_commit = commit_repo.create(
-                    repository_id=db_repo.id,
-                    contributor_id=(
-                        db_contributors.get(login).id
-                        if login in db_contributors
-                        else None
-                    ),
-                    sha=commit_obj.sha,
-                    message=commit_obj.message,
-                )
+        processed = 0
+        try:
+            for batch, errors in enrichment.iter_enriched_batches(domain_commits):
+                for sha, error in errors:
+                    # Ошибки уже залогированы стадией обогащения
+                    commit_logins.pop(sha)
+                    failed += 1
+                    if checkpoint:
+                        checkpoint.fail(sha, error)
 
-                # Обновляем метаданные коммита
-                commit_repo.update_details(
-                    commit_id=db_commit.id,
-                    authored_at=commit_dto.commit.author.date,
-                    committed_at=commit_dto.commit.committer.date,
-                    author_name=commit_dto.commit.author.name,
-                    author_email=commit_dto.commit.author.email,
-                    additions=commit_dto.stats.additions if commit_dto.stats else None,
-                    deletions=commit_dto.stats.deletions if commit_dto.stats else None,
-                    changes=commit_dto.stats.total if commit_dto.stats else None,
-                    commit_type=commit_obj.commit_type,
-                    is_conventional=commit_obj.is_conventional,
-                    conventional_type=commit_obj.conventional_type,
-                    conventional_scope=commit_obj.conventional_scope,
-                    is_breaking_change=commit_obj.is_breaking_change,
-                    is_merge_commit=commit_obj.is_merge_commit,
-                    is_revert_commit=commit_obj.is_revert_commit,
-                    parents_count=commit_obj.parents_count,
-                    files_changed=commit_obj.files_changed,
-                )
+                batch.contributor_id = [db_contributors.get(commit_logins.pop(sha)) for sha in batch.sha]
+                writer.add_batch(batch)
 
-                # Сохраняем файлы коммита
-                files_models = []
-                for f in commit_obj.files:
-                    files_models.append(
-                        CommitFileModel(
-                            commit_id=db_commit.id,
-                            file_path=f.path,
-                            additions=f.additions,
-                            deletions=f.deletions,
-                            changes=(
-                                f.additions + f.deletions
-                                if f.additions is not None and f.deletions is not None
-                                else None
-                            ),
-                            language=f.language,
-                            patch=f.patch,
-                        )
-                    )
-
-                if files_models:
-                    commit_file_repo.bulk_create(files_models)
-                    session.commit()  # Коммитим все изменения
-
-                new_commits.append(db_commit)
+                processed += len(batch)
+                if on_progress is not None:
+                    on_progress({"processed": processed, "failed": failed + writer.failed})
+        except Exception:
+            # Загрузка прервана (лимит API, сеть): готовое сохраняем, позиция остаётся для продолжения
+            if checkpoint:
+                try:
+                    writer.flush()
+                    checkpoint.save(session, sync_state.get("head"))
+                except Exception as e:
+                    logger.warning(f"Failed to save ingest checkpoint of {owner}/{repo}: {e}")
+            raise
 
-            except Exception as e:
-                logger.exception(f"Failed to process commit {sha}: {e}")
-                continue
+        writer.flush()
+        failed += writer.failed
+        new_commits = writer.saved
+
+        logger.info("Added %d new commits for %s/%s", new_commits, owner, repo)
+
+        # Прерванная загрузка продолжалась от своего head, а не от текущего
+        head = resume_head or sync_state.get("head")
+        covered = sync_state.get("reached_watermark") or (
+            # История пройдена до конца, а не обрезана явным since или max_commits
+            sync_state.get("exhausted")
+            and requested_since is None
+            and not (max_commits and sync_state["seen"] >= max_commits)
+        )
+        # Ошибки из dead letter повторятся отдельно и водяной знак не держат
+        if head and covered and (checkpoint or not failed) and head[0] != db_repo.last_synced_sha:
+            repo_repo.update_sync_watermark(db_repo.id, *head)
+            logger.info("Sync watermark of %s/%s moved to %s", owner, repo, head[0])
 
-        logger.info("Added %d new commits for %s/%s", len(new_commits), owner, repo)
+        dead_letter = 0
+        if checkpoint:
+            checkpoint.finish(session)
+            dead_letter = len(checkpoint.dead_letter)
+            if dead_letter:
+                logger.warning(f"{dead_letter} commits of {owner}/{repo} are in the dead letter")
     
-    process_repo_response = {"new-commits": str(len(new_commits)), "repository": repo, "owner": owner}
+    process_repo_response = {
+        "new-commits": str(new_commits),
+        "dead-letter": str(dead_letter),
+        "repository": repo,
+        "owner": owner,
+    }
     # print ("DB_REPO BEMS BEMS BEMS: {1}", )
     return process_repo_response
 
 
 # ----------------------
-# Получаем все sha коммитов для репо
+# Источники коммитов
 # ----------------------
-def get_existing_commit_shas(session, repo_id):
-    shas = (
-        session.query(CommitModel.sha)
-        .filter(CommitModel.repository_id == repo_id)
-        .all()
+def list_commit_summaries(
+    owner,
+    repo,
+    token,
+    backend: FetchBackend,
+    since: datetime | None = None,
+    max_commits: int | None = None,
+    clone_url: str | None = None,
+    head: str | None = None,
+    cursor=None,
+    position: dict | None = None,
+) -> Iterator:
+    """
+    Ленивый поток сводок коммитов, от новых к старым.
+
+    head и cursor продолжают прерванную загрузку: история от head, начиная
+    с позиции cursor (страница REST, курсор GraphQL, число коммитов git).
+    В position["cursor"] источник пишет позицию отдаваемой сводки.
+    """
+    if backend is FetchBackend.GIT:
+        git_repo = LocalGitRepository.for_github(
+            owner, repo, token=token, remote_url=clone_url
+        )
+        git_repo.sync()
+        return git_repo.iter_commits(
+            ref=head or "HEAD",
+            since=since,
+            max_commits=max_commits,
+            skip=cursor or 0,
+            position=position,
+        )
+    if backend is FetchBackend.GRAPHQL:
+        return iter_commit_history(
+            owner,
+            repo,
+            token=token,
+            since=since,
+            max_commits=max_commits,
+            head=head,
+            cursor=cursor,
+            position=position,
+        )
+    return iter_commits_list(
+        owner,
+        repo,
+        token=token,
+        since=since,
+        max_commits=max_commits,
+        head=head,
+        start_page=cursor or 1,
+        position=position,
     )
-    return set(s[0] for s in shas)
+
+
+def commit_summary_sha_and_login(summary, backend: FetchBackend):
+    """sha и GitHub-логин автора; логин None, если автор не привязан к аккаунту."""
+    if backend is FetchBackend.GIT:
+        return summary.sha, summary.author_login
+    if backend is FetchBackend.GRAPHQL:
+        user = (summary.get("author") or {}).get("user") or {}
+        return summary["oid"], user.get("login")
+    author = summary.get("author") or {}
+    return summary["sha"], author.get("login")
+
+
+def iter_until_watermark(
+    summaries: Iterator,
+    backend: FetchBackend,
+    watermark_sha: str | None,
+    state: dict,
+    checkpoint: IngestCheckpoint | None = None,
+) -> Iterator:
+    """
+    Пропускает сводки до коммита watermark_sha (не включая его) и закрывает источник.
+
+    В state записываются head (sha и время коммита первой сводки), seen,
+    reached_watermark и exhausted (источник закончился сам). Отданные
+    сводки регистрируются в контрольной точке вместе с позицией пагинации.
+    """
+    state.update(head=None, seen=0, reached_watermark=False, exhausted=False)
+    try:
+        for summary in summaries:
+            sha, login = commit_summary_sha_and_login(summary, backend)
+            if state["head"] is None:
+                state["head"] = (sha, commit_summary_committed_at(summary, backend))
+            state["seen"] += 1
+            if sha == watermark_sha:
+                # Дальше идёт уже загруженная история, следующие страницы не нужны
+                state["reached_watermark"] = True
+                return
+            if checkpoint is not None:
+                checkpoint.track(sha, login)
+            yield summary
+        state["exhausted"] = True
+    finally:
+        close = getattr(summaries, "close", None)
+        if close is not None:
+            close()
+
+
+def iter_pending_summaries(
+    summaries: Iterable,
+    backend: FetchBackend,
+    repository_id: int,
+    commit_logins: dict,
+    skip_existing: bool = True,
+    checkpoint: IngestCheckpoint | None = None,
+    skip_shas: Iterable[str] = (),
+) -> Iterator[tuple[str, object]]:
+    """
+    Пары (sha, сводка) для коммитов, которых ещё нет в БД.
+
+    Наличие в БД проверяется одним запросом на каждые EXISTENCE_CHECK_CHUNK
+    сводок, без загрузки всех sha репозитория. Логин автора записывается
+    в commit_logins до того, как sha уходит дальше. skip_shas (повторы из
+    dead letter) обрабатываются отдельно и здесь пропускаются; пропущенные
+    сводки отмечаются в контрольной точке как разрешённые.
+    """
+    skip_shas = set(skip_shas)
+    iterator = iter(summaries)
+    while chunk := list(islice(iterator, EXISTENCE_CHECK_CHUNK)):
+        candidates = []
+        for summary in chunk:
+            sha, login = commit_summary_sha_and_login(summary, backend)
+            if sha in skip_shas or (login is None and backend is not FetchBackend.GIT):
+                if checkpoint is not None:
+                    checkpoint.resolve(sha)
+                continue
+            candidates.append((sha, login, summary))
+
+        existing = set()
+        if skip_existing and candidates:
+            # Генератор читается из потока загрузчика, поэтому у проверки своя сессия
+            with SessionLocal() as check_session:
+                existing = CommitRepository(check_session).get_existing_shas(
+                    repository_id, [sha for sha, _, _ in candidates]
+                )
+
+        for sha, login, summary in candidates:
+            if sha in existing:
+                # Уже есть в БД
+                if checkpoint is not None:
+                    checkpoint.resolve(sha)
+                continue
+            commit_logins[sha] = login
+            yield sha, summary
+
+
+def commit_summary_committed_at(summary, backend: FetchBackend) -> datetime | None:
+    if backend is FetchBackend.GIT:
+        return summary.committed_at
+    if backend is FetchBackend.GRAPHQL:
+        value = summary.get("committedDate")
+    else:
+        value = ((summary.get("commit") or {}).get("committer") or {}).get("date")
+    return datetime.fromisoformat(value) if value else None
+
+
+def iter_retry_commits(
+    owner,
+    repo,
+    token,
+    shas: list[str],
+    backend: FetchBackend,
+    clone_url: str | None = None,
+):
+    """
+    (sha, Commit | None, error) для коммитов из dead letter, по sha, без
+    пагинации: из локального зеркала в GIT-режиме, иначе полным коммитом
+    из REST (патчи нужны и коммитам, загруженным через GraphQL).
+    """
+    if not shas:
+        return
+
+    if backend is FetchBackend.GIT:
+        # Зеркало уже синхронизировано list_commit_summaries
+        git_repo = LocalGitRepository.for_github(
+            owner, repo, token=token, remote_url=clone_url
+        )
+        for sha in shas:
+            try:
+                commits = list(git_repo.iter_commits(ref=sha, max_commits=1))
+            except Exception as e:
+                yield sha, None, e
+                continue
+            if commits:
+                yield sha, commits[0], None
+            else:
+                yield sha, None, GitCommandError(f"Commit {sha} not found")
+        return
+
+    for sha, commit_json, error in fetch_commits_concurrently(owner, repo, shas, token=token):
+        if error is not None:
+            yield sha, None, error
+            continue
+        try:
+            yield sha, single_commit_json_to_domain_commit(commit_json), None
+        except Exception as e:
+            yield sha, None, e
+
+
+def iter_domain_commits(
+    owner,
+    repo,
+    token,
+    summaries: Iterable[tuple[str, object]],
+    backend: FetchBackend,
+    fetch_patches: bool = True,
+):
+    """
+    Возвращает (sha, Commit | None, error) для каждой пары (sha, сводка).
+
+    В GraphQL-режиме коммит строится из метаданных; полный коммит из REST
+    запрашивается только ради патчей и только для не-merge коммитов
+    (патч merge-коммита повторяет изменения влитой ветки). В GIT-режиме
+    summaries уже содержат готовые Commit.
+    """
+    if backend is FetchBackend.GIT:
+        for sha, commit in summaries:
+            yield sha, commit, None
+        return
+
+    if backend is FetchBackend.GRAPHQL and not fetch_patches:
+        for sha, node in summaries:
+            yield sha, graphql_commit_node_to_domain_commit(node), None
+        return
+
+    # Узлы GraphQL, которым не нужен REST; источник sha читается в потоке загрузчика
+    metadata_only = deque()
+
+    def rest_shas():
+        for sha, summary in summaries:
+            if backend is FetchBackend.GRAPHQL and summary["parents"]["totalCount"] > 1:
+                metadata_only.append((sha, summary))
+            else:
+                yield sha
+
+    def drain_metadata_only():
+        while metadata_only:
+            sha, node = metadata_only.popleft()
+            yield sha, graphql_commit_node_to_domain_commit(node), None
+
+    for sha, commit_json, error in fetch_commits_concurrently(
+        owner, repo, rest_shas(), token=token
+    ):
+        yield from drain_metadata_only()
+        if error is not None:
+            yield sha, None, error
+            continue
+        try:
+            yield sha, single_commit_json_to_domain_commit(commit_json), None
+        except Exception as e:
+            yield sha, None, e
+
+    yield from drain_metadata_only()
@@ -0,0 +1,25 @@
+"""
+Проверка имён владельца и репозитория GitHub.
+
+owner и repo попадают в пути REST API и в путь зеркала на диске,
+поэтому принимаются только символы, которые допускает GitHub.
+"""
+import re
+
+
+# Логин или организация: буквы, цифры и дефис, не с дефиса, до 39 символов
+OWNER_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9-]{0,38}")
+# Репозиторий: буквы, цифры, точка, дефис и подчёркивание, до 100 символов
+REPO_RE = re.compile(r"[A-Za-z0-9._-]{1,100}")
+
+
+def validate_owner(owner: str) -> str:
+    if not isinstance(owner, str) or not OWNER_RE.fullmatch(owner):
+        raise ValueError(f"Invalid GitHub owner: {owner!r}")
+    return owner
+
+
+def validate_repo(repo: str) -> str:
+    if not isinstance(repo, str) or not REPO_RE.fullmatch(repo) or repo in (".", ".."):
+        raise ValueError(f"Invalid GitHub repository name: {repo!r}")
+    return repo
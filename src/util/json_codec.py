@@ -0,0 +1,24 @@
+"""
+Разбор и сериализация JSON: orjson, если установлен, иначе стандартный json.
+
+orjson разбирает ответы GitHub с патчами в несколько раз быстрее и сразу
+работает с bytes, без декодирования тела ответа в str.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(value) -> bytes:
+        return orjson.dumps(value)
+else:
+    loads = json.loads
+
+    def dumps(value) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
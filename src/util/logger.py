@@ -2,15 +2,23 @@ import logging
 from datetime import datetime
 import os
 
-os.makedirs("logs", exist_ok=True)
+
+class LazyFileHandler(logging.FileHandler):
+    """Каталог logs и файл лога создаются при первой записи, а не при импорте."""
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
-file_handler = logging.FileHandler(
+file_handler = LazyFileHandler(
     f'logs/{datetime.now().strftime("%d.%m.%Y_%H-%M-%S")}.log',
     mode='a',
-    encoding='utf-8'
+    encoding='utf-8',
+    delay=True,
 )
 file_handler.setLevel(logging.INFO)
 
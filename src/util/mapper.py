@@ -136,6 +136,55 @@ def git_commit_authors_json_to_dto_list(json):
 DTO Mappers (GitHub -> Domain)
 """
 
+def single_commit_json_to_domain_commit(json: dict) -> Commit:
+    """
+    JSON полного коммита сразу в Commit, минуя SingleCommitEntity.
+
+    Читаются только поля, которые использует конвейер (URL, node_id,
+    профили автора и коммитера не трогаются), валидация — один
+    model_validate на коммит вместе с файлами.
+    """
+    commit = json["commit"]
+    git_author = commit.get("author") or {}
+    git_committer = commit.get("committer") or {}
+    # author — null, если email коммита не привязан к аккаунту GitHub
+    author = json.get("author") or {}
+    stats = json.get("stats") or {}
+    files = json.get("files") or []
+
+    return Commit.model_validate({
+        "sha": json["sha"],
+        "message": commit["message"],
+        "author_login": author.get("login"),
+
+        "authored_at": git_author.get("date"),
+        "committed_at": git_committer.get("date"),
+
+        "author_name": git_author.get("name"),
+        "author_email": git_author.get("email"),
+
+        "additions": stats.get("additions", 0),
+        "deletions": stats.get("deletions", 0),
+        "changes": stats.get("total", 0),
+
+        "parents_count": len(json["parents"]),
+        "files_changed": len(files),
+
+        "files": [
+            {
+                "path": f["filename"],
+                "filename": f["filename"].rsplit("/", 1)[-1],
+                "patch": f["patch"],
+                "additions": f["additions"],
+                "deletions": f["deletions"],
+            }
+            for f in files
+            # Бинарные и слишком большие файлы приходят без patch
+            if f.get("patch")
+        ],
+    })
+
+
 def single_commit_dto_to_domain_commit_dto(dto: SingleCommitEntity) -> Commit:
     return Commit(
         sha=dto.sha,
@@ -152,6 +201,9 @@ def single_commit_dto_to_domain_commit_dto(dto: SingleCommitEntity) -> Commit:
         deletions=dto.stats.deletions if dto.stats else None,
         changes=dto.stats.total if dto.stats else None,
 
+        parents_count=len(dto.parents),
+        files_changed=len(dto.files),
+
         files=[
             FileChange(
                 path=f.filename,
@@ -164,3 +216,41 @@ def single_commit_dto_to_domain_commit_dto(dto: SingleCommitEntity) -> Commit:
             if f.patch
         ],
     )
+
+
+
+"""
+GraphQL Mappers (GitHub GraphQL -> Domain)
+"""
+
+def graphql_commit_node_to_domain_commit(node: dict) -> Commit:
+    """Коммит без файлов: GraphQL не отдаёт патчи, только статистику."""
+    author = node.get("author") or {}
+    user = author.get("user") or {}
+    additions = node.get("additions")
+    deletions = node.get("deletions")
+
+    return Commit(
+        sha=node["oid"],
+        message=node["message"],
+        author_login=user.get("login"),
+
+        authored_at=node.get("authoredDate"),
+        committed_at=node.get("committedDate"),
+
+        author_name=author.get("name"),
+        author_email=author.get("email"),
+
+        additions=additions,
+        deletions=deletions,
+        changes=(
+            additions + deletions
+            if additions is not None and deletions is not None
+            else None
+        ),
+
+        parents_count=node["parents"]["totalCount"],
+        files_changed=node.get("changedFilesIfAvailable"),
+
+        files=None,
+    )
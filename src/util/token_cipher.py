@@ -0,0 +1,43 @@
+"""
+Шифрование токенов GitHub, которые ждут воркера в ingest_jobs.token.
+
+Токен шифруется Fernet ключом ingest_token_key (один и тот же у API и
+воркеров). Ключей может быть несколько через запятую: шифрует первый,
+расшифровывает любой — так ключ меняется без потери задач в очереди.
+"""
+from functools import lru_cache
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+except ImportError:
+    Fernet = None
+
+from src.core.config import settings
+
+
+class TokenCipherError(Exception):
+    pass
+
+
+def encrypt_token(token: str) -> str:
+    return _cipher(settings.ingest_token_key).encrypt(token.encode("utf-8")).decode("ascii")
+
+
+def decrypt_token(value: str) -> str:
+    try:
+        return _cipher(settings.ingest_token_key).decrypt(value.encode("ascii")).decode("utf-8")
+    except (InvalidToken, UnicodeEncodeError):
+        raise TokenCipherError("Stored GitHub token cannot be decrypted with ingest_token_key")
+
+
+@lru_cache(maxsize=4)
+def _cipher(keys: str) -> "MultiFernet":
+    if Fernet is None:
+        raise TokenCipherError("cryptography is required to store GitHub tokens of ingest jobs")
+    keys = [key.strip() for key in keys.split(",") if key.strip()]
+    if not keys:
+        raise TokenCipherError("ingest_token_key is not set, GitHub tokens cannot be stored")
+    try:
+        return MultiFernet([Fernet(key) for key in keys])
+    except ValueError as e:
+        raise TokenCipherError(f"Invalid ingest_token_key: {e}")
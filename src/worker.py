@@ -0,0 +1,158 @@
+"""
+Воркер очереди загрузки репозиториев (ingest_jobs).
+
+    python -m src.worker [--id worker-1]
+
+Забирает задачи через SELECT ... FOR UPDATE SKIP LOCKED, поэтому воркеров
+можно запускать сколько угодно на любом числе узлов — каждая задача
+достаётся одному. Пока задача выполняется, отдельный поток раз в
+ingest_heartbeat_interval отмечает её и сохраняет прогресс; задачи
+упавших воркеров возвращаются в очередь по ingest_stale_after. Если
+задачу за это время забрал другой воркер, текущий прерывает её на
+следующей пачке коммитов и ничего в неё не пишет.
+SIGTERM/SIGINT завершают воркер после текущей задачи.
+"""
+import argparse
+import os
+import signal
+import socket
+import threading
+import traceback
+from datetime import datetime
+
+from src.adapters.db.base import SessionLocal
+from src.adapters.db.models.ingest_job import IngestJobModel
+from src.adapters.db.repositories.ingest_job_repo import IngestJobRepository
+from src.core.config import settings
+from src.services.internal.process import process_repo
+from src.util.logger import logger
+from src.util.token_cipher import decrypt_token
+
+
+class JobOwnershipLost(Exception):
+    pass
+
+
+class JobHeartbeat:
+    """
+    Поток, который отмечает задачу и сохраняет последний прогресс.
+    Когда задача перестаёт принадлежать воркеру, взводится lost, а
+    следующий update прерывает обработку исключением JobOwnershipLost.
+    """
+
+    def __init__(self, job_id: int, worker_id: str, interval: float):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.progress: dict = {}
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"ingest-heartbeat-{job_id}", daemon=True
+        )
+
+    def update(self, progress: dict):
+        if self.lost.is_set():
+            raise JobOwnershipLost(f"Ingest job {self.job_id} is no longer owned by {self.worker_id}")
+        self.progress = progress
+
+    def __enter__(self) -> "JobHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                with SessionLocal() as session:
+                    owned = IngestJobRepository(session).heartbeat(
+                        self.job_id, self.worker_id, dict(self.progress)
+                    )
+                if not owned:
+                    logger.warning(f"Ingest job {self.job_id} is no longer owned by {self.worker_id}")
+                    self.lost.set()
+                    return
+            except Exception as e:
+                logger.warning(f"Heartbeat of ingest job {self.job_id} failed: {e}")
+
+
+class IngestWorker:
+    def __init__(self, worker_id: str | None = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+
+    def stop(self, *_):
+        logger.info(f"Ingest worker {self.worker_id} stopping after current job")
+        self._stop.set()
+
+    def run(self):
+        logger.info(f"Ingest worker {self.worker_id} started")
+        while not self._stop.is_set():
+            with SessionLocal() as session:
+                jobs = IngestJobRepository(session)
+                requeued = jobs.requeue_stale(settings.ingest_stale_after)
+                if requeued:
+                    logger.warning(f"Requeued {requeued} stale ingest jobs")
+                job = jobs.claim_next(self.worker_id)
+                if job is not None:
+                    session.expunge(job)
+
+            if job is None:
+                self._stop.wait(settings.ingest_poll_interval)
+                continue
+            self.run_job(job)
+
+    def run_job(self, job: IngestJobModel):
+        logger.info(f"Ingest job {job.id}: {job.owner}/{job.repo}, attempt {job.attempts}")
+        params = job.params or {}
+        since = params.get("since")
+
+        with JobHeartbeat(job.id, self.worker_id, settings.ingest_heartbeat_interval) as heartbeat:
+            try:
+                result = process_repo(
+                    job.owner,
+                    job.repo,
+                    token=decrypt_token(job.token),
+                    scope_type=job.scope_type,
+                    scope_id=job.scope_id,
+                    settings=job.settings,
+                    since=datetime.fromisoformat(since) if since else None,
+                    max_commits=params.get("max_commits"),
+                    reanalyse=params.get("reanalyse", False),
+                    backend=params.get("backend", "rest"),
+                    fetch_patches=params.get("fetch_patches", True),
+                    clone_url=params.get("clone_url"),
+                    on_progress=heartbeat.update,
+                )
+            except JobOwnershipLost as e:
+                # Задачу вернули в очередь или забрал другой воркер: её статус не наш
+                logger.warning(f"{e}, run aborted")
+                return
+            except Exception as e:
+                logger.exception(f"Ingest job {job.id} failed: {e}")
+                with SessionLocal() as session:
+                    IngestJobRepository(session).fail(
+                        job.id, self.worker_id, traceback.format_exc(), heartbeat.progress
+                    )
+                return
+
+        if heartbeat.lost.is_set():
+            logger.warning(f"Ingest job {job.id} finished after its ownership was lost, result dropped")
+            return
+        with SessionLocal() as session:
+            IngestJobRepository(session).complete(job.id, self.worker_id, result, heartbeat.progress)
+        logger.info(f"Ingest job {job.id} done: {result}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--id", dest="worker_id", default=None)
+    args = parser.parse_args()
+
+    worker = IngestWorker(args.worker_id)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
@@ -0,0 +1,83 @@
+"""
+Память и передача в пул процессов: список pydantic Commit/FileChange
+против колоночного CommitBatch на 10k коммитов по 5 файлов. Память —
+копии после pickle (как у воркера пула); патчи короткие, поэтому в
+замер попадают в основном накладные расходы представления.
+
+    PYTHONPATH=. python test/bench/commit_batch_bench.py
+"""
+import pickle
+import time
+import tracemalloc
+
+from src.data.domain.commit import Commit
+from src.data.domain.commit_batch import CommitBatch
+from src.data.domain.file_change import FileChange
+
+
+COMMITS = 10_000
+FILES_PER_COMMIT = 5
+PATCH = "@@ -1,2 +1,2 @@\n-old\n+new\n"
+
+
+def make_commits() -> list[Commit]:
+    return [
+        Commit(
+            sha=f"{i:040x}",
+            author_login="octocat",
+            message="fix: handle empty response",
+            authored_at="2024-05-01T10:00:00Z",
+            committed_at="2024-05-01T10:00:00Z",
+            author_name="Octo Cat",
+            author_email="octo@example.com",
+            additions=10,
+            deletions=2,
+            changes=12,
+            parents_count=1,
+            files_changed=FILES_PER_COMMIT,
+            commit_type="fix",
+            conventional_type="fix",
+            files=[
+                FileChange(
+                    path=f"src/module{j}/file{i % 100}.py",
+                    filename=f"file{i % 100}.py",
+                    patch=PATCH,
+                    additions=2,
+                    deletions=1,
+                    language="Python",
+                )
+                for j in range(FILES_PER_COMMIT)
+            ],
+        )
+        for i in range(COMMITS)
+    ]
+
+
+def measure(name, build):
+    started = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    data = pickle.dumps(value)
+    pickle.loads(data)
+    roundtrip = time.perf_counter() - started
+
+    # Память самостоятельной копии: строки не разделяются с исходными объектами
+    tracemalloc.start()
+    copy = pickle.loads(data)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del copy
+
+    print(
+        f"{name:<14} build {elapsed:6.3f} s  memory {size / 2 ** 20:7.1f} MB  "
+        f"pickle {len(data) / 2 ** 20:6.1f} MB  roundtrip {roundtrip:6.3f} s"
+    )
+    return value, size
+
+
+if __name__ == "__main__":
+    commits, commits_size = measure("list[Commit]", make_commits)
+    _, batch_size = measure("CommitBatch", lambda: CommitBatch.from_commits(commits))
+    print(f"memory: x{commits_size / batch_size:.1f}")
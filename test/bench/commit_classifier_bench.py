@@ -0,0 +1,108 @@
+"""
+Сравнение сопоставления commit_rules: проход по всем правилам и ключевым
+словам на каждый коммит против скомпилированного CompiledCommitRules.
+
+Набор правил имитирует настройки организации: сотни ключевых слов на
+нескольких языках.
+
+    PYTHONPATH=. python test/bench/commit_classifier_bench.py
+"""
+import random
+import time
+from datetime import datetime, timezone
+
+from src.data.domain.commit import Commit
+from src.services.internal.preprocessing.commit_type_detector import (
+    CompiledCommitRules,
+    HeuristicCommitClassifier,
+)
+
+
+RULES = 40
+KEYWORDS_PER_RULE = 12
+COMMITS = 20000
+
+WORDS = [
+    "update", "change", "module", "config", "handler", "service", "client",
+    "обновил", "модуль", "конфиг", "сервис", "клиент", "обработчик",
+    "aktualisiert", "dienst", "änderung", "mise", "à", "jour",
+]
+
+
+def make_settings(rng: random.Random) -> dict:
+    alphabet = "abcdefghijklmnopqrstuvwxyzабвгдеклмнопрст"
+    return {
+        "commit_rules": {
+            "default_category": "NO CATEGORY",
+            "rules": [
+                {
+                    "name": f"Rule {i}",
+                    "category": f"category_{i}",
+                    "keywords": [
+                        "".join(rng.choice(alphabet) for _ in range(rng.randint(4, 9)))
+                        for _ in range(KEYWORDS_PER_RULE)
+                    ],
+                    "priority": rng.randint(0, 100),
+                }
+                for i in range(RULES)
+            ],
+        }
+    }
+
+
+def make_commits(rng: random.Random, settings: dict) -> list[Commit]:
+    keywords = [k for rule in settings["commit_rules"]["rules"] for k in rule["keywords"]]
+    now = datetime.now(timezone.utc)
+    commits = []
+    for i in range(COMMITS):
+        words = rng.choices(WORDS, k=rng.randint(4, 14))
+        if i % 3 == 0:
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        commits.append(Commit(
+            sha=f"{i:040x}",
+            author_login=None,
+            message=" ".join(words) + f" (#{i})",
+            authored_at=now,
+            committed_at=now,
+            parents_count=1,
+            files_changed=1,
+        ))
+    return commits
+
+
+def match_loop(settings: dict, msg: str):
+    """Прежняя реализация: все правила и ключевые слова на каждый коммит."""
+    commit_rules = settings.get("commit_rules", {})
+    matched = commit_rules.get("default_category", "NO CATEGORY")
+    highest_priority = -1
+    for rule in commit_rules.get("rules", []):
+        for keyword in rule.get("keywords", []):
+            if keyword.lower() in msg:
+                if rule.get("priority", 0) > highest_priority:
+                    matched = rule["category"]
+                    highest_priority = rule.get("priority", 0)
+    return matched
+
+
+if __name__ == "__main__":
+    rng = random.Random(42)
+    settings = make_settings(rng)
+    commits = make_commits(rng, settings)
+    messages = [c.message.lower() for c in commits]
+    print(f"rules: {RULES}, keywords: {RULES * KEYWORDS_PER_RULE}, commits: {COMMITS}")
+
+    started = time.perf_counter()
+    expected = [match_loop(settings, msg) for msg in messages]
+    loop = time.perf_counter() - started
+    print(f"keyword loop     {loop:7.3f} s")
+
+    started = time.perf_counter()
+    rules = CompiledCommitRules.from_settings(settings)
+    actual = [rules.match(msg) or rules.default_category for msg in messages]
+    compiled = time.perf_counter() - started
+    print(f"compiled rules   {compiled:7.3f} s  x{loop / compiled:.1f}")
+    assert actual == expected
+
+    started = time.perf_counter()
+    HeuristicCommitClassifier().detect_many(commits, settings)
+    print(f"detect_many      {time.perf_counter() - started:7.3f} s")
@@ -0,0 +1,84 @@
+"""
+Сравнение последовательной и конкурентной загрузки коммитов на локальной
+заглушке GitHub API с искусственной задержкой ответа.
+
+    PYTHONPATH=. python test/bench/commit_fetcher_bench.py
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from src.core.config import settings
+from src.services.external.commit_fetcher import fetch_commits_concurrently
+from src.services.external.github_stats_manual import get_commit
+
+
+COMMITS = 200
+LATENCY = 0.05
+CONCURRENCY = 16
+
+EXAMPLE_COMMIT = (
+    Path(__file__).parents[2] / "response_examples" / "repos_owner_repo_commits_ref.json"
+).read_bytes()
+
+
+class StubGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(EXAMPLE_COMMIT)))
+        self.end_headers()
+        self.wfile.write(EXAMPLE_COMMIT)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGitHubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.github_api_url = f"http://127.0.0.1:{server.server_port}"
+    # Коммиты по sha отдавались бы из кэша и хранилища без запросов
+    settings.github_cache_enabled = False
+    settings.commit_store_enabled = False
+    return server
+
+
+def bench_serial(shas):
+    started = time.perf_counter()
+    for sha in shas:
+        get_commit("owner", "repo", sha, token="stub")
+    return time.perf_counter() - started
+
+
+def bench_concurrent(shas):
+    started = time.perf_counter()
+    fetched = 0
+    for sha, commit_json, error in fetch_commits_concurrently(
+        "owner", "repo", shas, token="stub", concurrency=CONCURRENCY
+    ):
+        if error is not None:
+            raise error
+        fetched += 1
+    assert fetched == len(shas)
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    server = start_stub_server()
+    shas = [f"{i:040x}" for i in range(COMMITS)]
+
+    serial = bench_serial(shas)
+    concurrent = bench_concurrent(shas)
+
+    print(f"commits: {COMMITS}, latency: {LATENCY * 1000:.0f} ms, concurrency: {CONCURRENCY}")
+    print(f"serial:     {serial:.2f} s ({COMMITS / serial:.0f} commits/s)")
+    print(f"concurrent: {concurrent:.2f} s ({COMMITS / concurrent:.0f} commits/s)")
+    print(f"speedup:    x{serial / concurrent:.1f}")
+
+    server.shutdown()
@@ -0,0 +1,142 @@
+"""
+Сравнение способов записи коммитов с файлами в PostgreSQL: ORM
+(create + bulk_create на каждый коммит), пакетный upsert и COPY.
+
+Нужна доступная БД (переменные DB_*). Бенчмарк создаёт временные
+репозитории и удаляет их за собой.
+
+    PYTHONPATH=. python test/bench/copy_loader_bench.py
+"""
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, select
+
+from src.adapters.db.base import SessionLocal
+from src.adapters.db.models.commit import CommitModel
+from src.adapters.db.models.commit_file import CommitFileModel
+# Цели внешних ключей commits.contributor_id и repositories.project_id
+from src.adapters.db.models import contributor  # noqa: F401
+from src.adapters.db.models.org import project  # noqa: F401
+from src.adapters.db.models.repository import RepositoryModel
+from src.adapters.db.repositories.commit_file_repo import CommitFileRepository
+from src.adapters.db.repositories.commit_repo import CommitRepository
+from src.data.domain.commit import Commit
+from src.data.domain.file_change import FileChange
+from src.services.internal.commit_writer import (
+    CommitBatchWriter,
+    CommitCopyWriter,
+    commit_to_row,
+    file_change_to_row,
+)
+
+
+COMMITS = 2000
+FILES_PER_COMMIT = 5
+PATCH_LINES = 60
+
+
+def make_commits() -> list[Commit]:
+    started_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    patch = "@@ -1,30 +1,30 @@\n" + "".join(
+        f"{'+' if i % 2 else '-'}    value_{i} = compute(value_{i - 1}, {i})\n"
+        for i in range(PATCH_LINES)
+    )
+    return [
+        Commit(
+            sha=uuid.uuid4().hex + uuid.uuid4().hex[:8],
+            author_login=None,
+            message=f"feat: change {i}",
+            authored_at=started_at + timedelta(minutes=i),
+            committed_at=started_at + timedelta(minutes=i),
+            author_name="Bench",
+            author_email="bench@example.com",
+            additions=FILES_PER_COMMIT * PATCH_LINES // 2,
+            deletions=FILES_PER_COMMIT * PATCH_LINES // 2,
+            changes=FILES_PER_COMMIT * PATCH_LINES,
+            commit_type="feat",
+            parents_count=1,
+            files_changed=FILES_PER_COMMIT,
+            files=[
+                FileChange(
+                    path=f"src/module_{j}/file_{i % 100}.py",
+                    filename=f"file_{i % 100}.py",
+                    patch=patch,
+                    additions=PATCH_LINES // 2,
+                    deletions=PATCH_LINES // 2,
+                    language="Python",
+                )
+                for j in range(FILES_PER_COMMIT)
+            ],
+        )
+        for i in range(COMMITS)
+    ]
+
+
+def write_orm(session, repository_id, commits):
+    """Путь до пакетной записи: коммит через create, файлы через bulk_create."""
+    commit_repo = CommitRepository(session)
+    commit_file_repo = CommitFileRepository(session)
+    for commit in commits:
+        row = commit_to_row(commit, repository_id, None)
+        db_commit = commit_repo.create(**row)
+        commit_file_repo.bulk_create([
+            CommitFileModel(commit_id=db_commit.id, **file_change_to_row(f))
+            for f in commit.files
+        ])
+
+
+def write_with(writer_cls):
+    def write(session, repository_id, commits):
+        writer = writer_cls(session, repository_id)
+        for commit in commits:
+            writer.add(commit)
+        writer.flush()
+        assert writer.failed == 0
+
+    return write
+
+
+def run(name, write, commits):
+    with SessionLocal() as session:
+        repo_id = session.scalar(
+            insert(RepositoryModel.__table__)
+            .values(
+                owner="bench",
+                name=f"{name}-{uuid.uuid4().hex[:8]}",
+                vcs_provider="github",
+                url="https://example.com/bench",
+            )
+            .returning(RepositoryModel.id)
+        )
+        session.commit()
+        try:
+            started = time.perf_counter()
+            write(session, repo_id, commits)
+            elapsed = time.perf_counter() - started
+        finally:
+            session.rollback()
+            commit_ids = select(CommitModel.id).where(CommitModel.repository_id == repo_id)
+            session.execute(
+                delete(CommitFileModel).where(CommitFileModel.commit_id.in_(commit_ids))
+            )
+            session.execute(delete(CommitModel).where(CommitModel.repository_id == repo_id))
+            session.execute(delete(RepositoryModel).where(RepositoryModel.id == repo_id))
+            session.commit()
+
+    rows = len(commits) * (1 + FILES_PER_COMMIT)
+    print(f"{name:<14} {elapsed:7.2f} s  {rows / elapsed:9.0f} rows/s")
+    return elapsed
+
+
+if __name__ == "__main__":
+    commits = make_commits()
+    print(f"commits: {COMMITS}, files per commit: {FILES_PER_COMMIT}, patch lines: {PATCH_LINES}")
+
+    orm = run("orm", write_orm, commits)
+    batch = run("batch upsert", write_with(CommitBatchWriter), commits)
+    copy = run("copy", write_with(CommitCopyWriter), commits)
+
+    print(f"copy vs orm:          x{orm / copy:.1f}")
+    print(f"copy vs batch upsert: x{batch / copy:.1f}")
@@ -0,0 +1,82 @@
+"""
+Проверка путей по .dcoignore: прежний проход по всем шаблонам с endswith
+против скомпилированного IgnoreMatcher (словарь суффиксов + одно
+регулярное выражение) на 10k путей и 500 шаблонов.
+
+    PYTHONPATH=. python test/bench/files_filter_bench.py
+"""
+import fnmatch
+import random
+import time
+
+from src.services.internal.preprocessing.files_filter import IgnoreMatcher
+
+
+PATHS = 10_000
+SUFFIX_PATTERNS = 300
+GLOB_PATTERNS = 200
+
+
+def make_patterns(rng: random.Random) -> list[str]:
+    patterns = [f"*.ext{i}" for i in range(SUFFIX_PATTERNS // 2)]
+    patterns += [f".legacy{i}" for i in range(SUFFIX_PATTERNS - len(patterns))]
+    for i in range(GLOB_PATTERNS):
+        kind = i % 4
+        if kind == 0:
+            patterns.append(f"build{i}/")
+        elif kind == 1:
+            patterns.append(f"/generated{i}/**/*.py")
+        elif kind == 2:
+            patterns.append(f"**/fixtures{i}/*.json")
+        else:
+            patterns.append(f"!keep{i}.ext{rng.randrange(SUFFIX_PATTERNS // 2)}")
+    rng.shuffle(patterns)
+    return patterns
+
+
+def make_paths(rng: random.Random) -> list[str]:
+    dirs = ["src", "lib", "tests", "docs", "pkg/core", "pkg/api"]
+    dirs += [f"build{i}" for i in range(0, 40, 4)] + [f"generated{i}/x" for i in range(1, 40, 4)]
+    extensions = ["py", "js", "ts", "go", "md"] + [f"ext{i}" for i in range(20)] + [f"legacy{i}" for i in range(20)]
+    return [
+        f"{rng.choice(dirs)}/{rng.choice(['main', 'util', 'models', f'keep{i % 50}'])}_{i}.{rng.choice(extensions)}"
+        for i in range(PATHS)
+    ]
+
+
+def endswith_loop(patterns: list[str], path: str) -> bool:
+    """Прежний FilesFilter._is_allowed: endswith по каждому шаблону."""
+    filename = path.rsplit("/", 1)[-1]
+    for pattern in patterns:
+        if filename.endswith(pattern):
+            return True
+    return False
+
+
+def fnmatch_loop(patterns: list[str], path: str) -> bool:
+    """Glob по каждому шаблону без компиляции в одно выражение."""
+    return any(fnmatch.fnmatch(path, pattern.lstrip("!/")) for pattern in patterns)
+
+
+def run(name, check, paths):
+    started = time.perf_counter()
+    ignored = sum(1 for path in paths if check(path))
+    elapsed = time.perf_counter() - started
+    print(f"{name:<18} {elapsed:7.3f} s  {len(paths) / elapsed:10.0f} paths/s  ignored {ignored}")
+    return elapsed
+
+
+if __name__ == "__main__":
+    rng = random.Random(7)
+    patterns = make_patterns(rng)
+    paths = make_paths(rng)
+    print(f"paths: {PATHS}, patterns: {len(patterns)}")
+
+    loop = run("endswith loop", lambda p: endswith_loop(patterns, p), paths)
+    run("fnmatch loop", lambda p: fnmatch_loop(patterns, p), paths)
+
+    started = time.perf_counter()
+    matcher = IgnoreMatcher(patterns)
+    print(f"{'compile':<18} {time.perf_counter() - started:7.3f} s")
+    compiled = run("compiled matcher", matcher.is_ignored, paths)
+    print(f"compiled vs endswith loop: x{loop / compiled:.1f}")
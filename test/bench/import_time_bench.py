@@ -0,0 +1,74 @@
+"""
+Время импорта src.api.main (холодный старт воркера uvicorn) по
+python -X importtime.
+
+Завершается с кодом 1, если импорт дольше бюджета или на старте
+подтягиваются тяжёлые ML-зависимости — так бенчмарк работает проверкой в CI.
+
+    PYTHONPATH=. python test/bench/import_time_bench.py [--budget-ms 1500] [--runs 3]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+
+MODULE = "src.api.main"
+# Должны импортироваться только при включённом ML-детекторе языка
+HEAVY_MODULES = ("transformers", "onnxruntime", "numpy", "torch")
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure() -> dict[str, int]:
+    """Модуль -> кумулятивное время импорта, мкс."""
+    env = os.environ | {"PYTHONPATH": os.pathsep.join(filter(None, [".", os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:], file=sys.stderr)
+        raise SystemExit(f"import {MODULE} failed")
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            cumulative[match[4]] = int(match[2])
+    return cumulative
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.getenv("IMPORT_TIME_BUDGET_MS", 1500)),
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    # Первый запуск компилирует .pyc, берётся лучший из нескольких
+    runs = [measure() for _ in range(max(1, args.runs))]
+    best = min(runs, key=lambda run: run[MODULE])
+    total_ms = best[MODULE] / 1000
+
+    print(f"{'cumulative ms':>14}  module")
+    for module, us in sorted(best.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{us / 1000:14.1f}  {module}")
+    print(f"\nimport {MODULE}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    heavy = sorted(m for m in best if m.split(".")[0] in HEAVY_MODULES and "." not in m)
+    if heavy:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(heavy)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print("FAIL: import time budget exceeded")
+        failed = True
+    sys.exit(1 if failed else 0)
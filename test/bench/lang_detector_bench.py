@@ -0,0 +1,55 @@
+"""
+Определение языка файла: прежний os.path.splitext + FILE_EXTENSIONS на
+каждый файл против LanguageDetector с таблицей имён/составных расширений
+и запоминанием по пути. 200k файлов коммитов по 5k уникальным путям —
+одни и те же файлы меняются во многих коммитах.
+
+    PYTHONPATH=. python test/bench/lang_detector_bench.py
+"""
+import os
+import random
+import time
+
+from src.data.enums.language import FILE_EXTENSIONS
+from src.services.internal.preprocessing.lang_detector import LanguageDetector
+
+
+FILES = 200_000
+UNIQUE_PATHS = 5_000
+
+
+def make_paths(rng: random.Random) -> list[str]:
+    dirs = ["src", "src/api", "lib/core", "tests", "types", "bin", "scripts", "deploy", "docs"]
+    names = ["main.py", "index.d.ts", "app.spec.ts", "util.go", "Dockerfile", "Makefile",
+             "CMakeLists.txt", ".eslintrc", "run", "README", "model.rs", "view.min.js", "x.h"]
+    unique = [f"{rng.choice(dirs)}/m{i}/{rng.choice(names)}" for i in range(UNIQUE_PATHS)]
+    return [rng.choice(unique) for _ in range(FILES)]
+
+
+def splitext_detect(path: str):
+    """Прежний LanguageDetector._by_extension."""
+    filename = path.rsplit("/", 1)[-1]
+    if "." not in filename:
+        return filename
+    ext = os.path.splitext(filename)[1].lstrip(".").lower()
+    return FILE_EXTENSIONS.get(ext)
+
+
+def run(name, detect, paths):
+    started = time.perf_counter()
+    detected = sum(1 for lang in detect(paths) if lang is not None)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<22} {elapsed:7.3f} s  {len(paths) / elapsed / 1e6:6.2f} M files/s  detected {detected}")
+    return elapsed
+
+
+if __name__ == "__main__":
+    paths = make_paths(random.Random(7))
+    print(f"files: {FILES}, unique paths: {UNIQUE_PATHS}")
+
+    before = run("splitext per file", lambda ps: [splitext_detect(p) for p in ps], paths)
+    cold = LanguageDetector()
+    run("detector, no memo", lambda ps: [cold._detect(p) for p in ps], paths)
+    detector = LanguageDetector()
+    after = run("detector, memoized", detector.detect_many, paths)
+    print(f"memoized vs splitext: x{before / after:.1f}")
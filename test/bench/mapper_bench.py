@@ -0,0 +1,67 @@
+"""
+JSON полного коммита -> Commit: прежний путь через SingleCommitEntity
+(single_commit_json_to_dto + single_commit_dto_to_domain_commit_dto)
+против single_commit_json_to_domain_commit, и разбор тела ответа
+стандартным json против json_codec (orjson, если установлен).
+
+Пример ответа response_examples/repos_owner_repo_commits_ref.json
+размножается до 10k коммитов с разными sha.
+
+    PYTHONPATH=. python test/bench/mapper_bench.py
+"""
+import gc
+import json
+import time
+
+from src.util import json_codec
+from src.util.mapper import (
+    single_commit_dto_to_domain_commit_dto,
+    single_commit_json_to_domain_commit,
+    single_commit_json_to_dto,
+)
+
+
+EXAMPLE = "response_examples/repos_owner_repo_commits_ref.json"
+COMMITS = 10_000
+
+
+def make_bodies() -> list[bytes]:
+    with open(EXAMPLE, encoding="utf-8") as f:
+        example = json.load(f)
+    bodies = []
+    for i in range(COMMITS):
+        example["sha"] = f"{i:040x}"
+        bodies.append(json.dumps(example).encode("utf-8"))
+    return bodies
+
+
+def run(name, func, items):
+    # Как timeit: сборщик мусора не вмешивается в замер
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        result = [func(item) for item in items]
+        elapsed = time.perf_counter() - started
+    finally:
+        gc.enable()
+    print(f"{name:<24} {elapsed:7.3f} s  {len(items) / elapsed:9.0f} commits/s")
+    return elapsed, result
+
+
+if __name__ == "__main__":
+    bodies = make_bodies()
+    print(f"commits: {COMMITS}, body {len(bodies[0])} bytes, orjson: {json_codec.orjson is not None}")
+
+    json_time, parsed = run("json.loads", json.loads, bodies)
+    codec_time, _ = run("json_codec.loads", json_codec.loads, bodies)
+
+    dto_time, old = run(
+        "via SingleCommitEntity",
+        lambda body: single_commit_dto_to_domain_commit_dto(single_commit_json_to_dto(body)),
+        parsed,
+    )
+    direct_time, new = run("direct to Commit", single_commit_json_to_domain_commit, parsed)
+    assert [c.model_dump() for c in old] == [c.model_dump() for c in new]
+
+    print(f"parse + map: x{(json_time + dto_time) / (codec_time + direct_time):.1f}")
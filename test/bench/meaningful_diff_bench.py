@@ -0,0 +1,61 @@
+"""
+Скорость подсчёта значимых строк diff на многомегабайтном патче:
+с докстрингами/блочными комментариями (построчный проход с состоянием)
+и без них (одно регулярное выражение на патч).
+
+    PYTHONPATH=. python test/bench/meaningful_diff_bench.py
+"""
+import time
+
+from src.services.internal.github import count_meaningful_diff, count_meaningful_lines
+
+
+HUNKS = 20000
+
+
+def make_patch(with_blocks: bool) -> str:
+    hunk = [
+        "@@ -10,12 +10,14 @@ class Service:",
+        "     def handle(self, request):",
+        "-        result = self.client.get(request.url)",
+        "+        result = self.client.get(request.url, timeout=self.timeout)",
+        "+        # повтор при таймауте",
+        "+",
+        "         if result.status_code != 200:",
+        "-            raise ServiceError(result)",
+        "+            raise ServiceError(result, request=request)",
+        "         return result.json()",
+    ]
+    if with_blocks:
+        hunk += [
+            '+    """',
+            "+    Обрабатывает запрос и возвращает тело ответа.",
+            '+    """',
+        ]
+    return "\n".join(hunk * HUNKS)
+
+
+def run(name, patch):
+    lines = patch.count("\n") + 1
+    started = time.perf_counter()
+    additions, deletions = count_meaningful_lines("service.py", patch)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<16} {len(patch) / 2 ** 20:6.1f} MB  {lines:8d} lines  "
+        f"{elapsed:6.3f} s  {lines / elapsed / 1e6:5.2f} M lines/s  "
+        f"(+{additions} -{deletions})"
+    )
+
+
+if __name__ == "__main__":
+    run("no blocks", make_patch(with_blocks=False))
+    run("with docstrings", make_patch(with_blocks=True))
+
+    patch = make_patch(with_blocks=True)
+    diff = "".join(
+        f"diff --git a/pkg/m{i}.py b/pkg/m{i}.py\n--- a/pkg/m{i}.py\n+++ b/pkg/m{i}.py\n{patch}\n"
+        for i in range(4)
+    )
+    started = time.perf_counter()
+    count_meaningful_diff(diff)
+    print(f"multi-file diff  {len(diff) / 2 ** 20:6.1f} MB  {time.perf_counter() - started:6.3f} s")